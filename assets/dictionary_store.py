@@ -0,0 +1,240 @@
+import json
+import os
+import sqlite3
+import threading
+
+DICT_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'sign_dictionary.db')
+
+class SignDictionaryStore:
+    """
+    SQLite-backed sign dictionary: gloss (+ regional variant) -> category, path.
+
+    Every lookup is a primary-key probe and an insert touches one row, so
+    startup and insert cost do not grow with the lexicon. The JSON dictionary
+    shipped with the app is bulk-imported in one transaction when it changes;
+    each sign remembers the file or pack it came from, so signs dropped from
+    the file are deleted by the next import.
+    Multi-word glosses (THANK_YOU, HELP-ME) are also stored as phrases, so
+    "THANK YOU" in a gloss sentence can be matched without loading them all.
+    Safe to share between threads.
+    """
+    def __init__(self, db_path=DICT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            db_dir = os.path.dirname(os.path.abspath(db_path))
+            if not os.path.exists(db_dir):
+                os.makedirs(db_dir)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._lock, self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS signs (
+                    gloss TEXT NOT NULL,
+                    region TEXT NOT NULL DEFAULT '',  -- '' = national sign
+                    category TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    source TEXT NOT NULL DEFAULT '',  -- "json:<file>", "pack:<name>", '' = added locally
+                    PRIMARY KEY (gloss, region)
+                ) WITHOUT ROWID
+            ''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS signs_by_category ON signs (category, gloss)")
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS phrases (
+                    words TEXT PRIMARY KEY,  -- "THANK YOU"
+                    gloss TEXT NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            # Clips of sign files, by their dictionary path. trusted rows come
+            # from a pack or server manifest; the others only record which
+            # copy was downloaded
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS clips (
+                    path TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    trusted INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            ''')
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    @staticmethod
+    def phrase_words(gloss):
+        """THANK_YOU / HELP-ME -> ("THANK", "YOU") / ("HELP", "ME")"""
+        return tuple(w for w in gloss.replace('-', '_').split('_') if w)
+
+    def _insert(self, rows, source=''):
+        """rows: (gloss, region, category, path); caller holds the lock and transaction."""
+        rows = [(gloss.upper(), region, category, path, source) for gloss, region, category, path in rows]
+        self.conn.executemany('''
+            INSERT INTO signs (gloss, region, category, path, source) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(gloss, region) DO UPDATE SET
+                category = excluded.category, path = excluded.path, source = excluded.source
+        ''', rows)
+
+        phrases = []
+        for gloss, _, _, _, _ in rows:
+            words = self.phrase_words(gloss)
+            if len(words) > 1:
+                phrases.append((" ".join(words), gloss))
+        if phrases:
+            self.conn.executemany("INSERT OR REPLACE INTO phrases (words, gloss) VALUES (?, ?)", phrases)
+            longest = max(len(words.split()) for words, _ in phrases)
+            if longest > self.max_phrase_length:
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('max_phrase_length', ?)",
+                                  (str(longest),))
+
+    def add_sign(self, gloss, category, path, region=''):
+        with self._lock, self.conn:
+            self._insert([(gloss, region, category, path)])
+
+    def add_signs(self, rows):
+        """Bulk insert of (gloss, region, category, path) rows in one transaction."""
+        with self._lock, self.conn:
+            self._insert(rows)
+
+    def _delete(self, keys):
+        """keys: (gloss, region); caller holds the lock and transaction."""
+        keys = [(gloss.upper(), region) for gloss, region in keys]
+        self.conn.executemany("DELETE FROM signs WHERE gloss = ? AND region = ?", keys)
+        # Phrases point at national signs; drop them once no variant is left
+        self.conn.executemany('''
+            DELETE FROM phrases WHERE gloss = ?
+            AND NOT EXISTS (SELECT 1 FROM signs WHERE signs.gloss = ?)
+        ''', [(gloss, gloss) for gloss, _ in keys])
+
+    def import_json(self, json_path, region=''):
+        """
+        Imports a {category: {gloss: path}} dictionary file in one
+        transaction. Signs an earlier import of the same file added that it
+        no longer lists are deleted.
+        """
+        with open(json_path, 'r') as f:
+            dictionary = json.load(f)
+        rows = [(gloss, region, category, path)
+                for category, signs in dictionary.items()
+                for gloss, path in signs.items()]
+        source = "json:" + os.path.basename(json_path)
+        listed = {(gloss.upper(), region) for gloss, region, _, _ in rows}
+        stat = os.stat(json_path)
+        with self._lock, self.conn:
+            stale = [key for key in self.conn.execute("SELECT gloss, region FROM signs WHERE source = ?", (source,))
+                     if key not in listed]
+            self._delete(stale)
+            self._insert(rows, source)
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                              ("json:" + os.path.basename(json_path), f"{stat.st_mtime_ns}:{stat.st_size}"))
+        return len(rows)
+
+    def needs_import(self, json_path):
+        """True if the JSON file changed since it was last imported (or never was)."""
+        if not os.path.exists(json_path):
+            return False
+        stat = os.stat(json_path)
+        return self._meta("json:" + os.path.basename(json_path)) != f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _meta(self, key):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def max_phrase_length(self):
+        value = self.conn.execute("SELECT value FROM meta WHERE key = 'max_phrase_length'").fetchone()
+        return int(value[0]) if value else 1
+
+    def lookup(self, gloss, region=''):
+        """(category, path) of the regional variant if there is one, else the national sign."""
+        with self._lock:
+            row = self.conn.execute('''
+                SELECT category, path FROM signs
+                WHERE gloss = ? AND region IN (?, '')
+                ORDER BY region DESC LIMIT 1
+            ''', (gloss.upper(), region)).fetchone()
+        return tuple(row) if row else None
+
+    def phrase(self, words):
+        """Gloss signed for a run of words ("THANK", "YOU"), or None."""
+        with self._lock:
+            row = self.conn.execute("SELECT gloss FROM phrases WHERE words = ?", (" ".join(words),)).fetchone()
+        return row[0] if row else None
+
+    def clip(self, path):
+        """(sha256, size) of the cached copy of a dictionary path, or None."""
+        with self._lock:
+            row = self.conn.execute("SELECT sha256, size FROM clips WHERE path = ?", (path,)).fetchone()
+        return tuple(row) if row else None
+
+    def expected_clip(self, path):
+        """(sha256, size) a pack or server manifest lists for a dictionary path, or None."""
+        with self._lock:
+            row = self.conn.execute("SELECT sha256, size FROM clips WHERE path = ? AND trusted",
+                                    (path,)).fetchone()
+        return tuple(row) if row else None
+
+    def set_clip(self, path, sha256, size):
+        """Records a downloaded copy; a hash from a manifest is never replaced."""
+        with self._lock, self.conn:
+            self.conn.execute('''
+                INSERT INTO clips (path, sha256, size) VALUES (?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET sha256 = excluded.sha256, size = excluded.size
+                WHERE NOT trusted
+            ''', (path, sha256, size))
+
+    def set_expected_clips(self, clips):
+        """Records (path, sha256, size) from an authoritative manifest, in one transaction."""
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO clips (path, sha256, size, trusted) VALUES (?, ?, ?, 1)",
+                                  clips)
+
+    def pack_version(self, name):
+        """Installed version of a sign pack, or None."""
+        value = self._meta("pack:" + name)
+        return int(value) if value is not None else None
+
+    def apply_pack(self, name, version, rows, clips, removed, full=False):
+        """
+        Installs a sign pack in one transaction: rows (gloss, region,
+        category, path) are upserted, clips (path, sha256, size) recorded,
+        removed (gloss, region) deleted, and the pack version bumped. A full
+        pack replaces the previous version, so signs an earlier version added
+        that it no longer lists are deleted too.
+        """
+        source = "pack:" + name
+        with self._lock, self.conn:
+            if full:
+                listed = {(gloss.upper(), region) for gloss, region, _, _ in rows}
+                stale = [key for key in self.conn.execute("SELECT gloss, region FROM signs WHERE source = ?",
+                                                          (source,))
+                         if key not in listed]
+                self._delete(stale)
+            self._insert(rows, source)
+            self.conn.executemany("INSERT OR REPLACE INTO clips (path, sha256, size, trusted) VALUES (?, ?, ?, 1)",
+                                  clips)
+            self._delete(removed)
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                              ("pack:" + name, str(version)))
+
+    def categories(self):
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT category FROM signs ORDER BY category")]
+
+    def load_category(self, category, region=''):
+        """{gloss: path} for one category (regional variants over national ones)."""
+        with self._lock:
+            rows = self.conn.execute('''
+                SELECT gloss, path FROM signs
+                WHERE category = ? AND region IN (?, '')
+                ORDER BY gloss, region
+            ''', (category, region)).fetchall()
+        # '' sorts first, so a regional variant overwrites the national sign
+        return {gloss: path for gloss, path in rows}
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM signs").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,304 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+
+SIGN_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'sign_cache')
+# Total size of downloaded clips kept on disk
+MAX_BYTES = 256 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# A failed download is not retried for this long (offline, missing on server)
+RETRY_AFTER_S = 60
+
+FetchedClip = namedtuple("FetchedClip", "path sha256 size")
+
+def file_sha256(path, chunk_size=CHUNK_SIZE):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+class SignCache:
+    """
+    Content-addressed store of downloaded sign clips under data/.
+
+    Each clip is saved as <sha256><ext>, so a clip shared by several glosses
+    (or re-downloaded after a dictionary update) is stored once, and a file's
+    name is its integrity hash. Least recently used clips are evicted once the
+    directory exceeds max_bytes; recency survives restarts through the files'
+    modification times. Partial downloads live in partial/ until complete.
+    """
+    def __init__(self, directory=SIGN_CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.partial_dir = os.path.join(directory, 'partial')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # sha256 -> (file name, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        if not os.path.exists(self.partial_dir):
+            os.makedirs(self.partial_dir)
+        self._scan()
+
+    def _scan(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[os.path.splitext(name)[0]] = (name, size)
+            self._bytes += size
+
+    def __contains__(self, sha256):
+        return sha256 in self._entries
+
+    def get(self, sha256):
+        """Path of the clip with this hash, or None."""
+        with self._lock:
+            entry = self._entries.get(sha256)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sha256)
+            self.hits += 1
+        path = os.path.join(self.directory, entry[0])
+        try:
+            os.utime(path)
+        except OSError:
+            # Deleted behind our back
+            with self._lock:
+                self._bytes -= self._entries.pop(sha256, (None, 0))[1]
+            return None
+        return path
+
+    def partial_path(self, url):
+        return os.path.join(self.partial_dir, hashlib.sha1(url.encode('utf-8')).hexdigest()[:20] + '.part')
+
+    def add(self, src_path, sha256, ext=''):
+        """Moves a verified file into the cache (src_path is consumed). Returns its path."""
+        name = sha256 + ext
+        path = os.path.join(self.directory, name)
+        os.replace(src_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._bytes += size - self._entries.pop(sha256, (None, 0))[1]
+            self._entries[sha256] = (name, size)
+            self._evict()
+        return path
+
+    def verify(self, sha256):
+        """Re-hashes a cached clip; a corrupted file is dropped. Returns True if intact."""
+        path = self.get(sha256)
+        if path is None:
+            return False
+        if file_sha256(path) == sha256:
+            return True
+        with self._lock:
+            self._bytes -= self._entries.pop(sha256, (None, 0))[1]
+        os.remove(path)
+        return False
+
+    def _evict(self):
+        # Never evicts the newest entry, even if it alone exceeds max_bytes
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (name, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "clips": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+class AssetFetcher:
+    """
+    Downloads sign clips in the background into a SignCache.
+
+    fetch() returns immediately with a Future; downloads run on a bounded
+    pool of `workers` threads. Concurrent requests for the same clip share
+    one download. An interrupted download keeps its partial file and resumes
+    with an HTTP Range request (guarded by If-Range, so a clip that changed
+    on the server is downloaded again from the start). Every download is
+    hashed while it streams and checked against the expected sha256 when one
+    is known. Paths that failed are not retried for retry_after_s.
+    """
+    def __init__(self, cache, base_url, workers=2, session_factory=requests.Session,
+                 timeout=10, retries=2, retry_after_s=RETRY_AFTER_S, chunk_size=CHUNK_SIZE):
+        self.cache = cache
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_after_s = retry_after_s
+        self.chunk_size = chunk_size
+        self.session_factory = session_factory
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset-fetch")
+        self._sessions = threading.local()
+        self._inflight = {}
+        self._failed = {}  # rel_path -> (monotonic time, exception)
+        self._lock = threading.Lock()
+
+        self.downloads = 0
+        self.deduplicated = 0
+        self.resumed = 0
+        self.failed = 0
+        self.bytes_downloaded = 0
+
+    def fetch(self, rel_path, sha256=None, callback=None):
+        """
+        Starts (or joins) the download of base_url + rel_path. Returns a
+        Future of FetchedClip. callback(rel_path, FetchedClip or None) runs
+        on a fetcher thread; UI code should re-schedule it onto the main loop.
+        """
+        started = False
+        with self._lock:
+            future = self._inflight.get(rel_path)
+            if future is not None:
+                self.deduplicated += 1
+            else:
+                failure = self._failed.get(rel_path)
+                if failure and time.monotonic() - failure[0] < self.retry_after_s:
+                    future = Future()
+                    future.set_exception(failure[1])
+                else:
+                    future = self._executor.submit(self._download, rel_path, sha256)
+                    self._inflight[rel_path] = future
+                    self.downloads += 1
+                    started = True
+
+        # Registered outside the lock: a finished future runs callbacks inline
+        if started:
+            future.add_done_callback(lambda f: self._finished(rel_path, f))
+        if callback:
+            def notify(f):
+                try:
+                    callback(rel_path, None if f.exception() else f.result())
+                except Exception as e:
+                    print(f"Asset fetch callback error ({rel_path}): {e}")
+            future.add_done_callback(notify)
+        return future
+
+    def fetch_json(self, rel_path):
+        """Downloads a small JSON document (e.g. the clip manifest) in the background -> Future."""
+        def get():
+            response = self._session().get(self.base_url + rel_path, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        return self._executor.submit(get)
+
+    def _finished(self, rel_path, future):
+        with self._lock:
+            self._inflight.pop(rel_path, None)
+            error = future.exception()
+            if error is not None:
+                self.failed += 1
+                self._failed[rel_path] = (time.monotonic(), error)
+                print(f"Asset download failed ({rel_path}): {error}")
+            else:
+                self._failed.pop(rel_path, None)
+
+    def _session(self):
+        # requests.Session is not safe to share between threads
+        session = getattr(self._sessions, 'session', None)
+        if session is None:
+            session = self._sessions.session = self.session_factory()
+        return session
+
+    def _download(self, rel_path, sha256):
+        url = self.base_url + rel_path
+        for attempt in range(self.retries + 1):
+            try:
+                return self._download_once(url, rel_path, sha256)
+            except requests.RequestException:
+                if attempt == self.retries:
+                    raise
+
+    def _download_once(self, url, rel_path, sha256):
+        part = self.cache.partial_path(url)
+        validator_path = part + '.validator'
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            if os.path.exists(validator_path):
+                with open(validator_path, 'r') as f:
+                    headers['If-Range'] = f.read()
+
+        with self._session().get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416:
+                # Partial file is not a prefix of the clip any more
+                os.remove(part)
+                raise requests.HTTPError(f"Stale partial download of {rel_path}", response=response)
+            response.raise_for_status()
+
+            hasher = hashlib.sha256()
+            if response.status_code == 206:
+                self.resumed += 1
+                with open(part, 'rb') as f:
+                    for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                        hasher.update(chunk)
+                mode = 'ab'
+                total = int(response.headers.get('Content-Range', '*/0').rsplit('/', 1)[1])
+            else:
+                # Full response: no partial file, or the server ignored If-Range
+                offset = 0
+                mode = 'wb'
+                total = int(response.headers.get('Content-Length', 0))
+                validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+                if validator:
+                    with open(validator_path, 'w') as f:
+                        f.write(validator)
+
+            size = offset
+            with open(part, mode) as f:
+                for chunk in response.iter_content(self.chunk_size):
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    size += len(chunk)
+                    self.bytes_downloaded += len(chunk)
+
+        if total and size != total:
+            raise requests.ConnectionError(f"Incomplete download of {rel_path}: {size}/{total} bytes")
+
+        digest = hasher.hexdigest()
+        if os.path.exists(validator_path):
+            os.remove(validator_path)
+        if sha256 and digest != sha256:
+            os.remove(part)
+            raise ValueError(f"Integrity check failed for {rel_path}: got {digest[:12]}, expected {sha256[:12]}")
+        path = self.cache.add(part, digest, os.path.splitext(rel_path)[1])
+        return FetchedClip(path, digest, size)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._inflight),
+                "downloads": self.downloads,
+                "deduplicated": self.deduplicated,
+                "resumed": self.resumed,
+                "failed": self.failed,
+                "bytes_downloaded": self.bytes_downloaded,
+                "cache": self.cache.stats()
+            }
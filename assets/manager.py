@@ -1,58 +1,240 @@
 import os
-import json
-import requests
+
+from assets import sign_pack
+from assets.dictionary_store import SignDictionaryStore, DICT_DB_PATH
 
 ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
 DICT_PATH = os.path.join(ASSET_DIR, 'sasl_dictionary.json')
+# Sign paths in the dictionary are relative to the project root
+BASE_DIR = os.path.abspath(os.path.join(ASSET_DIR, '..'))
 REMOTE_BASE_URL = "https://example.com/sasl_assets/" # Placeholder
+# Server manifest of every clip: {"clips": [{"path", "sha256", "size"}, ...]}
+CLIP_MANIFEST = "clips.json"
+
+# Glosses the grammar engine produces that are stored under another name
+ALIASES = {
+    "HELP": "HELP-ME",
+    "THANKS": "THANK_YOU",
+    "HI": "HELLO",
+}
+# Gloss sequences signed as one sign (multi-word entries such as THANK_YOU
+# and HELP-ME are added from the dictionary automatically)
+PHRASE_ALIASES = {
+    ("THANK", "YOU"): "THANK_YOU",
+}
 
 class AssetManager:
-    def __init__(self):
-        self.dictionary = self._load_dictionary()
-    
-    def _load_dictionary(self):
-        if os.path.exists(DICT_PATH):
-            with open(DICT_PATH, 'r') as f:
-                return json.load(f)
-        return {}
+    """
+    Resolves glosses to local sign clips.
 
-    def get_sign_video(self, gloss):
+    Signs live in a SignDictionaryStore (SQLite); the JSON dictionary is
+    imported into it on first run and whenever the file changes. Entries are
+    fetched per gloss (or per category with load_category) and memoized, and
+    sign directories are scanned the first time a clip in them is looked up,
+    so startup does not depend on the size of the dictionary.
+
+    Signs missing locally are downloaded in the background by the fetcher
+    (if one is given) into its content-addressed cache; get_sign_video never
+    waits for a download. Downloads are checked against the hashes of the
+    server's clip manifest (sync_clip_manifest) or an installed sign pack.
+    """
+    def __init__(self, dict_path=DICT_PATH, base_dir=BASE_DIR, db_path=DICT_DB_PATH, region='',
+                 fetcher=None, cache=None):
         """
-        Returns local path if exists, otherwise tries to download it.
-        Returns None if not found.
+        fetcher: AssetFetcher for signs missing locally (None = local files only).
+        cache: SignCache holding downloaded and pack-installed clips (defaults
+        to the fetcher's).
         """
+        self.dict_path = dict_path
+        self.base_dir = base_dir
+        self.region = region
+        self.fetcher = fetcher
+        self.cache = cache if cache is not None else (fetcher.cache if fetcher else None)
+        self.store = SignDictionaryStore(db_path)
+        if self.store.needs_import(dict_path):
+            count = self.store.import_json(dict_path)
+            print(f"Imported {count} signs from {os.path.basename(dict_path)}")
+        # gloss -> (category, absolute path) or None, filled as glosses are looked up
+        self.index = {}
+        self.phrases = dict(PHRASE_ALIASES)
+        self.max_phrase_length = max(self.store.max_phrase_length,
+                                     max(len(words) for words in PHRASE_ALIASES))
+        self.refresh()
+
+    def _abspath(self, rel_path):
+        return os.path.abspath(os.path.join(self.base_dir, rel_path))
+
+    def refresh(self):
+        """
+        Forgets which sign files exist; each directory is rescanned (once)
+        the next time a sign in it is looked up, so lookups never stat files.
+        """
+        self._existing = set()
+        self._scanned_dirs = set()
+
+    def _exists(self, path):
+        directory = os.path.dirname(path)
+        if directory not in self._scanned_dirs:
+            self._scanned_dirs.add(directory)
+            if os.path.isdir(directory):
+                for entry in os.scandir(directory):
+                    if entry.is_file():
+                        self._existing.add(entry.path)
+        return path in self._existing
+
+    def load_category(self, category):
+        """Loads a whole category into the index (e.g. before a lesson) -> {gloss: absolute path}."""
+        signs = {gloss: self._abspath(rel_path)
+                 for gloss, rel_path in self.store.load_category(category, self.region).items()}
+        for gloss, path in signs.items():
+            self.index[gloss] = (category, path)
+        return signs
+
+    def categories(self):
+        return self.store.categories()
+
+    def lookup(self, gloss):
+        """Returns (category, absolute path) for a gloss or alias, or None."""
         gloss = gloss.upper()
-        
-        # Flatten dictionary search
-        video_rel_path = None
-        for category in self.dictionary.values():
-            if gloss in category:
-                video_rel_path = category[gloss]
-                break
-        
-        if not video_rel_path:
+        gloss = ALIASES.get(gloss, gloss)
+        if gloss not in self.index:
+            entry = self.store.lookup(gloss, self.region)
+            self.index[gloss] = (entry[0], self._abspath(entry[1])) if entry else None
+        return self.index[gloss]
+
+    def _rel_path(self, path):
+        # Dictionary paths double as URL paths under the remote base
+        return os.path.relpath(path, self.base_dir).replace(os.sep, '/')
+
+    def get_sign_video(self, gloss):
+        """
+        Returns the local (or downloaded) path of a sign. If it is missing,
+        starts a background download and returns None right away.
+        """
+        entry = self.lookup(gloss)
+        if not entry:
             return None
-            
-        local_path = os.path.abspath(os.path.join(ASSET_DIR, '..', video_rel_path))
-        
-        if os.path.exists(local_path):
+
+        local_path = entry[1]
+        if self._exists(local_path):
             return local_path
-        
-        # If not local, try download (Mock logic)
-        # print(f"Asset not found locally: {local_path}. Setup download logic here.")
-        return None # Return None to indicate missing asset for now
+        if self.cache is None:
+            return None
+
+        clip = self.store.clip(self._rel_path(local_path))
+        if clip:
+            cached = self.cache.get(clip[0])
+            if cached:
+                return cached
+        self.fetch_sign(gloss)
+        return None
+
+    def fetch_sign(self, gloss, callback=None):
+        """
+        Downloads a sign in the background. Returns a Future (None if the
+        gloss is unknown or there is no fetcher); callback(gloss, path or
+        None) runs on a fetcher thread once the download ends.
+        """
+        entry = self.lookup(gloss)
+        if not entry or self.fetcher is None:
+            return None
+        rel_path = self._rel_path(entry[1])
+        # Only a manifest says what a clip should be; an earlier download
+        # only says where its copy is
+        expected = self.store.expected_clip(rel_path)
+
+        def done(_, clip):
+            if clip is not None:
+                self.store.set_clip(rel_path, clip.sha256, clip.size)
+            if callback:
+                callback(gloss, clip.path if clip else None)
+
+        return self.fetcher.fetch(rel_path, sha256=expected[0] if expected else None, callback=done)
+
+    def sync_clip_manifest(self, callback=None):
+        """
+        Downloads the server's clip manifest in the background and records
+        its hashes as the expected content of each clip. Returns a Future
+        (None without a fetcher); callback(number of clips) runs on a
+        fetcher thread once they are stored.
+        """
+        if self.fetcher is None:
+            return None
+
+        def store(future):
+            try:
+                clips = [(e["path"], e["sha256"], e["size"]) for e in future.result()["clips"]]
+            except Exception as e:
+                print(f"Clip manifest error: {e}")
+                return
+            self.store.set_expected_clips(clips)
+            if callback:
+                callback(len(clips))
+
+        future = self.fetcher.fetch_json(CLIP_MANIFEST)
+        future.add_done_callback(store)
+        return future
+
+    def _phrase(self, words):
+        if words not in self.phrases:
+            self.phrases[words] = self.store.phrase(words)
+        return self.phrases[words]
+
+    def merge_phrases(self, glosses):
+        """
+        Merges runs of glosses signed as one sign (THANK YOU -> THANK_YOU).
+        Greedy longest match over a bounded window, so a sentence costs
+        O(len * longest phrase).
+        """
+        glosses = [g.upper() for g in glosses]
+        longest = self.max_phrase_length
+        merged = []
+        i = 0
+        while i < len(glosses):
+            for n in range(min(longest, len(glosses) - i), 1, -1):
+                phrase = self._phrase(tuple(glosses[i:i + n]))
+                if phrase:
+                    merged.append(phrase)
+                    i += n
+                    break
+            else:
+                merged.append(glosses[i])
+                i += 1
+        return merged
+
+    def resolve_glosses(self, glosses):
+        """Maps a gloss sentence to [(gloss, local path or None), ...], merging phrases."""
+        return [(gloss, self.get_sign_video(gloss)) for gloss in self.merge_phrases(glosses)]
+
+    def import_pack(self, source):
+        """
+        Installs a sign pack (path or binary stream, see assets.sign_pack)
+        into the cache and the dictionary. Returns its manifest.
+        """
+        if self.cache is None:
+            raise ValueError("Sign packs need a sign cache")
+        manifest = sign_pack.import_pack(source, self.store, self.cache)
+        # Memoized entries (including misses) may be stale now
+        self.index = {}
+        self.phrases = dict(PHRASE_ALIASES)
+        self.max_phrase_length = max(self.max_phrase_length, self.store.max_phrase_length)
+        return manifest
 
     def add_local_sign(self, gloss, category, relative_path):
-        # Update dictionary
-        if category not in self.dictionary:
-            self.dictionary[category] = {}
-            
-        self.dictionary[category][gloss.upper()] = relative_path
-        
-        with open(DICT_PATH, 'w') as f:
-            json.dump(self.dictionary, f, indent=4)
+        """Adds (or replaces) one sign: a single-row insert, the JSON file is left alone."""
+        gloss = gloss.upper()
+        self.store.add_sign(gloss, category, relative_path, self.region)
+        path = self._abspath(relative_path)
+        self.index[gloss] = (category, path)
+        words = SignDictionaryStore.phrase_words(gloss)
+        if len(words) > 1:
+            self.phrases[words] = gloss
+            self.max_phrase_length = max(self.max_phrase_length, len(words))
+        if os.path.exists(path):
+            self._existing.add(path)
 
 if __name__ == "__main__":
     am = AssetManager()
     path = am.get_sign_video("POLICE")
     print(f"Path for POLICE: {path}")
+    print(am.resolve_glosses(["HELP", "THANK", "YOU", "WHERE"]))
@@ -0,0 +1,156 @@
+"""
+Sign packs: many sign clips in one tar archive, for offline installs and
+metered links.
+
+    manifest.json            first member, read before any clip
+    clips/<sha256><ext>      one member per distinct clip
+
+The manifest lists {gloss, category, path, sha256, size, region} per sign.
+`path` is the sign's dictionary path, so a pack can replace individual
+downloads of the same clips. A differential pack names the base_version it
+applies to and only carries signs that were added or changed since then
+(plus the glosses that were removed).
+"""
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+
+from assets.fetcher import CHUNK_SIZE, file_sha256
+
+MANIFEST_NAME = 'manifest.json'
+PACK_FORMAT = 1
+
+def build_pack(out_path, signs, name, version, base_manifest=None, compress=True):
+    """
+    Writes a pack. signs: dicts with gloss, category, path (dictionary path),
+    file (local clip to pack) and optionally region. With base_manifest (the
+    full manifest of an earlier version), writes a differential pack against
+    it. Returns the manifest.
+    """
+    entries = []
+    for sign in signs:
+        entries.append({
+            "gloss": sign["gloss"].upper(),
+            "category": sign["category"],
+            "path": sign["path"],
+            "region": sign.get("region", ""),
+            "sha256": file_sha256(sign["file"]),
+            "size": os.path.getsize(sign["file"]),
+            "file": sign["file"]
+        })
+
+    removed = []
+    base_hashes = set()
+    if base_manifest is not None:
+        base = {(e["gloss"], e["region"]): e for e in base_manifest["signs"]}
+        base_hashes = {e["sha256"] for e in base_manifest["signs"]}
+        current = {(e["gloss"], e["region"]) for e in entries}
+        removed = [{"gloss": gloss, "region": region} for gloss, region in base if (gloss, region) not in current]
+        entries = [e for e in entries if base.get((e["gloss"], e["region"])) != _public(e)]
+
+    manifest = {
+        "format": PACK_FORMAT,
+        "name": name,
+        "version": version,
+        "base_version": base_manifest["version"] if base_manifest is not None else None,
+        "signs": [_public(e) for e in entries],
+        "removed": removed
+    }
+
+    with tarfile.open(out_path, 'w:gz' if compress else 'w') as tar:
+        data = json.dumps(manifest, indent=1).encode('utf-8')
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+
+        packed = set(base_hashes)
+        for entry in entries:
+            if entry["sha256"] in packed:
+                continue
+            packed.add(entry["sha256"])
+            ext = os.path.splitext(entry["path"])[1]
+            tar.add(entry["file"], arcname=f"clips/{entry['sha256']}{ext}")
+    return manifest
+
+def _public(entry):
+    return {key: value for key, value in entry.items() if key != "file"}
+
+def read_manifest(pack_path):
+    with tarfile.open(pack_path, 'r|*') as tar:
+        member = tar.next()
+        if member is None or member.name != MANIFEST_NAME:
+            raise ValueError(f"{pack_path}: {MANIFEST_NAME} must be the first member")
+        return json.load(tar.extractfile(member))
+
+def import_pack(source, store, cache):
+    """
+    Streams a pack (a path or a readable binary stream, e.g. an HTTP
+    response) into the sign cache, then updates the dictionary in one
+    transaction. Every clip is checked against the manifest's hash and size
+    while it is extracted; on any mismatch nothing in the dictionary changes.
+    A pack larger than the cache's max_bytes is refused before anything is
+    extracted. Returns the manifest.
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, 'rb') as f:
+            return import_pack(f, store, cache)
+
+    with tarfile.open(fileobj=source, mode='r|*') as tar:
+        member = tar.next()
+        if member is None or member.name != MANIFEST_NAME:
+            raise ValueError(f"Not a sign pack: {MANIFEST_NAME} must be the first member")
+        manifest = json.load(tar.extractfile(member))
+        if manifest.get("format") != PACK_FORMAT:
+            raise ValueError(f"Unsupported sign pack format: {manifest.get('format')}")
+
+        base_version = manifest.get("base_version")
+        installed = store.pack_version(manifest["name"])
+        if base_version is not None and installed != base_version:
+            raise ValueError(f"Pack {manifest['name']} v{manifest['version']} updates v{base_version}, "
+                             f"installed: {installed}")
+
+        expected = {e["sha256"]: e["size"] for e in manifest["signs"]}
+        if sum(expected.values()) > cache.max_bytes:
+            # The cache would evict the pack's own clips while installing it
+            raise ValueError(f"Pack {manifest['name']} v{manifest['version']} needs "
+                             f"{sum(expected.values())} bytes, sign cache holds {cache.max_bytes}")
+        for member in tar:
+            if not member.isfile():
+                continue
+            sha256 = os.path.splitext(os.path.basename(member.name))[0]
+            if sha256 not in expected:
+                print(f"Sign pack: skipping unexpected member {member.name}")
+                continue
+            _extract_clip(tar.extractfile(member), sha256, expected[sha256],
+                          os.path.splitext(member.name)[1], cache)
+
+    missing = [e["gloss"] for e in manifest["signs"] if e["sha256"] not in cache]
+    if missing:
+        # Shipped by an earlier pack but evicted since; fetched on demand
+        print(f"Sign pack: {len(missing)} clips not in cache ({', '.join(missing[:5])})")
+
+    store.apply_pack(
+        manifest["name"], manifest["version"],
+        rows=[(e["gloss"], e.get("region", ""), e["category"], e["path"]) for e in manifest["signs"]],
+        clips=[(e["path"], e["sha256"], e["size"]) for e in manifest["signs"]],
+        removed=[(e["gloss"], e.get("region", "")) for e in manifest.get("removed", [])],
+        full=base_version is None
+    )
+    return manifest
+
+def _extract_clip(stream, sha256, size, ext, cache):
+    tmp_path = os.path.join(cache.partial_dir, sha256 + '.pack')
+    hasher = hashlib.sha256()
+    written = 0
+    with open(tmp_path, 'wb') as f:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            f.write(chunk)
+            hasher.update(chunk)
+            written += len(chunk)
+    if written != size or hasher.hexdigest() != sha256:
+        os.remove(tmp_path)
+        raise ValueError(f"Sign pack clip {sha256[:12]} is corrupt ({written}/{size} bytes)")
+    cache.add(tmp_path, sha256, ext)
@@ -0,0 +1,91 @@
+"""
+Grammar engine benchmark: full vs lean spaCy pipeline.
+
+Reports model load time, per-utterance latency and memory for each mode.
+Each mode runs in its own process so peak RSS is not shared between them.
+
+    python benchmarks/bench_grammar.py [--repeat 20]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import multiprocessing
+import resource
+import statistics
+import time
+import tracemalloc
+
+UTTERANCES = [
+    "I am going to the shop tomorrow",
+    "Where is the hospital?",
+    "Call the police.",
+    "I need a doctor.",
+    "What time does the clinic open on Monday?",
+    "My brother was hurt in an accident last night",
+    "Can you help me?",
+    "Thank you for waiting",
+]
+
+def _run_mode(lean, repeat, queue):
+    from engine.grammar import SASLGrammarEngine
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    engine = SASLGrammarEngine(lean=lean)
+    load_s = time.perf_counter() - start
+    _, load_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Warm-up so the first call does not skew latency
+    engine.to_gloss(UTTERANCES[0])
+
+    latencies = []
+    for _ in range(repeat):
+        for sentence in UTTERANCES:
+            t0 = time.perf_counter()
+            engine.to_gloss(sentence)
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    latencies.sort()
+    queue.put({
+        "mode": "lean" if lean else "full",
+        "pipes": ",".join(engine.nlp.pipe_names),
+        "load_s": load_s,
+        "load_peak_mb": load_peak / (1024 * 1024),
+        # ru_maxrss is KiB on Linux/Android
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "mean_ms": statistics.mean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    })
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for lean in (False, True):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_mode, args=(lean, args.repeat, queue))
+        proc.start()
+        results.append(queue.get())
+        proc.join()
+
+    for r in results:
+        print(f"[{r['mode']}] pipes: {r['pipes']}")
+        print(f"  load:    {r['load_s']:.2f} s (peak alloc {r['load_peak_mb']:.1f} MB)")
+        print(f"  latency: mean {r['mean_ms']:.2f} ms, p50 {r['p50_ms']:.2f} ms, p95 {r['p95_ms']:.2f} ms")
+        print(f"  max RSS: {r['max_rss_mb']:.1f} MB")
+
+    full, lean = results
+    print("-" * 20)
+    print(f"Latency saved per utterance: {full['mean_ms'] - lean['mean_ms']:.2f} ms "
+          f"({(1 - lean['mean_ms'] / full['mean_ms']) * 100:.0f}%)")
+    print(f"Memory saved (RSS): {full['max_rss_mb'] - lean['max_rss_mb']:.1f} MB")
+
+if __name__ == "__main__":
+    main()
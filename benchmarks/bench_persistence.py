@@ -0,0 +1,89 @@
+"""
+Persistence write benchmark: commit-per-write vs WAL + write-behind batching.
+
+legacy:       rollback journal, synchronous=FULL, one commit per update_mastery
+              (what PersistenceManager did before)
+sync:         PersistenceManager with WAL pragmas, one transaction per write
+write_behind: PersistenceManager default, writes grouped by the writer thread
+
+Reports writes/sec as seen by the caller and until everything is committed:
+
+    python benchmarks/bench_persistence.py [--writes 2000] [--signs 200]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from engine.persistence import PersistenceManager
+
+class LegacyPersistence:
+    """The previous PersistenceManager write path."""
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS mastery (
+                sign_name TEXT PRIMARY KEY,
+                category TEXT,
+                level INTEGER DEFAULT 0,
+                last_practiced TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.conn.commit()
+
+    def update_mastery(self, sign_name, level):
+        self.conn.execute('''
+            INSERT INTO mastery (sign_name, level, last_practiced)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(sign_name) DO UPDATE SET
+                level = excluded.level,
+                last_practiced = CURRENT_TIMESTAMP
+        ''', (sign_name, level))
+        self.conn.commit()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.conn.close()
+
+def run(mode, db_path, writes, signs):
+    if mode == "legacy":
+        pm = LegacyPersistence(db_path)
+    else:
+        pm = PersistenceManager(db_path=db_path, write_behind=(mode == "write_behind"))
+
+    start = time.perf_counter()
+    for i in range(writes):
+        pm.update_mastery(f"SIGN_{i % signs}", i % 3)
+    enqueued = time.perf_counter() - start
+    pm.flush()
+    committed = time.perf_counter() - start
+
+    batches = pm.stats()["batches"] if mode != "legacy" else writes
+    pm.close()
+    return enqueued, committed, batches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--signs", type=int, default=200, help="distinct signs updated")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        print(f"{'mode':<14}{'caller w/s':>14}{'committed w/s':>16}{'transactions':>14}")
+        for mode in ("legacy", "sync", "write_behind"):
+            db_path = os.path.join(workdir, f"{mode}.db")
+            enqueued, committed, batches = run(mode, db_path, args.writes, args.signs)
+            print(f"{mode:<14}{args.writes / enqueued:>14.0f}{args.writes / committed:>16.0f}{batches:>14}")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
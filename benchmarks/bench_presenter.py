@@ -0,0 +1,95 @@
+"""
+Frame presentation benchmark: legacy per-frame texture path vs FramePresenter.
+
+legacy:    cv2.flip + tobytes + Texture.create + blit_buffer for every frame
+presenter: one texture per resolution, UV flip, blit straight from the array
+
+Reports upload FPS, textures allocated and Python-side bytes allocated per
+frame (tracemalloc). Needs a GL window, so run it on a desktop/device:
+
+    python benchmarks/bench_presenter.py [--frames 300] [--width 640 --height 480]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+import tracemalloc
+
+# Our own argparse handles the command line, not Kivy
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+
+import cv2
+import numpy as np
+from kivy.app import App
+from kivy.clock import Clock
+from kivy.graphics.texture import Texture
+from kivy.uix.image import Image
+
+from ui.presenter import FramePresenter
+
+class LegacyPresenter:
+    """The per-frame path previously used by update_frame in the screens."""
+    def __init__(self):
+        self.allocations = 0
+
+    def present(self, frame, widget):
+        buf = cv2.flip(frame, 0).tobytes()
+        texture = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt='bgr')
+        texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
+        self.allocations += 1
+        widget.texture = texture
+        return texture
+
+class PresenterBenchApp(App):
+    def __init__(self, args, **kwargs):
+        super().__init__(**kwargs)
+        self.args = args
+        self.results = {}
+
+    def build(self):
+        self.image = Image()
+        Clock.schedule_once(self.run_benchmarks, 0.5)
+        return self.image
+
+    def _run(self, name, presenter):
+        rng = np.random.default_rng(0)
+        # A handful of distinct frames, like a camera would deliver
+        frames = [rng.integers(0, 255, (self.args.height, self.args.width, 3), dtype=np.uint8)
+                  for _ in range(8)]
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        for i in range(self.args.frames):
+            presenter.present(frames[i % len(frames)], self.image)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.results[name] = {
+            "fps": self.args.frames / elapsed,
+            "ms_per_frame": elapsed / self.args.frames * 1000,
+            "textures": presenter.allocations,
+            "peak_alloc_kb": peak / 1024,
+        }
+
+    def run_benchmarks(self, dt):
+        self._run("legacy", LegacyPresenter())
+        self._run("presenter", FramePresenter())
+
+        for name, r in self.results.items():
+            print(f"[{name}] {r['fps']:.0f} FPS ({r['ms_per_frame']:.2f} ms/frame), "
+                  f"textures allocated: {r['textures']}, peak Python alloc: {r['peak_alloc_kb']:.0f} KB")
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+    PresenterBenchApp(args).run()
+
+if __name__ == "__main__":
+    main()
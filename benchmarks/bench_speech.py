@@ -0,0 +1,68 @@
+"""
+Speech recognition latency harness.
+
+Replays WAV files through the streaming transcriber (energy VAD endpointing
++ recognizer backend) and reports the end-of-speech-to-text latency: the
+time from the last voiced audio chunk to the final transcript. A transcript
+next to the clip (clip.txt) is shown for comparison.
+
+    python benchmarks/bench_speech.py clips/*.wav
+    python benchmarks/bench_speech.py clips/*.wav --backend google --realtime
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+import wave
+
+from engine.speech import create_recognizer, replay, EnergyVAD, WavFileSource, RECOGNIZER_VOSK, RECOGNIZER_GOOGLE
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def run(args):
+    recognizer = create_recognizer(args.backend)
+    print(f"Backend: {type(recognizer).__name__}  end silence: {args.end_silence_ms} ms")
+
+    all_latencies = []
+    audio_s = 0.0
+    start = time.perf_counter()
+    for path in args.files:
+        source = WavFileSource(path)
+        finals, partials, latencies = replay(
+            source, recognizer,
+            vad=EnergyVAD(end_silence_ms=args.end_silence_ms),
+            realtime=args.realtime
+        )
+        with wave.open(path, 'rb') as f:
+            audio_s += f.getnframes() / f.getframerate()
+        all_latencies.extend(latencies)
+
+        expected_path = os.path.splitext(path)[0] + '.txt'
+        expected = open(expected_path).read().strip() if os.path.exists(expected_path) else None
+        print(f"{os.path.basename(path)}: {' | '.join(finals) or '(nothing)'}")
+        if expected:
+            print(f"  expected: {expected}")
+        print(f"  partials: {len(partials)}  latency ms: "
+              f"{', '.join(f'{l * 1000:.0f}' for l in latencies) or '-'}")
+
+    elapsed = time.perf_counter() - start
+    if all_latencies:
+        print(f"End-of-speech -> text: p50 {percentile(all_latencies, 50) * 1000:.0f} ms  "
+              f"p95 {percentile(all_latencies, 95) * 1000:.0f} ms  over {len(all_latencies)} utterances")
+    if not args.realtime and audio_s:
+        print(f"Real-time factor: {elapsed / audio_s:.2f}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="+", help="16-bit PCM WAV files")
+    parser.add_argument("--backend", choices=[RECOGNIZER_VOSK, RECOGNIZER_GOOGLE], default=None)
+    parser.add_argument("--end-silence-ms", type=int, default=450)
+    parser.add_argument("--realtime", action="store_true", help="pace the audio like a live microphone")
+    run(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Headless hand tracking benchmark.
+
+Runs HandTracker over a recorded input with pacing disabled (maximum
+throughput) and reports FPS, p50/p95 latency per stage and the hand shapes
+seen over the whole clip. No camera or window needed, so it runs on CI.
+
+    python benchmarks/bench_tracker.py clip.mp4
+    python benchmarks/bench_tracker.py frames_dir/ --inference-width 320 --no-overlay
+    python benchmarks/bench_tracker.py session.jsonl           # landmark replay, no inference
+    python benchmarks/bench_tracker.py clip.mp4 --save-landmarks session.jsonl
+    python benchmarks/bench_tracker.py clip.mp4 --backend process   # inference in a worker process
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+from collections import Counter
+
+from engine.sources import open_source, save_landmark_stream
+from engine.tracker import create_tracker, BACKEND_THREAD, BACKEND_PROCESS, PACING_NONE
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def shape_timeline(shapes):
+    """Run-length encodes per-frame shapes: [(first_frame, last_frame, shape), ...]"""
+    timeline = []
+    for i, shape in enumerate(shapes):
+        if timeline and timeline[-1][2] == shape:
+            timeline[-1][1] = i
+        else:
+            timeline.append([i, i, shape])
+    return timeline
+
+def run(args):
+    source = open_source(args.source)
+    shapes = []
+    landmark_records = []
+
+    def on_frame(frame, hand_shape):
+        shapes.append(hand_shape)
+        if args.save_landmarks:
+            landmark_records.append((time.perf_counter() - start, (frame.shape[1], frame.shape[0]),
+                                     tracker.last_landmarks))
+
+    tracker = create_tracker(
+        args.backend,
+        update_callback=on_frame,
+        pacing=PACING_NONE,
+        inference_width=args.inference_width,
+        draw_overlay=not args.no_overlay,
+        roi_crop=args.roi,
+        source=source
+    )
+    tracker.stage_log = {}
+
+    start = time.perf_counter()
+    tracker.start()
+    tracker.wait()
+    elapsed = time.perf_counter() - start
+
+    frames = tracker.frames_processed
+    print(f"Source: {args.source}")
+    print(f"Options: backend={args.backend} inference_width={args.inference_width} "
+          f"overlay={not args.no_overlay} roi={args.roi}")
+    print(f"Frames: {frames} in {elapsed:.2f} s -> {frames / elapsed if elapsed else 0:.1f} FPS")
+    if getattr(tracker, "frames_dropped", 0):
+        print(f"Dropped: {tracker.frames_dropped} frames")
+
+    print(f"{'stage':<10} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    for stage, samples in tracker.stage_log.items():
+        print(f"{stage:<10} {percentile(samples, 50):8.2f} {percentile(samples, 95):8.2f} "
+              f"{sum(samples) / len(samples):8.2f}")
+
+    print("Shapes:")
+    for shape, count in Counter(shapes).most_common():
+        print(f"  {shape:<20} {count:5d} frames")
+    if args.timeline:
+        for first, last, shape in shape_timeline(shapes):
+            print(f"  frames {first:5d}-{last:5d}: {shape}")
+
+    if args.save_landmarks:
+        save_landmark_stream(args.save_landmarks, landmark_records)
+        print(f"Saved landmark stream to {args.save_landmarks}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", help="video file, image directory, landmark stream (.jsonl) or camera index")
+    parser.add_argument("--backend", choices=[BACKEND_THREAD, BACKEND_PROCESS], default=BACKEND_THREAD)
+    parser.add_argument("--inference-width", type=int, default=None)
+    parser.add_argument("--no-overlay", action="store_true")
+    parser.add_argument("--roi", action="store_true")
+    parser.add_argument("--timeline", action="store_true", help="print the shape for every run of frames")
+    parser.add_argument("--save-landmarks", default=None, help="write the tracked landmarks as a replay stream")
+    run(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,8 @@ source.dir = .
 source.include_exts = py,png,jpg,kv,atlas
 
 # (list) List of inclusions using pattern matching
-#source.include_patterns = assets/*,images/*.png
+# assets/vosk-model: offline speech model, see VOSK_MODEL_PATH in engine/speech.py
+source.include_patterns = assets/vosk-model/*
 
 # (list) Source files to exclude (let empty to not exclude anything)
 #source.exclude_exts = spec
@@ -37,7 +38,7 @@ version = 0.1
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3, kivy, mediapipe, opencv-python, sqlite3
+requirements = python3, kivy, mediapipe, opencv-python, sqlite3, vosk
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
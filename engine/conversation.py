@@ -1,20 +1,59 @@
-import speech_recognition as sr
+import os
 import pyttsx3
 import threading
+import time
+from collections import Counter
 from kivy.clock import Clock
+from kivy.core.audio import SoundLoader
+
+from engine.tts import TTSWorker, PRIORITY_CHAT, PRIORITY_SOS
+from engine.phrase_audio import PhraseAudioCache
+from engine.speech import create_recognizer, StreamingTranscriber, MicrophoneSource
+
+# Spoken from SOSScreen; rendered to WAV at startup so they play instantly
+EMERGENCY_PHRASES = ("police", "doctor", "fire", "help me")
+# Chat phrases are rendered once they have been spoken this many times
+FREQUENT_PHRASE_USES = 3
+# Distinct chat phrases counted before all counts are halved (and the ones
+# that drop to zero forgotten), so one-off sentences do not pile up
+MAX_COUNTED_PHRASES = 512
 
 class ConversationManager:
-    def __init__(self, on_speech_recognized=None):
+    def __init__(self, on_speech_recognized=None, recognizer_backend=None):
+        """
+        recognizer_backend: engine.speech backend name; offline Vosk when its
+            model is installed, Google otherwise.
+        """
         self.mixer = None
         self.on_speech_recognized = on_speech_recognized
+        # Optional on_partial_speech(text) while the user is still talking
+        # (streaming backends only), called on the main thread
+        self.on_partial_speech = None
+        # Optional on_speech_abandoned() when an utterance ends without text
+        self.on_speech_abandoned = None
         
         # Initialize TTS
         self.tts_engine = pyttsx3.init()
         self._configure_voice()
+        # Every utterance goes through one worker thread: the pyttsx3 engine
+        # is not safe to drive from several threads at once
+        self.tts = TTSWorker(self._say, interrupt=self._stop_output, audio_start_events=True)
+        self.tts_engine.connect('started-utterance', lambda name: self.tts.on_audio_started())
+
+        # Pre-rendered phrases play from WAV instead of being synthesized
+        self.phrase_audio = PhraseAudioCache(
+            voice=self.tts_engine.getProperty('voice'),
+            rate=self.tts_engine.getProperty('rate')
+        )
+        self._phrase_uses = Counter()
+        self._sounds = {}
+        self._current_sound = None
+        self._interrupted = threading.Event()
+        self.prewarm_phrases(EMERGENCY_PHRASES, pin=True)
         
         # Initialize Speech Recognition
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.recognizer = create_recognizer(recognizer_backend)
+        self.transcriber = None
         self.is_listening = False
         self.listen_thread = None
 
@@ -34,17 +73,91 @@ class ConversationManager:
             # Fallback to default
             print("South African voice not found, using default.")
 
-    def speak(self, text):
-        """Text-to-Speech (Sign-to-Voice)"""
-        # Run in a separate thread to not block UI
-        threading.Thread(target=self._speak_thread, args=(text,), daemon=True).start()
+    def speak(self, text, priority=PRIORITY_CHAT):
+        """Text-to-Speech (Sign-to-Voice). Queued; never blocks the UI."""
+        phrase = self.phrase_audio.normalize(text)
+        self._phrase_uses[phrase] += 1
+        if self._phrase_uses[phrase] == FREQUENT_PHRASE_USES:
+            self.prewarm_phrases([text])
+        if len(self._phrase_uses) > MAX_COUNTED_PHRASES:
+            self._phrase_uses = Counter({p: n // 2 for p, n in self._phrase_uses.items() if n // 2})
+        return self.tts.say(text, priority)
 
-    def _speak_thread(self, text):
-        try:
-            self.tts_engine.say(text)
+    def speak_emergency(self, text):
+        """Spoken ahead of (and interrupting) any chat."""
+        return self.speak(text, PRIORITY_SOS)
+
+    def prewarm_phrases(self, phrases, pin=False):
+        """Renders phrases to the audio cache in the background (TTS thread, idle time)."""
+        for text in phrases:
+            if text not in self.phrase_audio:
+                self.tts.submit(lambda text=text: self._render_phrase(text, pin))
+            elif pin:
+                self.phrase_audio.pin(text)
+                self.tts.submit(lambda text=text: self._load_sound(self.phrase_audio.get(text)))
+
+    def _render_phrase(self, text, pin):
+        def render(path):
+            self._interrupted.clear()
+            self.tts_engine.save_to_file(text, path)
             self.tts_engine.runAndWait()
-        except Exception as e:
-            print(f"TTS Error: {e}")
+            if self._interrupted.is_set() and os.path.exists(path):
+                # Stopped mid-render: never cache (or pin) a truncated WAV
+                os.remove(path)
+        path = self.phrase_audio.render(text, render, pin=pin)
+        if path and pin:
+            # Keep the SOS set decoded in memory as well
+            self._load_sound(path)
+
+    def cancel_speech(self, priority=None):
+        self.tts.cancel(priority)
+
+    def flush_speech(self, timeout=None):
+        return self.tts.flush(timeout)
+
+    def tts_stats(self):
+        stats = self.tts.stats()
+        stats["phrase_audio"] = self.phrase_audio.stats()
+        return stats
+
+    def _say(self, text):
+        # Runs on the TTS worker thread only
+        path = self.phrase_audio.get(text)
+        if path and self._play_file(path):
+            return
+        self.tts_engine.say(text)
+        self.tts_engine.runAndWait()
+
+    def _load_sound(self, path):
+        if path and path not in self._sounds:
+            sound = SoundLoader.load(path)
+            if sound:
+                self._sounds[path] = sound
+
+    def _play_file(self, path):
+        """Plays a cached phrase and blocks until it ends or is interrupted."""
+        sound = self._sounds.get(path) or SoundLoader.load(path)
+        if not sound:
+            return False
+        self._interrupted.clear()
+        self._current_sound = sound
+        sound.play()
+        self.tts.on_audio_started()
+
+        deadline = time.perf_counter() + (sound.length or 0) + 0.5
+        while sound.state == 'play' and time.perf_counter() < deadline:
+            if self._interrupted.wait(0.02):
+                sound.stop()
+                break
+        self._current_sound = None
+        return True
+
+    def _stop_output(self):
+        self._interrupted.set()
+        sound = self._current_sound
+        if sound:
+            sound.stop()
+        self.tts_engine.stop()
 
     def start_listening(self):
         """Voice-to-Sign Listener"""
@@ -57,28 +170,49 @@ class ConversationManager:
         self.is_listening = False
 
     def _listen_loop(self):
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source)
-            print("Listening...")
-            
-            while self.is_listening:
-                try:
-                    audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=5)
-                    text = self.recognizer.recognize_google(audio)
-                    print(f"Heard: {text}")
-                    
-                    if self.on_speech_recognized:
-                        # Schedule callback on main thread
-                        Clock.schedule_once(lambda dt: self.on_speech_recognized(text))
-                        
-                except sr.WaitTimeoutError:
-                    continue
-                except sr.UnknownValueError:
-                    pass
-                except Exception as e:
-                    print(f"Speech Error: {e}")
-                    if not self.is_listening:
-                        break
+        source = MicrophoneSource()
+        try:
+            source.open()
+        except Exception as e:
+            print(f"Microphone Error: {e}")
+            self.is_listening = False
+            return
+
+        # Endpointing is done on our side (energy VAD over 30 ms chunks), so
+        # a phrase ends ~0.5 s after the last word instead of on a fixed timeout
+        self.transcriber = StreamingTranscriber(
+            self.recognizer,
+            on_partial=self._on_partial,
+            on_final=self._on_final,
+            on_abandoned=self._on_abandoned
+        )
+        print("Listening...")
+
+        while self.is_listening:
+            try:
+                ret, chunk = source.read()
+                if ret:
+                    self.transcriber.feed(chunk)
+            except Exception as e:
+                print(f"Speech Error: {e}")
+                if not self.is_listening:
+                    break
+        source.release()
+
+    def _on_partial(self, text):
+        if self.on_partial_speech:
+            Clock.schedule_once(lambda dt: self.on_partial_speech(text))
+
+    def _on_abandoned(self):
+        # Speech ended without a transcript: listeners drop partial state
+        if self.on_speech_abandoned:
+            Clock.schedule_once(lambda dt: self.on_speech_abandoned())
+
+    def _on_final(self, text):
+        print(f"Heard: {text} ({self.transcriber.last_latency * 1000:.0f} ms after speech)")
+        if self.on_speech_recognized:
+            # Schedule callback on main thread
+            Clock.schedule_once(lambda dt: self.on_speech_recognized(text))
 
 if __name__ == "__main__":
     def callback(text):
@@ -86,4 +220,6 @@ if __name__ == "__main__":
 
     cm = ConversationManager(on_speech_recognized=callback)
     cm.speak("Hello from South Africa")
+    cm.flush_speech(timeout=10)
+    print(cm.tts_stats())
     # cm.start_listening() # Requires microphone
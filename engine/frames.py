@@ -0,0 +1,37 @@
+import threading
+
+class LatestFrameSlot:
+    """
+    Single-slot, latest-frame-wins handoff between a producer thread (the
+    tracker) and the UI thread.
+
+    put() overwrites whatever the consumer has not taken yet, so a slow UI
+    only ever sees the newest frame and never builds up a backlog. put()
+    returns True when the slot was empty, i.e. when the consumer needs to be
+    woken up (one pending Clock callback at most).
+    """
+    def __init__(self):
+        self._item = None
+        self._lock = threading.Lock()
+        self.delivered = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._lock:
+            was_empty = self._item is None
+            if not was_empty:
+                self.dropped += 1
+            self._item = item
+        return was_empty
+
+    def take(self):
+        with self._lock:
+            item = self._item
+            self._item = None
+            if item is not None:
+                self.delivered += 1
+        return item
+
+    def stats(self):
+        with self._lock:
+            return {"delivered": self.delivered, "dropped": self.dropped}
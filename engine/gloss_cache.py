@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'gloss_cache.json')
+
+class GlossCache:
+    """
+    Bounded LRU cache of to_gloss results keyed by the normalized sentence.
+
+    `version` should identify everything the cached output depends on
+    (grammar rule version + spaCy model version). A persisted cache written
+    under a different version is discarded on load.
+    """
+    def __init__(self, max_size=512, version="", path=None):
+        self.max_size = max_size
+        self.version = version
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.path:
+            self.load()
+
+    @staticmethod
+    def normalize(sentence):
+        # Collapse whitespace only: case and punctuation change the gloss
+        return " ".join(sentence.split())
+
+    def get(self, sentence):
+        key = self.normalize(sentence)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return self._copy(result)
+
+    def put(self, sentence, result):
+        key = self.normalize(sentence)
+        with self._lock:
+            self._entries[key] = self._copy(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Gloss cache load error: {e}")
+            return
+
+        if data.get("version") != self.version:
+            # Grammar rules or spaCy model changed: cached glosses are stale
+            print("Gloss cache version changed, starting cold.")
+            return
+
+        with self._lock:
+            self._entries.clear()
+            # Entries are stored oldest first, so LRU order is preserved
+            for key, result in data.get("entries", [])[-self.max_size:]:
+                self._entries[key] = result
+
+    def save(self):
+        if not self.path:
+            return
+        cache_dir = os.path.dirname(self.path)
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        with self._lock:
+            data = {
+                "version": self.version,
+                "entries": [[key, result] for key, result in self._entries.items()]
+            }
+
+        # Write to a temp file first so a crash never leaves a torn cache
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _copy(result):
+        return {"gloss": list(result["gloss"]), "facial_marker": result["facial_marker"]}
@@ -1,14 +1,81 @@
 import spacy
+from spacy.language import Language
+from bisect import bisect_right
+from collections import Counter, deque, namedtuple
+
+from engine.gloss_cache import GlossCache, CACHE_PATH
+
+SPACY_MODEL = "en_core_web_sm"
+
+# Bump whenever the gloss rules below change, so cached glosses are dropped
+GRAMMAR_VERSION = 1
+
+# The gloss rules only read lemma_, ent_type_, is_punct and text.
+# Lemmas need tagger + attribute_ruler, time words need ner; the
+# dependency parser (and the disabled senter) are never used.
+LEAN_EXCLUDE = ["parser", "senter"]
+TIME_ENTITY_LABELS = ("DATE", "TIME")
+
+WH_WORDS = ('who', 'what', 'where', 'when', 'why', 'how')
+# Lemmas of is, am, are, was, were, the, a, an
+NOISE_LEMMAS = ('be', 'the', 'a', 'an')
+
+# The token attributes the gloss rules read, kept for frozen words of a
+# GlossSession so they are never re-analyzed
+TokenRecord = namedtuple("TokenRecord", "text lemma_ ent_type_ is_punct")
+
+@Language.component("sasl_time_entities")
+def keep_time_entities(doc):
+    """Drops every entity except DATE/TIME (the only ones the rules use)."""
+    doc.ents = [ent for ent in doc.ents if ent.label_ in TIME_ENTITY_LABELS]
+    return doc
 
 class SASLGrammarEngine:
-    def __init__(self):
+    def __init__(self, lean=True, cache_size=512, persist_cache=False):
+        """
+        lean=True loads only the components the gloss rules need, which
+        cuts per-utterance latency and memory on low-end devices.
+        lean=False loads the full en_core_web_sm pipeline.
+
+        cache_size bounds the LRU gloss cache (0 disables it).
+        persist_cache=True keeps the cache in data/ across app restarts.
+        """
+        self.lean = lean
         try:
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = self._load_model()
         except OSError:
             print("Downloading spacy model...")
             from spacy.cli import download
-            download("en_core_web_sm")
-            self.nlp = spacy.load("en_core_web_sm")
+            download(SPACY_MODEL)
+            self.nlp = self._load_model()
+
+        self.cache = None
+        if cache_size > 0:
+            self.cache = GlossCache(
+                max_size=cache_size,
+                version=self._cache_version(),
+                path=CACHE_PATH if persist_cache else None
+            )
+
+    def _load_model(self):
+        if not self.lean:
+            return spacy.load(SPACY_MODEL)
+
+        nlp = spacy.load(SPACY_MODEL, exclude=LEAN_EXCLUDE)
+        if "ner" in nlp.pipe_names:
+            nlp.add_pipe("sasl_time_entities", after="ner")
+        return nlp
+
+    def _cache_version(self):
+        meta = self.nlp.meta
+        return f"grammar-{GRAMMAR_VERSION}/{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}"
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache else None
+
+    def save_cache(self):
+        if self.cache:
+            self.cache.save()
 
     def to_gloss(self, sentence):
         """
@@ -20,43 +87,100 @@ class SASLGrammarEngine:
         3. Remove noise words (is, am, the, a).
         4. Verbs are uninflected (GO not WENT).
         """
+        if self.cache:
+            cached = self.cache.get(sentence)
+            if cached is not None:
+                return cached
+
         doc = self.nlp(sentence)
-        tokens = [token for token in doc]
-        
-        # 1. Identify and extract Time words
-        time_words = []
-        other_tokens = []
-        for token in tokens:
-            if token.ent_type_ == "DATE" or token.ent_type_ == "TIME":
-                time_words.append(token.lemma_.upper())
-            else:
-                other_tokens.append(token)
-        
-        # 2. Check for WH-Question and move to end
-        wh_words = ['who', 'what', 'where', 'when', 'why', 'how']
-        wh_token = None
-        current_tokens = []
-        
-        for token in other_tokens:
-            if token.text.lower() in wh_words:
-                wh_token = token
-            else:
-                current_tokens.append(token)
-        
-        # 3. Filter noise words and get lemmas
+        result = self._gloss_from_tokens(doc, sentence)
+        if self.cache:
+            self.cache.put(sentence, result)
+        return result
+
+    def to_gloss_many(self, sentences, batch_size=64, n_process=1):
+        """
+        Streams SASL Gloss for many sentences (transcripts, subtitle files).
+
+        Built on nlp.pipe so spaCy batches the work instead of paying the
+        per-call overhead of to_gloss. Results are yielded in input order,
+        including when n_process > 1 spreads batches over worker processes.
+        """
+        if not self.cache:
+            docs = self.nlp.pipe(sentences, batch_size=batch_size, n_process=n_process)
+            for doc in docs:
+                # doc.text is the unmodified input sentence
+                yield self._gloss_from_tokens(doc, doc.text)
+            return
+
+        # Only cache misses go through spaCy. `order` remembers every input
+        # (with its cached result, or None for a miss) so output keeps input order.
+        order = deque()
+
+        def misses():
+            for sentence in sentences:
+                cached = self.cache.get(sentence)
+                order.append(cached)
+                if cached is None:
+                    yield sentence
+
+        docs = self.nlp.pipe(misses(), batch_size=batch_size, n_process=n_process)
+        for doc in docs:
+            cached = order.popleft()
+            while cached is not None:
+                yield cached
+                cached = order.popleft()
+
+            result = self._gloss_from_tokens(doc, doc.text)
+            self.cache.put(doc.text, result)
+            yield result
+
+        # Cached sentences after the last miss
+        while order:
+            yield order.popleft()
+
+    def start_session(self, context_words=4):
+        """Incremental translation of one utterance from partial transcripts."""
+        return GlossSession(self, context_words=context_words)
+
+    @staticmethod
+    def _classify_token(token):
+        """Returns ("time" | "wh" | "word", GLOSS) or (None, None) for noise."""
+        # Time words (moved to the front)
+        if token.ent_type_ in TIME_ENTITY_LABELS:
+            return "time", token.lemma_.upper()
+        # WH-words (moved to the end)
+        if token.text.lower() in WH_WORDS:
+            return "wh", token.lemma_.upper()
         # NOISE: is, am, are, was, were, the, a, an
-        noise_words = ['be', 'the', 'a', 'an']
+        if token.lemma_.lower() in NOISE_LEMMAS or token.is_punct:
+            return None, None
+        # Verbs are uninflected: lemma
+        return "word", token.lemma_.upper()
+
+    def _gloss_from_tokens(self, tokens, sentence):
+        """
+        tokens: spaCy tokens, or TokenRecords (same attribute names) frozen by
+        a GlossSession.
+        """
+        time_words = []
         meaningful_tokens = []
-        for token in current_tokens:
-            if token.lemma_.lower() not in noise_words and not token.is_punct:
-                meaningful_tokens.append(token.lemma_.upper())
+        wh_word = None
+        for token in tokens:
+            kind, gloss = self._classify_token(token)
+            if kind == "time":
+                time_words.append(gloss)
+            elif kind == "wh":
+                wh_word = gloss
+            elif kind == "word":
+                meaningful_tokens.append(gloss)
         
         # Construct Gloss
         gloss = time_words + meaningful_tokens
         
         # Append WH-word if it exists
-        if wh_token:
-            gloss.append(wh_token.lemma_.upper())
+        if wh_word:
+            gloss.append(wh_word)
             facial_marker = "furrowed_brows"
         else:
             # Check if it's a yes/no question (starts with verb usually, but simplified here)
@@ -70,6 +194,148 @@ class SASLGrammarEngine:
             "facial_marker": facial_marker
         }
 
+class GlossSession:
+    """
+    Incremental gloss for one utterance, fed with growing partial transcripts.
+
+    A word counts as stable once it is not the last word of a partial and
+    the previous partial agreed on it; stable words are analyzed one last
+    time and frozen (their spaCy attributes are kept as TokenRecords), and
+    their gloss is emitted right away so the avatar can start signing.
+    Later partials only re-analyze the unstable tail plus `context_words`
+    frozen words of left context, instead of the whole transcript.
+
+    WH-words are held back until finish(), since they are signed last.
+    Frozen words are final: signs already emitted are never retracted.
+    """
+    def __init__(self, engine, context_words=4):
+        self.engine = engine
+        self.context_words = context_words
+        # Words run through spaCy vs. frozen words skipped, over all utterances
+        self.analyzed_words = 0
+        self.reused_words = 0
+        self.reset()
+
+    def reset(self):
+        self.words = []
+        # One list of TokenRecords per frozen word
+        self.frozen = []
+        self.emitted = []
+        self._wh_word = None
+        self._previous = []
+
+    def update(self, partial):
+        """
+        Returns {"new": glosses to sign now, "pending": tentative gloss of
+        the unstable tail}.
+        """
+        words = partial.split()
+        # Common prefix with the previous partial, never the last word
+        stable = 0
+        limit = min(len(words) - 1, len(self._previous))
+        while stable < limit and words[stable] == self._previous[stable]:
+            stable += 1
+        self._previous = words
+
+        start = len(self.frozen)
+        if len(words) <= start:
+            return {"new": [], "pending": []}
+        per_word = self._analyze(words[start:])
+        new = []
+        for word, records in zip(words[start:stable], per_word):
+            self.frozen.append(records)
+            self.words.append(word)
+            new.extend(self._emit(records))
+
+        pending = []
+        for records in per_word[max(0, stable - start):]:
+            for record in records:
+                kind, gloss = self.engine._classify_token(record)
+                if kind in ("time", "word"):
+                    pending.append(gloss)
+        return {"new": new, "pending": pending}
+
+    def finish(self, text):
+        """
+        Final transcript: emits the rest (WH-word last) and returns
+        {"new": ..., "gloss": full gloss, "facial_marker": ...}.
+
+        If the final revised words that were already frozen, the whole text
+        is glossed again with to_gloss and "new" holds whatever has not been
+        signed yet. Only to_gloss results go into the gloss cache: a result
+        assembled from frozen pieces is never cached.
+        """
+        words = text.split()
+        if not words:
+            # Abandoned utterance: nothing to sign, start the next one clean
+            self.reset()
+            return dict(self.engine._gloss_from_tokens([], text), new=[])
+
+        if words[:len(self.words)] != self.words:
+            result = self.engine.to_gloss(text)
+            new = self._unsigned(result["gloss"])
+            self.reset()
+            return dict(result, new=new)
+
+        start = len(self.frozen)
+        new = []
+        for records in self._analyze(words[start:]):
+            self.frozen.append(records)
+            new.extend(self._emit(records))
+        if self._wh_word:
+            new.append(self._wh_word)
+
+        tokens = [record for records in self.frozen for record in records]
+        result = self.engine._gloss_from_tokens(tokens, text)
+        self.reset()
+        return dict(result, new=new)
+
+    def _unsigned(self, glosses):
+        """Glosses not covered by what was already emitted (signs are not retracted)."""
+        remaining = Counter(self.emitted)
+        new = []
+        for gloss in glosses:
+            if remaining[gloss]:
+                remaining[gloss] -= 1
+            else:
+                new.append(gloss)
+        return new
+
+    def _emit(self, records):
+        glosses = []
+        for record in records:
+            kind, gloss = self.engine._classify_token(record)
+            if kind == "wh":
+                self._wh_word = gloss
+            elif kind:
+                glosses.append(gloss)
+        self.emitted.extend(glosses)
+        return glosses
+
+    def _analyze(self, tail):
+        """TokenRecords per word of `tail`, analyzed with some frozen left context."""
+        if not tail:
+            return []
+        context = self.words[-self.context_words:] if self.context_words else []
+        words = context + tail
+        self.analyzed_words += len(words)
+        self.reused_words += len(self.frozen) - len(context)
+
+        # Character offset where each word starts in the joined text
+        starts = []
+        offset = 0
+        for word in words:
+            starts.append(offset)
+            offset += len(word) + 1
+
+        doc = self.engine.nlp(" ".join(words))
+        per_word = [[] for _ in tail]
+        for token in doc:
+            i = bisect_right(starts, token.idx) - 1 - len(context)
+            if i >= 0:
+                per_word[i].append(TokenRecord(token.text, token.lemma_, token.ent_type_, token.is_punct))
+        return per_word
+
 if __name__ == "__main__":
     engine = SASLGrammarEngine()
     test_sentences = [
@@ -85,3 +351,15 @@ if __name__ == "__main__":
         print(f"Gloss: {result['gloss']}")
         print(f"Face:  {result['facial_marker']}")
         print("-" * 20)
+
+    # Batch mode
+    for s, result in zip(test_sentences, engine.to_gloss_many(test_sentences)):
+        print(f"{s} -> {' '.join(result['gloss'])} ({result['facial_marker']})")
+
+    print(f"Cache: {engine.cache_stats()}")
+
+    # Incremental mode: partial transcripts as a streaming recognizer sends them
+    session = engine.start_session()
+    for partial in ["i", "i am", "i am going", "i am going to the", "i am going to the shop"]:
+        print(f"{partial!r:28} -> {session.update(partial)}")
+    print(session.finish("i am going to the shop tomorrow"))
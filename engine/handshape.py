@@ -0,0 +1,90 @@
+import numpy as np
+
+# MediaPipe hand landmark ids
+WRIST = 0
+THUMB_IP, THUMB_TIP = 3, 4
+INDEX_MCP, MIDDLE_MCP, PINKY_MCP = 5, 9, 17
+FINGER_TIPS = np.array([8, 12, 16, 20])
+FINGER_PIPS = np.array([6, 10, 14, 18])
+
+# Bones between landmark ids (same topology as mp_hands.HAND_CONNECTIONS), so
+# landmarks can be drawn without mediapipe in the process
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+# Finger order in masks and state arrays: Thumb, Index, Middle, Ring, Pinky
+FINGER_BITS = 1 << np.arange(5)
+
+HAND_SHAPES = {
+    (0, 1, 1, 1, 1): "Flat Hand (B-Hand)",
+    (0, 1, 1, 0, 0): "V-Shape",
+    (0, 0, 0, 0, 0): "Fist (S-Hand)",
+    (1, 0, 0, 0, 0): "Thumbs Up",
+    (0, 1, 0, 0, 0): "Point (1-Hand)",
+}
+
+def _build_shape_table():
+    table = np.full(32, "Unknown", dtype=object)
+    for fingers, name in HAND_SHAPES.items():
+        table[int(np.dot(fingers, FINGER_BITS))] = name
+    return table
+
+# Bitmask of extended fingers -> shape name
+SHAPE_TABLE = _build_shape_table()
+
+def landmarks_from_results(multi_hand_landmarks, image_size=None):
+    """
+    Packs MediaPipe multi_hand_landmarks into a (n_hands, 21, 3) float32 array.
+
+    image_size=(height, width) scales x/y to pixels so both axes share a unit
+    (normalized coordinates are stretched by the frame's aspect ratio).
+    """
+    landmarks = np.array(
+        [[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in multi_hand_landmarks],
+        dtype=np.float32
+    ).reshape(-1, 21, 3)
+    if image_size is not None:
+        h, w = image_size[:2]
+        landmarks *= np.array([w, h, w], dtype=np.float32)
+    return landmarks
+
+def handedness_from_results(multi_handedness):
+    """Returns [(label, score), ...] ("Left"/"Right", detection confidence) per hand."""
+    if not multi_handedness:
+        return []
+    return [(hand.classification[0].label, hand.classification[0].score) for hand in multi_handedness]
+
+def finger_states(landmarks):
+    """
+    Returns a (n_hands, 5) bool array of extended fingers.
+
+    Checks are made along each hand's own axes instead of image x/y, so they
+    hold for any hand rotation and for left and right hands alike:
+    - fingers: tip is past the PIP joint along the wrist -> middle MCP axis
+    - thumb: tip is farther from the pinky MCP than the thumb IP joint is
+      (a tucked thumb folds back across the palm towards the pinky)
+    """
+    xy = np.asarray(landmarks, dtype=np.float32)[..., :2]
+
+    up = xy[:, MIDDLE_MCP] - xy[:, WRIST]
+    finger_dir = xy[:, FINGER_TIPS] - xy[:, FINGER_PIPS]
+    fingers = np.einsum('hfc,hc->hf', finger_dir, up) > 0
+
+    pinky_base = xy[:, PINKY_MCP]
+    tip_dist = np.linalg.norm(xy[:, THUMB_TIP] - pinky_base, axis=-1)
+    ip_dist = np.linalg.norm(xy[:, THUMB_IP] - pinky_base, axis=-1)
+    thumb = tip_dist > ip_dist
+
+    return np.concatenate([thumb[:, None], fingers], axis=1)
+
+def classify_hand_shapes(landmarks):
+    """Classifies every hand in a (n_hands, 21, 3) array in one pass."""
+    if len(landmarks) == 0:
+        return []
+    masks = finger_states(landmarks) @ FINGER_BITS
+    return list(SHAPE_TABLE[masks])
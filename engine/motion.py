@@ -0,0 +1,369 @@
+import os
+import threading
+
+import numpy as np
+
+from engine.handshape import WRIST, MIDDLE_MCP
+
+# Optional and not shipped: recorded signs are added with TemplateIndex.add()
+# (sequence_features() of each recording) and written here with save().
+# Without the file, moving signs are simply not recognized.
+TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', 'motion_templates.npz')
+
+# Per-frame feature: wrist trajectory (2) + fingertip positions relative to
+# the wrist (5 x 2), both in palm-size units so distance to the camera and
+# hand size do not matter.
+FINGERTIPS = np.array([4, 8, 12, 16, 20])
+FEATURE_DIM = 2 + 2 * len(FINGERTIPS)
+
+# Templates and queries are resampled to this many frames before matching
+SEQUENCE_LENGTH = 24
+# Sakoe-Chiba band (frames) for DTW and the LB_Keogh envelopes
+WARP_WINDOW = 3
+# Coarse summary length used by the template index
+SUMMARY_LENGTH = 6
+# Default coarse_radius: templates whose summary is further than this from
+# the query's are never considered. This is a heuristic, not a lower bound
+# on the DTW distance, so a template can in principle be pruned although it
+# would have matched. On recorded signs the summary distance stayed below
+# about 0.23 of the DTW distance, so 2.0 keeps every template within
+# SequenceRecognizer's max_distance seen so far while ruling out clearly
+# different motions. Pass coarse_radius=None for an exact search.
+COARSE_RADIUS = 2.0
+
+def sequence_features(landmarks, present=None):
+    """
+    (T, 21, 3) pixel landmarks of one hand -> (T, FEATURE_DIM) features.
+    Frames where `present` is False are filled from the nearest earlier
+    frame with a hand (or the first one, for a leading gap).
+    """
+    xy = np.asarray(landmarks, dtype=np.float32)[..., :2]
+    if present is not None and not np.all(present):
+        present = np.asarray(present, dtype=bool)
+        if not present.any():
+            return np.zeros((len(xy), FEATURE_DIM), dtype=np.float32)
+        first = int(np.argmax(present))
+        idx = np.where(present, np.arange(len(present)), first)
+        np.maximum.accumulate(idx, out=idx)
+        xy = xy[idx]
+
+    palm = np.linalg.norm(xy[:, MIDDLE_MCP] - xy[:, WRIST], axis=-1)
+    scale = max(float(np.median(palm)), 1e-6)
+
+    wrist = xy[:, WRIST]
+    trajectory = (wrist - wrist[0]) / scale
+    tips = (xy[:, FINGERTIPS] - wrist[:, None, :]) / scale
+    return np.concatenate([trajectory, tips.reshape(len(xy), -1)], axis=1)
+
+def features_from_recording(recording, start=0, stop=None):
+    """Features for frames [start, stop) of a LandmarkRecording (first hand)."""
+    records = recording[start:stop]
+    return sequence_features(records["landmarks"][:, 0], records["n_hands"] > 0)
+
+def resample(sequence, length=SEQUENCE_LENGTH):
+    """Linearly resamples a (T, D) sequence to (length, D)."""
+    sequence = np.asarray(sequence, dtype=np.float32)
+    if len(sequence) == length:
+        return sequence
+    src = np.linspace(0, len(sequence) - 1, length)
+    lo = np.floor(src).astype(int)
+    hi = np.minimum(lo + 1, len(sequence) - 1)
+    frac = (src - lo)[:, None]
+    return sequence[lo] * (1 - frac) + sequence[hi] * frac
+
+def _band_mask(length, window):
+    i = np.arange(length)
+    return np.abs(i[:, None] - i[None, :]) <= window
+
+def dtw_distances(query, templates, window=WARP_WINDOW):
+    """
+    Banded DTW between one (L, D) query and K (L, D) templates at once.
+
+    The recurrence is evaluated one anti-diagonal at a time: every cell on a
+    diagonal depends only on the two previous diagonals, so each step is a
+    single vectorized update over all templates and all cells on it.
+    """
+    templates = np.asarray(templates, dtype=np.float32)
+    k, length, _ = templates.shape
+    cost = np.linalg.norm(templates[:, :, None, :] - query[None, None, :, :], axis=-1)
+    cost[:, ~_band_mask(length, window)] = np.inf
+
+    acc = np.full((k, length + 1, length + 1), np.inf, dtype=np.float32)
+    acc[:, 0, 0] = 0.0
+    for d in range(2, 2 * length + 1):
+        i = np.arange(max(1, d - length), min(length, d - 1) + 1)
+        j = d - i
+        best = np.minimum(np.minimum(acc[:, i - 1, j], acc[:, i, j - 1]), acc[:, i - 1, j - 1])
+        acc[:, i, j] = cost[:, i - 1, j - 1] + best
+    return acc[:, length, length]
+
+def keogh_envelopes(templates, window=WARP_WINDOW):
+    """Upper/lower LB_Keogh envelopes, (K, L, D) each."""
+    templates = np.asarray(templates, dtype=np.float32)
+    length = templates.shape[1]
+    upper = np.empty_like(templates)
+    lower = np.empty_like(templates)
+    for t in range(length):
+        lo, hi = max(0, t - window), min(length, t + window + 1)
+        upper[:, t] = templates[:, lo:hi].max(axis=1)
+        lower[:, t] = templates[:, lo:hi].min(axis=1)
+    return upper, lower
+
+def lb_keogh(query, upper, lower):
+    """
+    Lower bound of the banded DTW distance for every template.
+
+    Each query frame has to be matched to some template frame inside the
+    warping window, and that frame lies inside the envelope box; the
+    distance from the query frame to the box can only be smaller.
+    """
+    above = np.maximum(query[None] - upper, 0)
+    below = np.maximum(lower - query[None], 0)
+    return np.linalg.norm(above + below, axis=-1).sum(axis=1)
+
+class VPTree:
+    """
+    Vantage-point tree over fixed-length vectors (Euclidean distance).
+
+    Every node splits its points in half by distance to a vantage point: the
+    closer half goes inside (all within inner_radius of it), the rest outside
+    (all at least outer_radius away). A range query only descends into a
+    side the triangle inequality can not rule out, so far-away parts of the
+    vocabulary are never visited. Leaves hold up to leaf_size points,
+    compared in one vectorized step.
+
+    `evaluations` counts point distances computed by queries.
+    """
+    def __init__(self, points, leaf_size=8):
+        self.points = np.asarray(points, dtype=np.float32)
+        self.leaf_size = leaf_size
+        self.evaluations = 0
+        # Leaf: (ids,); inner node: (vantage, inner_radius, outer_radius, inside, outside)
+        self._nodes = []
+        self.root = self._build(np.arange(len(self.points))) if len(self.points) else None
+
+    def _build(self, ids):
+        node = len(self._nodes)
+        if len(ids) <= self.leaf_size:
+            self._nodes.append((ids,))
+            return node
+        self._nodes.append(None)
+        # Vantage: the point furthest from the node's centroid (a corner of
+        # the set separates it better than a central point)
+        centroid = self.points[ids].mean(axis=0)
+        vantage = ids[int(np.argmax(np.linalg.norm(self.points[ids] - centroid, axis=-1)))]
+        rest = ids[ids != vantage]
+        dists = np.linalg.norm(self.points[rest] - self.points[vantage], axis=-1)
+        order = np.argsort(dists, kind="stable")
+        half = len(rest) // 2
+        inside = self._build(rest[order[:half]])
+        outside = self._build(rest[order[half:]])
+        self._nodes[node] = (vantage, float(dists[order[half - 1]]), float(dists[order[half]]),
+                             inside, outside)
+        return node
+
+    def range_search(self, query, radius):
+        """Ids of all points within radius of query."""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = self._nodes[stack.pop()]
+            if len(node) == 1:
+                ids = node[0]
+                self.evaluations += len(ids)
+                dists = np.linalg.norm(self.points[ids] - query, axis=-1)
+                found.extend(ids[dists <= radius])
+                continue
+            vantage, inner_radius, outer_radius, inside, outside = node
+            self.evaluations += 1
+            d = float(np.linalg.norm(self.points[vantage] - query))
+            if d <= radius:
+                found.append(vantage)
+            # d(q,t) >= d(q,v) - d(t,v) inside, and >= d(t,v) - d(q,v) outside
+            if d - inner_radius <= radius:
+                stack.append(inside)
+            if outer_radius - d <= radius:
+                stack.append(outside)
+        return np.array(sorted(found), dtype=int)
+
+class TemplateIndex:
+    """
+    Per-gloss motion templates with precomputed LB_Keogh envelopes and a
+    vantage-point tree over coarse summaries.
+
+    Matching first collects the templates whose coarse summary lies within
+    coarse_radius of the query's from the VP-tree (only the tree nodes the
+    triangle inequality can not rule out are visited), then prunes those
+    with LB_Keogh, and only runs full DTW on the surviving candidates in
+    increasing lower-bound order, stopping once no bound can beat the best
+    distance found.
+
+    After each match, coarse_evaluations and dtw_evaluations hold the number
+    of summary and DTW distances it computed.
+    """
+    def __init__(self, window=WARP_WINDOW, leaf_size=8):
+        self.window = window
+        self.leaf_size = leaf_size
+        self.glosses = []
+        self._sequences = []
+        self._dirty = True
+        self.coarse_evaluations = 0
+        self.dtw_evaluations = 0
+
+    def add(self, gloss, sequence):
+        """sequence: (T, FEATURE_DIM) features (see sequence_features)."""
+        self.glosses.append(gloss)
+        self._sequences.append(resample(sequence))
+        self._dirty = True
+
+    def __len__(self):
+        return len(self.glosses)
+
+    def build(self):
+        self.templates = np.stack(self._sequences) if self._sequences else \
+            np.zeros((0, SEQUENCE_LENGTH, FEATURE_DIM), dtype=np.float32)
+        self.upper, self.lower = keogh_envelopes(self.templates, self.window)
+        self.summaries = self._summarize(self.templates)
+        self.tree = VPTree(self.summaries, self.leaf_size)
+        self._dirty = False
+
+    @staticmethod
+    def _summarize(sequences):
+        """Piecewise aggregate of each sequence, flattened (K, SUMMARY_LENGTH * D)."""
+        k, length, dim = sequences.shape
+        segments = np.array_split(np.arange(length), SUMMARY_LENGTH)
+        return np.stack([sequences[:, seg].mean(axis=1) for seg in segments], axis=1).reshape(k, -1)
+
+    def match(self, query, max_distance=np.inf, coarse_radius=COARSE_RADIUS):
+        """
+        Returns (gloss, dtw_distance) of the best template within
+        max_distance, or (None, inf).
+
+        coarse_radius limits candidates to templates whose coarse summary is
+        within that distance of the query's (VP-tree range search); None
+        disables that stage and bounds every template.
+        """
+        if self._dirty:
+            self.build()
+        self.coarse_evaluations = 0
+        self.dtw_evaluations = 0
+        if not len(self.templates):
+            return None, np.inf
+
+        query = resample(query)
+        candidates = np.arange(len(self.templates))
+
+        if coarse_radius is not None:
+            summary = self._summarize(query[None])[0]
+            evaluations = self.tree.evaluations
+            candidates = self.tree.range_search(summary, coarse_radius)
+            self.coarse_evaluations = self.tree.evaluations - evaluations
+            if not len(candidates):
+                return None, np.inf
+
+        bounds = lb_keogh(query, self.upper[candidates], self.lower[candidates])
+        order = np.argsort(bounds)
+        best_gloss, best_dist = None, max_distance
+
+        # DTW in small batches of the most promising candidates
+        batch = 4
+        for start in range(0, len(order), batch):
+            chunk = order[start:start + batch]
+            if bounds[chunk[0]] >= best_dist:
+                break
+            chunk = chunk[bounds[chunk] < best_dist]
+            dists = dtw_distances(query, self.templates[candidates[chunk]], self.window)
+            self.dtw_evaluations += len(chunk)
+            i = int(np.argmin(dists))
+            if dists[i] < best_dist:
+                best_dist = float(dists[i])
+                best_gloss = self.glosses[candidates[chunk[i]]]
+        return best_gloss, best_dist
+
+    def save(self, path):
+        np.savez_compressed(path, glosses=np.array(self.glosses), templates=np.stack(self._sequences))
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        index = cls(**kwargs)
+        data = np.load(path)
+        for gloss, sequence in zip(data["glosses"], data["templates"]):
+            index.add(str(gloss), sequence)
+        index.build()
+        return index
+
+class SequenceRecognizer:
+    """
+    Recognizes moving signs (HELLO, HELP-ME, THANK_YOU, ...) from the last
+    `window_frames` frames of landmarks.
+
+    push() is called on the tracker thread for every frame; it only copies
+    the frame into a ring buffer, and runs a match every `stride` frames.
+    Matches are reported through on_match(gloss, distance).
+    """
+    def __init__(self, index, window_frames=30, stride=5, max_distance=8.0,
+                 coarse_radius=COARSE_RADIUS, cooldown_frames=15, on_match=None):
+        self.index = index
+        self.window_frames = window_frames
+        self.stride = stride
+        self.max_distance = max_distance
+        self.coarse_radius = coarse_radius
+        self.cooldown_frames = cooldown_frames
+        self.on_match = on_match
+
+        self._buffer = np.zeros((window_frames, 21, 3), dtype=np.float32)
+        self._present = np.zeros(window_frames, dtype=bool)
+        self._head = 0
+        self._count = 0
+        self._since_match = cooldown_frames
+        self._lock = threading.Lock()
+        self.last_match = (None, np.inf)
+
+    def on_landmarks(self, timestamp, landmarks, shapes):
+        """TrackingService landmark listener."""
+        self.push(landmarks)
+
+    def reset(self):
+        with self._lock:
+            self._present[:] = False
+            self._head = 0
+            self._count = 0
+
+    def push(self, landmarks):
+        """landmarks: (n_hands, 21, 3) pixel landmarks or None; the first hand is used."""
+        with self._lock:
+            if landmarks is not None and len(landmarks):
+                self._buffer[self._head] = landmarks[0]
+                self._present[self._head] = True
+            else:
+                self._present[self._head] = False
+            self._head = (self._head + 1) % self.window_frames
+            self._count += 1
+            self._since_match += 1
+
+            if self._count < self.window_frames or self._count % self.stride:
+                return None
+            if self._since_match < self.cooldown_frames:
+                return None
+            # Oldest frame first
+            order = (np.arange(self.window_frames) + self._head) % self.window_frames
+            frames = self._buffer[order]
+            present = self._present[order]
+
+        # Needs the hand in most of the window to be a sign at all
+        if present.mean() < 0.6:
+            return None
+
+        gloss, distance = self.index.match(
+            sequence_features(frames, present),
+            max_distance=self.max_distance,
+            coarse_radius=self.coarse_radius
+        )
+        self.last_match = (gloss, distance)
+        if gloss is None:
+            return None
+
+        self._since_match = 0
+        if self.on_match:
+            self.on_match(gloss, distance)
+        return gloss
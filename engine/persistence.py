@@ -1,22 +1,98 @@
 import sqlite3
 import os
+import queue
+import threading
+import time
+
+from engine.review import sm2, mastery_level, DEFAULT_EASE
 
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'user_stats.db')
+# How long the writer waits for more updates before committing a batch
+BATCH_INTERVAL_S = 0.5
+MAX_BATCH = 256
+# Bound parameters per "IN (...)" query (SQLite's default limit is 999)
+MAX_QUERY_PARAMS = 500
+# A batch finding the database busy or locked is retried this many times,
+# RETRY_DELAY_S apart (growing), before its writes are split up
+WRITE_RETRIES = 3
+RETRY_DELAY_S = 0.1
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",      # readers never block the writer thread
+    "PRAGMA synchronous=NORMAL",    # WAL is still crash-safe, without an fsync per commit
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-2048",      # 2 MB page cache, enough for low-end devices
+    "PRAGMA busy_timeout=5000",
+)
+
+def _is_busy(error):
+    """True for SQLITE_BUSY / SQLITE_LOCKED, the only errors worth retrying."""
+    code = getattr(error, "sqlite_errorcode", None)  # Python 3.11+
+    if code is not None:
+        # Extended codes (SQLITE_BUSY_SNAPSHOT, ...) keep the primary code in the low byte
+        return code & 0xff in (5, 6)
+    message = str(error)
+    return "locked" in message or "busy" in message
+
+def _timestamp(seconds=None):
+    # Same format as SQLite's CURRENT_TIMESTAMP (UTC); sorts chronologically
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(seconds))
 
 class PersistenceManager:
-    def __init__(self):
+    """
+    User progress and offline feedback in SQLite (data/user_stats.db).
+
+    Practice attempts are appended to practice_events; triggers keep
+    per-sign (sign_stats) and per-category (category_stats) totals current,
+    including how many signs of each category are learning/mastered.
+
+    Reviews are scheduled with SM-2 (engine.review): each mastery row keeps
+    its ease, interval and due_at, and an index on (due_at, sign_name) lets
+    get_due_signs read the next signs to practise with a range scan.
+
+    One instance is shared by the whole app (engines.get("persistence")) and
+    may be used from any thread: the connection runs in WAL mode and is
+    guarded by a lock. With write_behind, update_mastery, log_practice and
+    queue_feedback only enqueue; a writer thread groups them into one
+    transaction per batch (repeated updates of a sign collapse into one row
+    write). A batch that finds the database busy is retried; if it still
+    fails its writes go in one at a time, so a bad write is dropped (and
+    counted in stats()) on its own. Reads flush pending writes first, and
+    close() (App.on_stop) flushes before closing.
+    """
+    def __init__(self, db_path=DB_PATH, write_behind=True,
+                 batch_interval=BATCH_INTERVAL_S, max_batch=MAX_BATCH):
+        self.db_path = db_path
         self._ensure_db_dir()
-        self.conn = sqlite3.connect(DB_PATH)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        for pragma in PRAGMAS:
+            self.conn.execute(pragma)
         self._init_schema()
 
+        self.batch_interval = batch_interval
+        self.max_batch = max_batch
+        self.batches = 0
+        self.writes = 0
+        self.dropped = 0
+        # Last error that kept a batch from being written in full (None once one is)
+        self.write_error = None
+        self._queue = queue.Queue()
+        self._writer_done = False
+        self._close_on_exit = False
+        self._writer = None
+        if write_behind:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+
     def _ensure_db_dir(self):
-        db_dir = os.path.dirname(DB_PATH)
+        db_dir = os.path.dirname(os.path.abspath(self.db_path))
         if not os.path.exists(db_dir):
             os.makedirs(db_dir)
 
     def _init_schema(self):
         cursor = self.conn.cursor()
-        
+
         # User Mastery Table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS mastery (
@@ -26,7 +102,20 @@ class PersistenceManager:
                 last_practiced TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
-        
+        # Spaced-repetition state (added to databases that predate it)
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(mastery)")}
+        for name, declaration in (("due_at", "TIMESTAMP"),
+                                  ("ease", f"REAL NOT NULL DEFAULT {DEFAULT_EASE}"),
+                                  ("interval_days", "REAL NOT NULL DEFAULT 0"),
+                                  ("repetitions", "INTEGER NOT NULL DEFAULT 0")):
+            if name not in columns:
+                cursor.execute(f"ALTER TABLE mastery ADD COLUMN {name} {declaration}")
+        if "due_at" not in columns:
+            # Everything practised so far is due for review
+            cursor.execute("UPDATE mastery SET due_at = COALESCE(last_practiced, CURRENT_TIMESTAMP)")
+        # Covering index for the due queue: no table lookups in get_due_signs
+        cursor.execute("CREATE INDEX IF NOT EXISTS mastery_due ON mastery (due_at, sign_name)")
+
         # Feedback Cache Table (for offline feedback submission)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS feedback_queue (
@@ -38,46 +127,425 @@ class PersistenceManager:
                 synced BOOLEAN DEFAULT 0
             )
         ''')
-        
-        self.conn.commit()
 
-    def update_mastery(self, sign_name, level):
-        cursor = self.conn.cursor()
+        # Practice history: one row per attempt detected by the tracker.
+        # correct is NULL for attempts without a target sign (free practice)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS practice_events (
+                id INTEGER PRIMARY KEY,
+                sign_name TEXT NOT NULL,
+                category TEXT NOT NULL DEFAULT '',
+                detected_shape TEXT,
+                confidence REAL,
+                correct INTEGER,
+                practiced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS practice_events_by_sign ON practice_events (sign_name, practiced_at)")
+
+        # Aggregates kept up to date by the triggers below, so dashboards
+        # read a few rows however long the history is. graded counts the
+        # attempts that had a target (correct is out of graded, not attempts)
         cursor.execute('''
-            INSERT INTO mastery (sign_name, level, last_practiced)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
+            CREATE TABLE IF NOT EXISTS sign_stats (
+                sign_name TEXT PRIMARY KEY,
+                category TEXT NOT NULL DEFAULT '',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                graded INTEGER NOT NULL DEFAULT 0,
+                correct INTEGER NOT NULL DEFAULT 0,
+                confidence_sum REAL NOT NULL DEFAULT 0,
+                last_practiced TIMESTAMP
+            )
+        ''')
+        backfill = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'category_stats'").fetchone() is None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS category_stats (
+                category TEXT PRIMARY KEY,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                graded INTEGER NOT NULL DEFAULT 0,
+                correct INTEGER NOT NULL DEFAULT 0,
+                learning INTEGER NOT NULL DEFAULT 0,  -- signs with mastery level > 0
+                mastered INTEGER NOT NULL DEFAULT 0   -- signs with mastery level 2
+            )
+        ''')
+        if backfill:
+            # Databases created before category_stats existed
+            cursor.execute('''
+                INSERT INTO category_stats (category, learning, mastered)
+                SELECT COALESCE(category, ''), SUM(level > 0), SUM(level >= 2) FROM mastery
+                GROUP BY COALESCE(category, '')
+            ''')
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS practice_events_ai AFTER INSERT ON practice_events
+            BEGIN
+                INSERT INTO sign_stats (sign_name, category, attempts, graded, correct, confidence_sum, last_practiced)
+                VALUES (NEW.sign_name, NEW.category, 1, NEW.correct IS NOT NULL, COALESCE(NEW.correct, 0),
+                        COALESCE(NEW.confidence, 0), NEW.practiced_at)
+                ON CONFLICT(sign_name) DO UPDATE SET
+                    category = CASE WHEN excluded.category != '' THEN excluded.category ELSE category END,
+                    attempts = attempts + 1,
+                    graded = graded + excluded.graded,
+                    correct = correct + excluded.correct,
+                    confidence_sum = confidence_sum + excluded.confidence_sum,
+                    last_practiced = MAX(COALESCE(last_practiced, ''), excluded.last_practiced);
+                INSERT INTO category_stats (category, attempts, graded, correct)
+                VALUES (NEW.category, 1, NEW.correct IS NOT NULL, COALESCE(NEW.correct, 0))
+                ON CONFLICT(category) DO UPDATE SET
+                    attempts = attempts + 1,
+                    graded = graded + excluded.graded,
+                    correct = correct + excluded.correct;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS mastery_ai AFTER INSERT ON mastery
+            BEGIN
+                INSERT INTO category_stats (category, learning, mastered)
+                VALUES (COALESCE(NEW.category, ''), NEW.level > 0, NEW.level >= 2)
+                ON CONFLICT(category) DO UPDATE SET
+                    learning = learning + excluded.learning,
+                    mastered = mastered + excluded.mastered;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS mastery_au AFTER UPDATE OF level, category ON mastery
+            BEGIN
+                UPDATE category_stats SET
+                    learning = learning - (OLD.level > 0),
+                    mastered = mastered - (OLD.level >= 2)
+                WHERE category = COALESCE(OLD.category, '');
+                INSERT INTO category_stats (category, learning, mastered)
+                VALUES (COALESCE(NEW.category, ''), NEW.level > 0, NEW.level >= 2)
+                ON CONFLICT(category) DO UPDATE SET
+                    learning = learning + excluded.learning,
+                    mastered = mastered + excluded.mastered;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS mastery_ad AFTER DELETE ON mastery
+            BEGIN
+                UPDATE category_stats SET
+                    learning = learning - (OLD.level > 0),
+                    mastered = mastered - (OLD.level >= 2)
+                WHERE category = COALESCE(OLD.category, '');
+            END
+        ''')
+
+        self.conn.commit()
+
+    def update_mastery(self, sign_name, level, category=None):
+        """category=None keeps the sign's current category. New signs are due for review now."""
+        now = _timestamp()
+        self._submit(("mastery", (sign_name, category, level, now, now)))
+
+    def record_reviews(self, results, now=None):
+        """
+        Reschedules the signs reviewed in one session: results are
+        (sign_name, quality 0-5) or (sign_name, quality, category). A sign
+        attempted several times in a session gets one SM-2 review, graded by
+        its worst attempt. All of them are written in one transaction; only
+        the reviewed rows are read. category (if given) is set on the row.
+        """
+        now = time.time() if now is None else now
+        session = {}
+        for result in results:
+            sign_name, quality = result[0], result[1]
+            category = result[2] if len(result) > 2 else None
+            if sign_name in session:
+                previous_quality, previous_category = session[sign_name]
+                quality = min(quality, previous_quality)
+                category = category or previous_category
+            session[sign_name] = (quality, category)
+        self._submit(("reviews", [(sign_name, quality, category, now)
+                                  for sign_name, (quality, category) in session.items()]))
+
+    def log_practice(self, sign_name, detected_shape, confidence, correct=True, category=''):
+        """
+        Appends one practice attempt; sign and category aggregates follow via
+        triggers. correct=None (no target sign) is left out of the
+        correctness totals.
+        """
+        self._submit(("practice", (sign_name, category or '', detected_shape, confidence,
+                                   None if correct is None else int(bool(correct)), _timestamp())))
+
+    def queue_feedback(self, sign, province, desc):
+        self._submit(("feedback", (sign, province, desc, _timestamp())))
+
+    def _submit(self, op):
+        if self._writer is None:
+            self._write_batch([op])
+        else:
+            self._queue.put(op)
+
+    def _write_loop(self):
+        try:
+            self._run_writer()
+        finally:
+            with self._lock:
+                self._writer_done = True
+                if self._close_on_exit:
+                    self.conn.close()
+
+    def _run_writer(self):
+        while True:
+            op = self._queue.get()
+            if op is None:
+                break
+            batch, flushed = [], []
+            deadline = time.monotonic() + self.batch_interval
+            while True:
+                if isinstance(op, threading.Event):
+                    # flush(): commit what we have now
+                    flushed.append(op)
+                    break
+                if op is None:
+                    self._queue.put(None)
+                    break
+                batch.append(op)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.max_batch or remaining <= 0:
+                    break
+                try:
+                    op = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            try:
+                self._commit(batch)
+            except Exception as e:
+                print(f"Persistence writer error: {e}")
+            for event in flushed:
+                event.set()
+
+        # Writes submitted while close() was waiting get one last try
+        leftover = []
+        while True:
+            try:
+                op = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if op is not None and not isinstance(op, threading.Event):
+                leftover.append(op)
+        try:
+            self._commit(leftover)
+        except Exception as e:
+            print(f"Persistence writer error: {e}")
+
+    def _commit(self, batch):
+        """
+        Writes one batch on the writer thread, before any flush() waiting on
+        it is released. If the batch fails its writes are tried one at a
+        time; the ones that still fail are dropped and counted.
+        """
+        if not batch:
+            return
+        error = self._try_write(batch)
+        if error is None:
+            self.write_error = None
+            return
+
+        print(f"Persistence write error ({len(batch)} writes): {error}")
+        for op in batch:
+            op_error = self._try_write([op])
+            if op_error is not None:
+                self.dropped += 1
+                self.write_error = op_error
+                print(f"Persistence: dropped {op[0]} write: {op_error}")
+
+    def _try_write(self, batch):
+        """Writes a batch, retrying while the database is busy. Returns the error, or None."""
+        for attempt in range(WRITE_RETRIES):
+            try:
+                self._write_batch(batch)
+                return None
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or attempt == WRITE_RETRIES - 1:
+                    return e
+                time.sleep(RETRY_DELAY_S * (attempt + 1))
+            except Exception as e:
+                return e
+
+    def _write_batch(self, batch):
+        if not batch:
+            return
+        mastery = {}
+        feedback = []
+        practice = []
+        reviews = []
+        for kind, args in batch:
+            if kind == "mastery":
+                # Last update of a sign in the batch wins (keeping a category
+                # set by an earlier one)
+                previous = mastery.get(args[0])
+                if args[1] is None and previous is not None:
+                    args = (args[0], previous[1]) + args[2:]
+                mastery[args[0]] = args
+            elif kind == "practice":
+                practice.append(args)
+            elif kind == "reviews":
+                reviews.extend(args)
+            else:
+                feedback.append(args)
+
+        # Only statements with rows run, so a write is never failed by a
+        # table it does not touch
+        with self._lock, self.conn:
+            if mastery:
+                self.conn.executemany('''
+                    INSERT INTO mastery (sign_name, category, level, last_practiced, due_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(sign_name) DO UPDATE SET
+                        category = COALESCE(excluded.category, category),
+                        level = excluded.level,
+                        last_practiced = excluded.last_practiced
+                ''', list(mastery.values()))
+            if practice:
+                self.conn.executemany('''
+                    INSERT INTO practice_events (sign_name, category, detected_shape, confidence, correct, practiced_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', practice)
+            if reviews:
+                self._apply_reviews(reviews)
+            if feedback:
+                self.conn.executemany('''
+                    INSERT INTO feedback_queue (sign_name, province, description, created_at)
+                    VALUES (?, ?, ?, ?)
+                ''', feedback)
+        self.batches += 1
+        self.writes += len(batch)
+
+    def _apply_reviews(self, reviews):
+        # Called inside the batch transaction
+        names = list({review[0] for review in reviews})
+        states = {}
+        for i in range(0, len(names), MAX_QUERY_PARAMS):
+            chunk = names[i:i + MAX_QUERY_PARAMS]
+            rows = self.conn.execute(f'''
+                SELECT sign_name, repetitions, interval_days, ease FROM mastery
+                WHERE sign_name IN ({",".join("?" * len(chunk))})
+            ''', chunk)
+            states.update((row[0], row[1:]) for row in rows)
+
+        updates = {}
+        for sign_name, quality, category, reviewed_at in reviews:
+            repetitions, interval_days, ease = states.get(sign_name, (0, 0.0, DEFAULT_EASE))
+            repetitions, interval_days, ease = sm2(quality, repetitions, interval_days, ease)
+            states[sign_name] = (repetitions, interval_days, ease)
+            if category is None and sign_name in updates:
+                category = updates[sign_name][1]
+            updates[sign_name] = (sign_name, category, mastery_level(interval_days), _timestamp(reviewed_at),
+                                  _timestamp(reviewed_at + interval_days * 86400),
+                                  ease, interval_days, repetitions)
+
+        self.conn.executemany('''
+            INSERT INTO mastery (sign_name, category, level, last_practiced, due_at, ease, interval_days, repetitions)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(sign_name) DO UPDATE SET
+                category = COALESCE(excluded.category, category),
                 level = excluded.level,
-                last_practiced = CURRENT_TIMESTAMP
-        ''', (sign_name, level))
-        self.conn.commit()
+                last_practiced = excluded.last_practiced,
+                due_at = excluded.due_at,
+                ease = excluded.ease,
+                interval_days = excluded.interval_days,
+                repetitions = excluded.repetitions
+        ''', list(updates.values()))
+
+    def get_due_signs(self, limit=10, now=None, category=None):
+        """
+        [(sign_name, due_at), ...] of the `limit` most overdue signs (of one
+        category if given), read with a range scan of the mastery_due index.
+        """
+        self.flush()
+        query = "SELECT sign_name, due_at FROM mastery WHERE due_at <= ?"
+        params = [_timestamp(now)]
+        if category is not None:
+            query += " AND category = ?"
+            params.append(category)
+        with self._lock:
+            return self.conn.execute(query + " ORDER BY due_at, sign_name LIMIT ?",
+                                     params + [limit]).fetchall()
+
+    def flush(self, timeout=None):
+        """
+        Blocks until every write queued so far has been through the writer.
+        True only if they were all committed: False on timeout, if any was
+        dropped, or if writes are queued with no writer left to commit them.
+        """
+        if self._writer is None:
+            return True
+        if not self._writer.is_alive():
+            return self._queue.empty()
+        dropped = self.dropped
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout) and self.write_error is None and self.dropped == dropped
 
     def get_progress(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT category, COUNT(*) FROM mastery WHERE level > 0 GROUP BY category")
-        return cursor.fetchall()
-        
-    def queue_feedback(self, sign, province, desc):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO feedback_queue (sign_name, province, description)
-            VALUES (?, ?, ?)
-        ''', (sign, province, desc))
-        self.conn.commit()
-    
+        """[(category, signs learning or mastered), ...] from the maintained aggregates."""
+        self.flush()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT category, learning FROM category_stats WHERE learning > 0 ORDER BY category")
+            return cursor.fetchall()
+
+    def get_category_stats(self):
+        """{category: {attempts, graded, correct, learning, mastered}}"""
+        self.flush()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT category, attempts, graded, correct, learning, mastered FROM category_stats").fetchall()
+        return {row[0]: {"attempts": row[1], "graded": row[2], "correct": row[3],
+                         "learning": row[4], "mastered": row[5]}
+                for row in rows}
+
+    def get_sign_stats(self, sign_name):
+        """Practice totals for one sign (primary-key lookup), or None."""
+        self.flush()
+        with self._lock:
+            row = self.conn.execute('''
+                SELECT category, attempts, graded, correct, confidence_sum, last_practiced
+                FROM sign_stats WHERE sign_name = ?
+            ''', (sign_name,)).fetchone()
+        if row is None:
+            return None
+        category, attempts, graded, correct, confidence_sum, last_practiced = row
+        return {"category": category, "attempts": attempts, "graded": graded, "correct": correct,
+                "mean_confidence": confidence_sum / attempts if attempts else 0.0,
+                "last_practiced": last_practiced}
+
     def get_unsynced_feedback(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM feedback_queue WHERE synced = 0")
-        return cursor.fetchall()
+        self.flush()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT * FROM feedback_queue WHERE synced = 0")
+            return cursor.fetchall()
+
+    def stats(self):
+        return {"pending": self._queue.qsize(), "batches": self.batches, "writes": self.writes,
+                "dropped": self.dropped}
 
-    def close(self):
-        self.conn.close()
+    def close(self, timeout=5):
+        """
+        Commits queued writes and closes the connection. If the writer is
+        still busy after timeout, it closes the connection itself on exit.
+        """
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout)
+            with self._lock:
+                if not self._writer_done:
+                    print("Persistence writer still busy; the connection closes when it is done")
+                    self._close_on_exit = True
+                    return
+        with self._lock:
+            self.conn.close()
 
 if __name__ == "__main__":
     pm = PersistenceManager()
-    pm.update_mastery("HELLO", 1)
+    pm.update_mastery("HELLO", 1, category="GREETINGS")
     print("Updated hello.")
     pm.queue_feedback("BUS", "Gauteng", "Hand moves twice")
     print("Queued feedback.")
     print(pm.get_unsynced_feedback())
+    print(pm.get_progress())
     pm.close()
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+PHRASE_AUDIO_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'phrase_audio')
+# Total size of rendered WAV files kept on disk
+MAX_BYTES = 32 * 1024 * 1024
+# Anything shorter is a header without audio (an interrupted render)
+MIN_WAV_BYTES = 45
+
+class PhraseAudioCache:
+    """
+    Pre-rendered speech for frequent phrases, as WAV files under data/.
+
+    Files are keyed by the phrase plus the voice id and rate they were
+    rendered with, so changing the voice never plays stale audio. Least
+    recently played files are evicted once the directory exceeds max_bytes;
+    pinned phrases (the SOS set) are never evicted. Recency survives
+    restarts through the files' modification times.
+    """
+    def __init__(self, directory=PHRASE_AUDIO_DIR, max_bytes=MAX_BYTES, voice="", rate=0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.voice = voice
+        self.rate = rate
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._pinned = set()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self._scan()
+
+    def _scan(self):
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.tmp.wav'):
+                # Left over from an interrupted render
+                os.remove(path)
+            elif name.endswith('.wav'):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._bytes += size
+
+    @staticmethod
+    def normalize(text):
+        # Speech does not depend on case or spacing
+        return " ".join(text.lower().split())
+
+    def key(self, text):
+        ident = f"{self.voice}\0{self.rate}\0{self.normalize(text)}"
+        return hashlib.sha1(ident.encode('utf-8')).hexdigest()[:20]
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.wav')
+
+    def __contains__(self, text):
+        return self.key(text) in self._entries
+
+    def get(self, text):
+        """Path of the rendered phrase, or None."""
+        key = self.key(text)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            # Deleted behind our back
+            with self._lock:
+                self._bytes -= self._entries.pop(key, 0)
+            return None
+        return path
+
+    def pin(self, text):
+        with self._lock:
+            self._pinned.add(self.key(text))
+
+    def render(self, text, render_fn, pin=False):
+        """
+        Renders text with render_fn(path) (e.g. pyttsx3 save_to_file +
+        runAndWait) and adds it to the cache. Returns the WAV path, or None
+        if nothing usable was written.
+        """
+        key = self.key(text)
+        if pin:
+            self.pin(text)
+        tmp_path = os.path.join(self.directory, key + '.tmp.wav')
+        render_fn(tmp_path)
+        if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) < MIN_WAV_BYTES:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+        path = self._path(key)
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self.renders += 1
+            self._evict()
+        return path
+
+    def _evict(self):
+        for key in list(self._entries):
+            if self._bytes <= self.max_bytes:
+                break
+            if key in self._pinned:
+                continue
+            self._bytes -= self._entries.pop(key)
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "phrases": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "pinned": len(self._pinned),
+                "hits": self.hits,
+                "misses": self.misses,
+                "renders": self.renders,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0
+            }
@@ -0,0 +1,301 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# Fingerspelling clips are looked up as LETTER_A ... LETTER_Z
+FINGERSPELL_PREFIX = "LETTER_"
+# Decoded sign frames are downscaled to this width (the avatar view is small)
+CLIP_WIDTH = 320
+# A letter without a clip is shown as a card for this long
+LETTER_CARD_S = 0.35
+DEFAULT_FPS = 25.0
+
+class SignClip:
+    """Decoded frames of one sign: (n_frames, h, w, 3) BGR uint8."""
+    def __init__(self, gloss, frames, fps, fingerspelled=False):
+        self.gloss = gloss
+        self.frames = frames
+        self.fps = fps or DEFAULT_FPS
+        self.fingerspelled = fingerspelled
+
+def decode_clip(path, width=CLIP_WIDTH):
+    """Decodes a whole video into one frame array, downscaled to `width`."""
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if width and frame.shape[1] > width:
+            height = max(1, int(frame.shape[0] * width / frame.shape[1]))
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        return None, fps
+    return np.stack(frames), fps
+
+def letter_card(letter, width=CLIP_WIDTH, fps=DEFAULT_FPS, seconds=LETTER_CARD_S):
+    """Placeholder frames showing a letter, for letters without a clip."""
+    height = width * 3 // 4
+    card = np.zeros((height, width, 3), dtype=np.uint8)
+    cv2.putText(card, letter, (width // 2 - 30, height // 2 + 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 6)
+    # Same frame repeated: a broadcast view, no extra memory
+    frames = np.broadcast_to(card, (max(1, int(fps * seconds)),) + card.shape)
+    return frames
+
+class DecodedClipCache:
+    """LRU of decoded clips bounded by their total size in bytes."""
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, frames, fps):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (frames, fps)
+            self._bytes += frames.nbytes
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def stats(self):
+        with self._lock:
+            return {"clips": len(self._entries), "bytes": self._bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+class PlaybackScheduler:
+    """
+    Plays a stream of glosses as sign clips on the avatar view.
+
+    enqueue() takes glosses as they are produced (GlossSession deltas or a
+    whole sentence). Clips for the next `prefetch` glosses are resolved and
+    decoded on a worker thread while the current one plays, so consecutive
+    signs follow each other without a decode stall. Glosses without a clip
+    are fingerspelled (letter clips, or letter cards when those are missing
+    too). Decoded clips stay in a byte-bounded LRU, since a conversation
+    reuses a small set of signs. With merge (AssetManager.merge_phrases),
+    glosses signed as one sign (THANK YOU -> THANK_YOU) are combined, also
+    across enqueue() calls as long as the first part has not started loading.
+
+    on_frame(frame, gloss) is called on the playback thread for every frame;
+    on_sign(gloss) when a sign starts. `gaps_ms` records the stall between
+    the last frame of one sign and the first frame of the next (beyond one
+    normal frame interval).
+    """
+    def __init__(self, resolve, decode=decode_clip, on_frame=None, on_sign=None,
+                 prefetch=2, cache_bytes=64 * 1024 * 1024, merge=None, max_phrase_length=4):
+        """
+        resolve(gloss) -> local clip path or None (AssetManager.get_sign_video).
+        merge(glosses) -> glosses with phrases combined; max_phrase_length
+            bounds how many queued glosses are merged again with new ones.
+        """
+        self.resolve = resolve
+        self.merge = merge
+        self.max_phrase_length = max_phrase_length
+        self.decode = decode
+        self.on_frame = on_frame
+        self.on_sign = on_sign
+        self.prefetch = prefetch
+        self.cache = DecodedClipCache(cache_bytes)
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._running = True
+        self._playing = False
+        self._last_frame_end = None
+
+        self.signs_played = 0
+        self.fingerspelled = 0
+        self.gaps_ms = deque(maxlen=200)
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def enqueue(self, glosses):
+        with self._cond:
+            if self.merge:
+                glosses = self.merge(self._take_unstarted_tail() + list(glosses))
+            for gloss in glosses:
+                self._queue.append([gloss, None])
+            self._schedule_prefetch()
+            self._cond.notify_all()
+
+    def clear(self):
+        """Drops queued signs and stops the one playing (new utterance, screen left)."""
+        with self._cond:
+            self._queue.clear()
+            self._generation += 1
+            self._last_frame_end = None
+            self._cond.notify_all()
+
+    def wait_idle(self, timeout=None):
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._cond:
+            while self._queue or self._playing:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def shutdown(self):
+        self.clear()
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self.thread.join(2)
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        gaps = sorted(self.gaps_ms)
+        return {
+            "queued": len(self._queue),
+            "signs_played": self.signs_played,
+            "fingerspelled": self.fingerspelled,
+            "gap_ms_p50": round(gaps[len(gaps) // 2], 1) if gaps else None,
+            "gap_ms_max": round(gaps[-1], 1) if gaps else None,
+            "cache": self.cache.stats()
+        }
+
+    def _take_unstarted_tail(self):
+        # Called with the lock held: queued glosses that may still be part of
+        # a phrase (never the head, which the playback thread owns)
+        tail = []
+        while len(self._queue) > 1 and len(tail) < self.max_phrase_length - 1:
+            future = self._queue[-1][1]
+            if future is not None and not future.cancel():
+                break
+            tail.insert(0, self._queue.pop()[0])
+        return tail
+
+    def _schedule_prefetch(self):
+        # Called with the lock held: decode the next few signs ahead of time
+        for item in list(self._queue)[:self.prefetch + 1]:
+            if item[1] is None:
+                item[1] = self._executor.submit(self._load, item[0])
+
+    def _load(self, gloss):
+        """Resolves and decodes one gloss -> list of SignClips (several when fingerspelled)."""
+        clip = self._load_clip(gloss)
+        if clip is not None:
+            return [clip]
+
+        clips = []
+        for letter in gloss:
+            if not letter.isalpha():
+                continue
+            letter = letter.upper()
+            clip = self._load_clip(FINGERSPELL_PREFIX + letter)
+            if clip is None:
+                key = "card:" + letter
+                cached = self.cache.get(key)
+                if cached is None:
+                    cached = (letter_card(letter), DEFAULT_FPS)
+                    self.cache.put(key, *cached)
+                clip = SignClip(letter, cached[0], cached[1])
+            clip.gloss = letter
+            clip.fingerspelled = True
+            clips.append(clip)
+        return clips
+
+    def _load_clip(self, gloss):
+        path = self.resolve(gloss)
+        if not path:
+            return None
+        cached = self.cache.get(path)
+        if cached is None:
+            frames, fps = self.decode(path)
+            if frames is None:
+                return None
+            self.cache.put(path, frames, fps)
+            cached = (frames, fps)
+        return SignClip(gloss, cached[0], cached[1])
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    break
+                gloss, future = self._queue[0]
+                if future is None:
+                    future = self._executor.submit(self._load, gloss)
+                    self._queue[0][1] = future
+                generation = self._generation
+                self._playing = True
+
+            try:
+                clips = future.result()
+            except Exception as e:
+                print(f"Sign clip error ({gloss}): {e}")
+                clips = []
+
+            with self._cond:
+                if generation != self._generation:
+                    # Cleared while this sign was loading
+                    self._playing = False
+                    self._cond.notify_all()
+                    continue
+                self._queue.popleft()
+                self._schedule_prefetch()
+
+            if clips and clips[0].fingerspelled:
+                self.fingerspelled += 1
+            if self.on_sign and clips:
+                self.on_sign(gloss)
+            for clip in clips:
+                if not self._play(clip, generation):
+                    break
+            if clips:
+                self.signs_played += 1
+
+            with self._cond:
+                if not self._queue:
+                    # Nothing was waiting: the next sign starts after idle
+                    # time, which is not a playback gap
+                    self._last_frame_end = None
+                self._playing = False
+                self._cond.notify_all()
+
+    def _play(self, clip, generation):
+        interval = 1.0 / clip.fps
+        start = time.perf_counter()
+        if self._last_frame_end is not None:
+            self.gaps_ms.append(max(0.0, (start - self._last_frame_end) * 1000))
+
+        for i, frame in enumerate(clip.frames):
+            if generation != self._generation or not self._running:
+                return False
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if self.on_frame:
+                self.on_frame(frame, clip.gloss)
+        # When the next sign's first frame is due if there is no stall
+        self._last_frame_end = start + len(clip.frames) * interval
+        return True
@@ -0,0 +1,111 @@
+from collections import Counter, deque
+
+from engine.review import quality_from_attempt
+
+# Per-frame tracker output that is not a hand shape
+NO_SHAPE = ("None", "Unknown")
+# Free practice (no target sign) is logged under this category
+HANDSHAPE_CATEGORY = "HANDSHAPES"
+
+class PracticeEventDetector:
+    """
+    Turns the tracker's per-frame hand shapes into practice attempts.
+
+    A shape counts as one attempt once it holds in at least min_agreement of
+    the last `window` frames; confidence is that agreement. The same shape is
+    not counted again until the hand is lowered or changes shape, so holding
+    a sign for several seconds is one attempt, not one per frame.
+
+    on_attempt(sign_name, detected_shape, confidence, correct, category) is
+    called on the tracker thread (PersistenceManager.log_practice fits).
+    With a target the attempt is for that sign and is correct when the shape
+    matches; without one every stable shape is practice of itself and
+    correct is None (nothing to grade it against).
+
+    review() works through hand shapes due for review (most overdue first),
+    targeting each until it is signed correctly.
+    """
+    def __init__(self, on_attempt, window=15, min_agreement=0.6):
+        self.on_attempt = on_attempt
+        self.window = window
+        self.min_agreement = min_agreement
+        self.target_sign = None
+        self.target_shape = None
+        self.category = HANDSHAPE_CATEGORY
+        self.attempts = 0
+        # (sign_name, correct, confidence, category) per attempt, for rescheduling reviews
+        self.session = []
+        self._reviews = None
+        self._shapes = deque(maxlen=window)
+        self._counts = Counter()
+        self._last = None
+
+    def set_target(self, sign_name, shape, category):
+        self.target_sign = sign_name
+        self.target_shape = shape
+        self.category = category
+        self.reset()
+
+    def review(self, shapes):
+        """Targets each hand shape in turn; free practice resumes after the last."""
+        self._reviews = deque(shapes)
+        self._next_review()
+
+    def _next_review(self):
+        if self._reviews:
+            shape = self._reviews.popleft()
+            self.set_target(shape, shape, HANDSHAPE_CATEGORY)
+        else:
+            self._reviews = None
+            self.set_target(None, None, HANDSHAPE_CATEGORY)
+
+    def reset(self):
+        self._shapes.clear()
+        self._counts.clear()
+        self._last = None
+
+    def feed(self, shapes):
+        """One tracker frame: the shapes of all detected hands (last hand counts, as in the tracker)."""
+        shape = shapes[-1] if len(shapes) else "None"
+        if len(self._shapes) == self.window:
+            self._counts[self._shapes[0]] -= 1
+        self._shapes.append(shape)
+        self._counts[shape] += 1
+        if len(self._shapes) < self.window:
+            return
+
+        top, count = self._counts.most_common(1)[0]
+        agreement = count / self.window
+        if agreement < self.min_agreement:
+            return
+        if top in NO_SHAPE:
+            # Hand lowered (or unreadable): the next stable shape is a new attempt
+            if top == "None":
+                self._last = None
+            return
+        if top == self._last:
+            return
+
+        self._last = top
+        self.attempts += 1
+        if self.target_sign:
+            sign_name, correct = self.target_sign, top == self.target_shape
+        else:
+            sign_name, correct = top, None
+        self.session.append((sign_name, correct, round(agreement, 3), self.category))
+        self.on_attempt(sign_name, top, round(agreement, 3), correct, self.category)
+        if correct and self._reviews is not None:
+            self._next_review()
+
+    def review_results(self):
+        """
+        (sign_name, SM-2 quality, category) per sign practised this session,
+        graded by its worst attempt (PersistenceManager.record_reviews).
+        """
+        results = {}
+        for sign_name, correct, confidence, category in self.session:
+            quality = quality_from_attempt(correct, confidence)
+            if sign_name in results:
+                quality = min(quality, results[sign_name][1])
+            results[sign_name] = (sign_name, quality, category)
+        return list(results.values())
@@ -0,0 +1,254 @@
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+# Binary landmark recording (.lmrec)
+#
+#   header   32 bytes  magic, version, max_hands, chunk_frames, frame width/height
+#   chunk    16 bytes  b"CHNK", n_frames  + n_frames fixed-size records
+#   ...                (chunks are only ever appended)
+#   index              b"INDX", n_chunks + (offset, n_frames) per chunk
+#   footer   16 bytes  index offset, b"SASLEND!"
+#
+# A record is (t: float64, n_hands: uint32, landmarks: float32[max_hands, 21, 3])
+# with pixel-space landmarks; unused hand slots are zero. All offsets are
+# 8-byte aligned so the reader can map chunks straight onto numpy arrays.
+# A file without index/footer (crash mid-session) is recovered by scanning
+# the chunk headers.
+
+RECORDING_EXT = ".lmrec"
+SESSIONS_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'sessions')
+MAGIC = b"SASLLMK1"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIHH12x")
+CHUNK_MAGIC = b"CHNK"
+CHUNK_HEADER = struct.Struct("<4sI8x")
+INDEX_MAGIC = b"INDX"
+INDEX_HEADER = struct.Struct("<4sI")
+INDEX_ENTRY = struct.Struct("<QI4x")
+FOOTER_MAGIC = b"SASLEND!"
+FOOTER = struct.Struct("<Q8s")
+
+def new_session_path(prefix="session"):
+    """data/sessions/<prefix>-YYYYmmdd-HHMMSS.lmrec"""
+    return os.path.join(SESSIONS_DIR, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}{RECORDING_EXT}")
+
+def record_dtype(max_hands):
+    return np.dtype([
+        ("t", "<f8"),
+        ("n_hands", "<u4"),
+        ("_pad", "<u4"),
+        ("landmarks", "<f4", (max_hands, 21, 3)),
+    ])
+
+class LandmarkRecorder:
+    """
+    Appends timestamped (n_hands, 21, 3) landmark frames to a .lmrec file.
+
+    Frames are buffered and written one chunk at a time; close() writes the
+    index. Re-opening an existing recording appends new chunks to it.
+    Thread-safe: frames usually arrive on the tracker thread.
+    """
+    def __init__(self, path, max_hands=2, chunk_frames=256, frame_size=(0, 0)):
+        self.path = path
+        self.max_hands = max_hands
+        self.chunk_frames = chunk_frames
+        self.frame_size = frame_size
+        self.dtype = record_dtype(max_hands)
+        self.frames_written = 0
+        self._header_size = tuple(frame_size)
+        self._chunks = []
+        self._buffer = np.zeros(chunk_frames, dtype=self.dtype)
+        self._buffered = 0
+        self._lock = threading.Lock()
+
+        rec_dir = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(rec_dir):
+            os.makedirs(rec_dir)
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._reopen()
+        else:
+            self.file = open(path, 'wb')
+            w, h = frame_size
+            self.file.write(HEADER.pack(MAGIC, VERSION, max_hands, chunk_frames, w, h))
+
+    def _reopen(self):
+        existing = LandmarkRecording(self.path)
+        if existing.max_hands != self.max_hands:
+            existing.close()
+            raise ValueError(f"{self.path} was recorded with max_hands={existing.max_hands}")
+        self._chunks = list(existing.chunk_index)
+        self.frames_written = len(existing)
+        self.frame_size = existing.frame_size
+        self._header_size = existing.frame_size
+        end = existing.data_end
+        existing.close()
+
+        # Drop the old index/footer; they are rewritten on close()
+        self.file = open(self.path, 'r+b')
+        self.file.truncate(end)
+        self.file.seek(end)
+
+    def write(self, timestamp, landmarks):
+        with self._lock:
+            if self.file is None:
+                return
+            i = self._buffered
+            n_hands = 0 if landmarks is None else min(len(landmarks), self.max_hands)
+            self._buffer["t"][i] = timestamp
+            self._buffer["n_hands"][i] = n_hands
+            self._buffer["landmarks"][i] = 0
+            if n_hands:
+                self._buffer["landmarks"][i, :n_hands] = landmarks[:n_hands]
+
+            self._buffered += 1
+            self.frames_written += 1
+            if self._buffered == self.chunk_frames:
+                self._write_chunk()
+
+    def flush(self):
+        with self._lock:
+            if self.file is not None:
+                self._write_chunk()
+                self.file.flush()
+
+    def close(self):
+        with self._lock:
+            if self.file is None:
+                return
+            self._write_chunk()
+
+            index_offset = self.file.tell()
+            self.file.write(INDEX_HEADER.pack(INDEX_MAGIC, len(self._chunks)))
+            for offset, n_frames in self._chunks:
+                self.file.write(INDEX_ENTRY.pack(offset, n_frames))
+            self.file.write(FOOTER.pack(index_offset, FOOTER_MAGIC))
+
+            # Frame size may only be known once tracking started
+            if tuple(self.frame_size) != self._header_size:
+                w, h = self.frame_size
+                self.file.seek(0)
+                self.file.write(HEADER.pack(MAGIC, VERSION, self.max_hands, self.chunk_frames, w, h))
+            self.file.close()
+            self.file = None
+
+    def _write_chunk(self):
+        if not self._buffered:
+            return
+        offset = self.file.tell()
+        self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, self._buffered))
+        self.file.write(self._buffer[:self._buffered].tobytes())
+        self._chunks.append((offset, self._buffered))
+        self._buffered = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class LandmarkRecording:
+    """
+    Memory-mapped reader for .lmrec files.
+
+    Records are numpy views onto the mapped file (no copies), so random
+    access and bulk scans over long sessions stay cheap. Slices inside one
+    chunk are views too; slices spanning chunks are concatenated.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._mm = np.memmap(path, dtype=np.uint8, mode='r')
+
+        magic, version, max_hands, chunk_frames, w, h = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a landmark recording")
+        if version != VERSION:
+            raise ValueError(f"Unsupported landmark recording version {version}")
+        self.max_hands = max_hands
+        self.chunk_frames = chunk_frames
+        self.frame_size = (w, h)
+        self.dtype = record_dtype(max_hands)
+
+        self.chunk_index = self._read_index()
+        self.chunks = [
+            np.ndarray(shape=(n_frames,), dtype=self.dtype, buffer=self._mm,
+                       offset=offset + CHUNK_HEADER.size)
+            for offset, n_frames in self.chunk_index
+        ]
+        counts = [n_frames for _, n_frames in self.chunk_index]
+        self._starts = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def _read_index(self):
+        size = len(self._mm)
+        if size >= HEADER.size + FOOTER.size:
+            index_offset, magic = FOOTER.unpack_from(self._mm, size - FOOTER.size)
+            if magic == FOOTER_MAGIC:
+                _, n_chunks = INDEX_HEADER.unpack_from(self._mm, index_offset)
+                base = index_offset + INDEX_HEADER.size
+                self.data_end = index_offset
+                return [INDEX_ENTRY.unpack_from(self._mm, base + i * INDEX_ENTRY.size)
+                        for i in range(n_chunks)]
+        return self._scan_chunks()
+
+    def _scan_chunks(self):
+        """Rebuilds the index from chunk headers (recording was not closed)."""
+        chunks = []
+        offset = HEADER.size
+        size = len(self._mm)
+        while offset + CHUNK_HEADER.size <= size:
+            magic, n_frames = CHUNK_HEADER.unpack_from(self._mm, offset)
+            end = offset + CHUNK_HEADER.size + n_frames * self.dtype.itemsize
+            if magic != CHUNK_MAGIC or end > size:
+                break
+            chunks.append((offset, n_frames))
+            offset = end
+        self.data_end = offset
+        return chunks
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    def _locate(self, i):
+        chunk = int(np.searchsorted(self._starts, i, side='right')) - 1
+        return chunk, i - int(self._starts[chunk])
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if start >= stop:
+                return np.zeros(0, dtype=self.dtype)
+            first, first_pos = self._locate(start)
+            last, _ = self._locate(stop - 1)
+            if first == last:
+                return self.chunks[first][first_pos:first_pos + (stop - start):step]
+            return np.concatenate(self.chunks[first:last + 1])[
+                start - int(self._starts[first]):stop - int(self._starts[first]):step]
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(key)
+        chunk, pos = self._locate(key)
+        return self.chunks[chunk][pos]
+
+    def frame(self, i):
+        """Returns (timestamp, (n_hands, 21, 3) landmarks view) for frame i."""
+        record = self[i]
+        return float(record["t"]), record["landmarks"][:record["n_hands"]]
+
+    @property
+    def timestamps(self):
+        return np.concatenate([chunk["t"] for chunk in self.chunks]) if self.chunks else np.zeros(0)
+
+    def iter_chunks(self):
+        """Yields the records chunk by chunk (views), for bulk scans."""
+        return iter(self.chunks)
+
+    def close(self):
+        # Views keep the mapping alive; it is unmapped once they are released
+        self.chunks = []
+        self._mm = None
@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+
+# Process start reference for startup milestones (first frame, ready, ...)
+PROCESS_START = time.perf_counter()
+
+# "thread" runs MediaPipe next to the UI; "process" moves inference to a
+# worker process (engine.tracker_process) so it does not compete for the GIL
+TRACKER_BACKEND = os.environ.get("SASL_TRACKER_BACKEND", "thread")
+# A failed build is reported again without retrying for this long (a
+# missing camera or model may be fixed while the app runs)
+RETRY_AFTER_S = 30
+
+class EngineRegistry:
+    """
+    Lazily builds and shares one instance of each heavy engine.
+
+    Factories import their modules on first use, so importing the app does
+    not pull in cv2/spaCy/mediapipe/pyttsx3. warm_up() builds engines on a
+    background thread; get() blocks until an engine is built (or builds it),
+    request() delivers engines to a callback without blocking the caller.
+    A build that failed is retried once retry_after_s has passed, or right
+    away after reset(name).
+    """
+    def __init__(self, retry_after_s=RETRY_AFTER_S):
+        self.retry_after_s = retry_after_s
+        self._factories = {}
+        self._instances = {}
+        self._errors = {}  # name -> (monotonic time, exception)
+        self._build_locks = {}
+        self._lock = threading.Lock()
+        self.build_times = {}
+        self.milestones = {}
+
+    def register(self, name, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._build_locks[name] = threading.Lock()
+
+    def is_ready(self, name):
+        return name in self._instances
+
+    def reset(self, name):
+        """Forgets a failed build of `name`, so the next get() tries again."""
+        self._errors.pop(name, None)
+
+    def peek(self, name):
+        """Returns the engine if it is already built, without building it."""
+        return self._instances.get(name)
+
+    def get(self, name):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        # One lock per engine: a get() racing the warm-up thread waits for
+        # the build in progress instead of constructing a second instance.
+        with self._build_locks[name]:
+            if name in self._instances:
+                return self._instances[name]
+            failure = self._errors.get(name)
+            if failure and time.monotonic() - failure[0] < self.retry_after_s:
+                raise failure[1]
+
+            start = time.perf_counter()
+            try:
+                instance = self._factories[name]()
+            except Exception as e:
+                self._errors[name] = (time.monotonic(), e)
+                raise
+            self.build_times[name] = time.perf_counter() - start
+            self._errors.pop(name, None)
+            self._instances[name] = instance
+            return instance
+
+    def request(self, names, callback, on_error=None):
+        """
+        Calls callback({name: instance}) from a background thread once every
+        engine in `names` is built. Callers on the UI thread should re-schedule
+        onto the main loop (e.g. Clock.schedule_once).
+        """
+        def worker():
+            try:
+                instances = {name: self.get(name) for name in names}
+            except Exception as e:
+                if on_error:
+                    on_error(e)
+                else:
+                    print(f"Engine load error: {e}")
+                return
+            callback(instances)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def warm_up(self, names=None, on_ready=None):
+        """Builds engines in order on a background thread."""
+        names = list(names or self._factories)
+
+        def worker():
+            for name in names:
+                try:
+                    instance = self.get(name)
+                except Exception as e:
+                    print(f"Warm-up failed for {name}: {e}")
+                    continue
+                if on_ready:
+                    on_ready(name, instance)
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+    def mark(self, milestone):
+        """Records seconds since process start; only the first call counts."""
+        if milestone not in self.milestones:
+            self.milestones[milestone] = time.perf_counter() - PROCESS_START
+            print(f"[Startup] {milestone}: {self.milestones[milestone]:.2f} s")
+
+    def report(self):
+        lines = ["Startup report:"]
+        for milestone, seconds in sorted(self.milestones.items(), key=lambda kv: kv[1]):
+            lines.append(f"  {milestone:<24} {seconds:6.2f} s after start")
+        for name, seconds in self.build_times.items():
+            lines.append(f"  build {name:<18} {seconds:6.2f} s")
+        for name, (_, error) in self._errors.items():
+            lines.append(f"  build {name:<18} FAILED ({error})")
+        return "\n".join(lines)
+
+# --- Default engines (imports deferred until first use) ---
+
+def _create_grammar():
+    from engine.grammar import SASLGrammarEngine
+    return SASLGrammarEngine(persist_cache=True)
+
+def _create_conversation():
+    from engine.conversation import ConversationManager
+    return ConversationManager()
+
+def _create_tracker():
+    from engine.tracker import TrackingService
+    return TrackingService(backend=TRACKER_BACKEND)
+
+def _create_motion():
+    from engine.motion import TemplateIndex, SequenceRecognizer, TEMPLATES_PATH
+    # The template file is optional (see TEMPLATES_PATH); without it the
+    # recognizer simply never matches
+    if os.path.exists(TEMPLATES_PATH):
+        index = TemplateIndex.load(TEMPLATES_PATH)
+    else:
+        index = TemplateIndex()
+    return SequenceRecognizer(index)
+
+def _create_playback():
+    from assets.manager import AssetManager, REMOTE_BASE_URL
+    from assets.fetcher import AssetFetcher, SignCache
+    from engine.playback import PlaybackScheduler
+    assets = AssetManager(fetcher=AssetFetcher(SignCache(), REMOTE_BASE_URL))
+    assets.sync_clip_manifest()
+    return PlaybackScheduler(resolve=assets.get_sign_video, merge=assets.merge_phrases,
+                             max_phrase_length=assets.max_phrase_length)
+
+def _create_persistence():
+    from engine.persistence import PersistenceManager
+    return PersistenceManager()
+
+engines = EngineRegistry()
+engines.register("grammar", _create_grammar)
+engines.register("conversation", _create_conversation)
+engines.register("tracker", _create_tracker)
+engines.register("motion", _create_motion)
+engines.register("playback", _create_playback)
+engines.register("persistence", _create_persistence)
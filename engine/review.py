@@ -0,0 +1,46 @@
+"""
+SM-2 spaced repetition (SuperMemo 2), used by PersistenceManager to decide
+when each sign is due for review.
+
+Quality is graded 0-5: below 3 is a failed recall and restarts the sign's
+repetitions; the ease factor grows with good answers and shrinks (never
+below MIN_EASE) with hard ones.
+"""
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# Interval (days) at which a sign counts as mastered (mastery level 2)
+MASTERED_INTERVAL_DAYS = 21
+
+def sm2(quality, repetitions, interval_days, ease):
+    """Returns (repetitions, interval_days, ease) after one review."""
+    quality = max(0, min(5, int(quality)))
+    if quality < 3:
+        repetitions = 0
+        interval_days = 1.0
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval_days = 1.0
+        elif repetitions == 2:
+            interval_days = 6.0
+        else:
+            interval_days = round(interval_days * ease, 2)
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return repetitions, interval_days, round(ease, 3)
+
+def mastery_level(interval_days):
+    """Mastery table level (1 Learning, 2 Mastered) after a review."""
+    return 2 if interval_days >= MASTERED_INTERVAL_DAYS else 1
+
+def quality_from_attempt(correct, confidence=1.0):
+    """
+    Grades a tracked practice attempt: correct is a 4, a very steady correct
+    sign a 5. An attempt without a target (correct=None) shows the shape was
+    formed but not recalled on cue, so it passes with a 3 at best.
+    """
+    if correct is None:
+        return 3
+    if not correct:
+        return 1
+    return 5 if confidence >= 0.9 else 4
@@ -0,0 +1,192 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+from engine.recording import LandmarkRecorder, LandmarkRecording, RECORDING_EXT
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+class CameraSource:
+    """Live camera (the default HandTracker input)."""
+    finished = False
+    provides_landmarks = False
+    # Live sources drop frames when the consumer falls behind; recorded ones wait
+    live = True
+
+    def __init__(self, index=0):
+        self.index = index
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.index)
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+class VideoFileSource(CameraSource):
+    """Recorded clip; read() returns (False, None) at the end unless loop=True."""
+    live = False
+
+    def __init__(self, path, loop=False):
+        super().__init__(index=path)
+        self.loop = loop
+        self.finished = False
+
+    def open(self):
+        if not os.path.exists(self.index):
+            raise FileNotFoundError(self.index)
+        self.finished = False
+        super().open()
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            self.finished = True
+        return ret, frame
+
+class ImageDirectorySource:
+    """Every image in a directory, in file name order."""
+    provides_landmarks = False
+    live = False
+
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.files = []
+        self.position = 0
+        self.finished = False
+
+    def open(self):
+        self.files = sorted(
+            os.path.join(self.path, name) for name in os.listdir(self.path)
+            if name.lower().endswith(IMAGE_EXTS)
+        )
+        self.position = 0
+        self.finished = False
+
+    def read(self):
+        if self.position >= len(self.files):
+            if not self.loop or not self.files:
+                self.finished = True
+                return False, None
+            self.position = 0
+
+        frame = cv2.imread(self.files[self.position])
+        self.position += 1
+        return frame is not None, frame
+
+    def release(self):
+        self.files = []
+
+class LandmarkReplaySource:
+    """
+    Replays a recorded landmark stream instead of running inference.
+
+    Either a binary .lmrec recording (engine.recording) or JSON lines, one
+    per frame:
+        {"t": 0.033, "size": [640, 480], "landmarks": [[[x, y, z] * 21], ...]}
+    with pixel-space landmarks (an empty list when no hand was seen).
+    read() returns a blank frame of the recorded size (reused between frames);
+    the frame's landmarks are in `self.landmarks`.
+    """
+    provides_landmarks = True
+    live = False
+
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.frames = []
+        self.position = 0
+        self.finished = False
+        self.landmarks = None
+        self.timestamp = None
+        self._canvas = None
+        self._recording = None
+
+    def open(self):
+        self.frames = []
+        self.position = 0
+        self.finished = False
+        if self.path.endswith(RECORDING_EXT):
+            self._recording = LandmarkRecording(self.path)
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    self.frames.append(json.loads(line))
+
+    def read(self):
+        recording = self._recording
+        total = len(recording) if recording is not None else len(self.frames)
+        if self.position >= total:
+            if not self.loop or not total:
+                self.finished = True
+                return False, None
+            self.position = 0
+
+        if recording is not None:
+            self.timestamp, self.landmarks = recording.frame(self.position)
+            w, h = recording.frame_size
+        else:
+            record = self.frames[self.position]
+            self.timestamp = record.get("t")
+            self.landmarks = np.asarray(record["landmarks"], dtype=np.float32).reshape(-1, 21, 3)
+            w, h = record.get("size", (640, 480))
+        self.position += 1
+
+        w, h = w or 640, h or 480
+        if self._canvas is None or self._canvas.shape[:2] != (h, w):
+            self._canvas = np.zeros((h, w, 3), dtype=np.uint8)
+        return True, self._canvas
+
+    def release(self):
+        self.frames = []
+        if self._recording is not None:
+            self._recording.close()
+            self._recording = None
+
+def save_landmark_stream(path, records):
+    """
+    Writes (t, (w, h), landmarks or None) records in the replay format:
+    a binary recording for .lmrec paths, JSON lines otherwise.
+    """
+    if path.endswith(RECORDING_EXT):
+        recorder = None
+        for t, size, landmarks in records:
+            if recorder is None:
+                recorder = LandmarkRecorder(path, frame_size=tuple(size))
+            recorder.write(t, landmarks)
+        if recorder:
+            recorder.close()
+        return
+
+    with open(path, 'w') as f:
+        for t, size, landmarks in records:
+            f.write(json.dumps({
+                "t": t,
+                "size": list(size),
+                "landmarks": [] if landmarks is None else np.round(landmarks, 2).tolist()
+            }) + "\n")
+
+def open_source(spec):
+    """
+    Builds a source from a CLI-style spec: camera index, video file,
+    image directory or landmark stream (.jsonl / .lmrec).
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec))
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec)
+    if spec.endswith(('.jsonl', RECORDING_EXT)):
+        return LandmarkReplaySource(spec)
+    return VideoFileSource(spec)
@@ -0,0 +1,335 @@
+import json
+import os
+import time
+import wave
+
+import numpy as np
+
+try:
+    from vosk import Model, KaldiRecognizer, SetLogLevel
+    SetLogLevel(-1)
+    HAS_VOSK = True
+except ImportError:
+    HAS_VOSK = False
+
+# Audio format used throughout: 16 kHz mono int16, in 30 ms chunks
+SAMPLE_RATE = 16000
+CHUNK_MS = 30
+CHUNK_SAMPLES = SAMPLE_RATE * CHUNK_MS // 1000
+
+# The model is not in the repository (~40 MB). Download a small English
+# model from https://alphacephei.com/vosk/models (e.g.
+# vosk-model-small-en-us-0.15) and unpack it so that this directory holds its
+# am/, conf/, graph/ ... folders; buildozer.spec packages it into the APK.
+# Without it, speech goes to Google's online recognizer.
+VOSK_MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', 'vosk-model')
+
+# Recognizer backends
+RECOGNIZER_VOSK = "vosk"      # offline, streaming, partial hypotheses
+RECOGNIZER_GOOGLE = "google"  # online, whole utterance at the end
+
+class EnergyVAD:
+    """
+    Energy-based voice activity detection / endpointing over int16 chunks.
+
+    The noise floor is tracked while nobody speaks; a chunk is voiced when
+    its RMS is `ratio` times above it. Speech starts after `start_chunks`
+    voiced chunks in a row and ends after `end_silence_ms` of silence.
+    process() returns "start", "end" or None for every chunk.
+    """
+    def __init__(self, chunk_ms=CHUNK_MS, ratio=3.0, min_rms=300.0, start_chunks=3, end_silence_ms=450):
+        self.chunk_ms = chunk_ms
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.start_chunks = start_chunks
+        self.end_chunks = max(1, end_silence_ms // chunk_ms)
+        self.noise_rms = None
+        self.in_speech = False
+        self.voiced_run = 0
+        self.silent_run = 0
+
+    @property
+    def threshold(self):
+        return max(self.min_rms, (self.noise_rms or 0.0) * self.ratio)
+
+    def is_voiced(self, chunk):
+        rms = float(np.sqrt(np.mean(np.square(chunk, dtype=np.float64)))) if len(chunk) else 0.0
+        voiced = rms > self.threshold
+        if not voiced and not self.in_speech:
+            self.noise_rms = rms if self.noise_rms is None else 0.95 * self.noise_rms + 0.05 * rms
+        return voiced
+
+    def process(self, chunk):
+        voiced = self.is_voiced(chunk)
+        if not self.in_speech:
+            self.voiced_run = self.voiced_run + 1 if voiced else 0
+            if self.voiced_run >= self.start_chunks:
+                self.in_speech = True
+                self.silent_run = 0
+                return "start"
+            return None
+
+        self.silent_run = 0 if voiced else self.silent_run + 1
+        if self.silent_run >= self.end_chunks:
+            self.in_speech = False
+            self.voiced_run = 0
+            return "end"
+        return None
+
+class VoskRecognizer:
+    """Offline streaming recognizer (Vosk/Kaldi). Needs a model in assets/vosk-model."""
+    streaming = True
+
+    def __init__(self, model_path=VOSK_MODEL_PATH, sample_rate=SAMPLE_RATE):
+        if not HAS_VOSK:
+            raise RuntimeError("vosk not installed")
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(model_path)
+        self.model = Model(model_path)
+        self.sample_rate = sample_rate
+        self.recognizer = KaldiRecognizer(self.model, sample_rate)
+        self._segments = []
+
+    def reset(self):
+        self.recognizer.Reset()
+        self._segments = []
+
+    def accept(self, chunk):
+        """Feeds int16 samples; returns the current partial hypothesis."""
+        if self.recognizer.AcceptWaveform(chunk.tobytes()):
+            # Vosk found its own segment boundary inside our utterance
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            if text:
+                self._segments.append(text)
+            return " ".join(self._segments)
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(self._segments + ([partial] if partial else []))
+
+    def finish(self):
+        text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        segments = self._segments + ([text] if text else [])
+        self._segments = []
+        return " ".join(segments)
+
+class GoogleRecognizer:
+    """The previous online backend: buffers the utterance, one request at the end."""
+    streaming = False
+
+    def __init__(self, sample_rate=SAMPLE_RATE):
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+        self.sample_rate = sample_rate
+        self._chunks = []
+
+    def reset(self):
+        self._chunks = []
+
+    def accept(self, chunk):
+        self._chunks.append(chunk.tobytes())
+        return None
+
+    def finish(self):
+        audio = self.sr.AudioData(b"".join(self._chunks), self.sample_rate, 2)
+        self._chunks = []
+        try:
+            return self.recognizer.recognize_google(audio)
+        except self.sr.UnknownValueError:
+            return ""
+
+def create_recognizer(backend=None):
+    """Vosk when it and its model are available, Google otherwise."""
+    if backend is None:
+        backend = RECOGNIZER_VOSK
+        if not HAS_VOSK:
+            print("Speech: vosk is not installed, falling back to Google's online recognizer")
+            backend = RECOGNIZER_GOOGLE
+        elif not os.path.isdir(VOSK_MODEL_PATH):
+            print(f"Speech: no Vosk model at {os.path.abspath(VOSK_MODEL_PATH)}, "
+                  "falling back to Google's online recognizer")
+            backend = RECOGNIZER_GOOGLE
+    if backend == RECOGNIZER_VOSK:
+        return VoskRecognizer()
+    if backend == RECOGNIZER_GOOGLE:
+        return GoogleRecognizer()
+    raise ValueError(f"Unknown recognizer backend: {backend}")
+
+class StreamingTranscriber:
+    """
+    Chunked audio -> VAD endpointing -> recognizer.
+
+    feed() is called for every chunk. Audio is only passed to the recognizer
+    between speech start and end (plus a short pre-roll so the first
+    syllable is not clipped). on_partial(text) fires whenever a streaming
+    backend's hypothesis changes; on_final(text) fires at the endpoint, or
+    on_abandoned() if the utterance ended without any text (a cough, noise).
+
+    `clock` stamps the last voiced chunk and the final result, so
+    last_latency is the end-of-speech-to-text latency in seconds.
+    """
+    def __init__(self, recognizer, vad=None, on_partial=None, on_final=None,
+                 preroll_chunks=5, max_utterance_s=15.0, clock=time.perf_counter,
+                 on_abandoned=None):
+        self.recognizer = recognizer
+        self.vad = vad or EnergyVAD()
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self.on_abandoned = on_abandoned
+        self.preroll_chunks = preroll_chunks
+        self.max_utterance_chunks = int(max_utterance_s * 1000 / self.vad.chunk_ms)
+        self.clock = clock
+
+        self._preroll = []
+        self._utterance_chunks = 0
+        self._partial = ""
+        self.speech_end_at = None
+        self.last_latency = None
+        self.latencies = []
+
+    def feed(self, chunk):
+        event = self.vad.process(chunk)
+        voiced = self.vad.in_speech and self.vad.silent_run == 0
+
+        if not self.vad.in_speech and event != "end":
+            self._preroll.append(chunk)
+            if len(self._preroll) > self.preroll_chunks:
+                self._preroll.pop(0)
+            return None
+
+        if event == "start":
+            self.recognizer.reset()
+            self._utterance_chunks = 0
+            self._partial = ""
+            for buffered in self._preroll:
+                self._accept(buffered)
+            self._preroll = []
+
+        if voiced or event == "start":
+            self.speech_end_at = self.clock()
+        self._accept(chunk)
+
+        if event == "end" or self._utterance_chunks >= self.max_utterance_chunks:
+            if event != "end":
+                # Runaway utterance (constant noise): cut it here
+                self.vad.in_speech = False
+                self.speech_end_at = self.clock()
+            return self._finish()
+        return None
+
+    def _accept(self, chunk):
+        self._utterance_chunks += 1
+        partial = self.recognizer.accept(chunk)
+        if partial and partial != self._partial:
+            self._partial = partial
+            if self.on_partial:
+                self.on_partial(partial)
+
+    def _finish(self):
+        text = self.recognizer.finish().strip()
+        self.last_latency = self.clock() - self.speech_end_at
+        self.latencies.append(self.last_latency)
+        self._partial = ""
+        if text:
+            if self.on_final:
+                self.on_final(text)
+        elif self.on_abandoned:
+            self.on_abandoned()
+        return text
+
+class WavFileSource:
+    """Replays a WAV file as 16 kHz mono int16 chunks (mixed down / resampled)."""
+    def __init__(self, path, chunk_samples=CHUNK_SAMPLES, trailing_silence_ms=1000):
+        self.path = path
+        self.chunk_samples = chunk_samples
+        self.trailing_silence_ms = trailing_silence_ms
+        self.samples = None
+        self.position = 0
+        self.finished = False
+
+    def open(self):
+        with wave.open(self.path, 'rb') as f:
+            if f.getsampwidth() != 2:
+                raise ValueError(f"{self.path}: only 16-bit PCM is supported")
+            rate = f.getframerate()
+            samples = np.frombuffer(f.readframes(f.getnframes()), dtype='<i2')
+            samples = samples.reshape(-1, f.getnchannels()).mean(axis=1)
+        if rate != SAMPLE_RATE:
+            positions = np.arange(0, len(samples), rate / SAMPLE_RATE)
+            samples = np.interp(positions, np.arange(len(samples)), samples)
+        # Trailing silence lets the endpointer fire after the last word
+        silence = np.zeros(SAMPLE_RATE * self.trailing_silence_ms // 1000)
+        self.samples = np.concatenate([samples, silence]).astype(np.int16)
+        self.position = 0
+        self.finished = False
+
+    def read(self):
+        if self.position >= len(self.samples):
+            self.finished = True
+            return False, None
+        chunk = self.samples[self.position:self.position + self.chunk_samples]
+        self.position += self.chunk_samples
+        return True, chunk
+
+    def release(self):
+        self.samples = None
+
+class MicrophoneSource:
+    """Live microphone through speech_recognition's PyAudio wrapper."""
+    finished = False
+
+    def __init__(self, chunk_samples=CHUNK_SAMPLES):
+        self.chunk_samples = chunk_samples
+        self.microphone = None
+        self.stream = None
+
+    def open(self):
+        import speech_recognition as sr
+        self.microphone = sr.Microphone(sample_rate=SAMPLE_RATE, chunk_size=self.chunk_samples)
+        self.stream = self.microphone.__enter__().stream
+
+    def read(self):
+        data = self.stream.read(self.chunk_samples)
+        return True, np.frombuffer(data, dtype='<i2')
+
+    def release(self):
+        if self.microphone is not None:
+            self.microphone.__exit__(None, None, None)
+            self.microphone = None
+            self.stream = None
+
+def replay(source, recognizer, vad=None, realtime=False):
+    """
+    Runs an audio source (usually a WavFileSource) through a
+    StreamingTranscriber and returns (finals, partials, latencies).
+
+    realtime=False replays as fast as possible on a virtual clock: the audio
+    position of the chunk being fed plus the wall time spent processing it,
+    so latencies match a live microphone as long as the backend keeps up
+    with real time. realtime=True paces chunks with sleep and uses the wall
+    clock.
+    """
+    finals, partials = [], []
+    position = {"audio_s": 0.0, "wall": 0.0}
+
+    def virtual_clock():
+        return position["audio_s"] + (time.perf_counter() - position["wall"])
+
+    transcriber = StreamingTranscriber(
+        recognizer, vad=vad,
+        on_partial=partials.append, on_final=finals.append,
+        clock=time.perf_counter if realtime else virtual_clock
+    )
+    source.open()
+    start = time.perf_counter()
+    while True:
+        ret, chunk = source.read()
+        if not ret:
+            break
+        # A live chunk is only available once all of it has been captured
+        position["audio_s"] += len(chunk) / SAMPLE_RATE
+        position["wall"] = time.perf_counter()
+        transcriber.feed(chunk)
+        if realtime:
+            time.sleep(max(0.0, start + position["audio_s"] - time.perf_counter()))
+    source.release()
+    return finals, partials, transcriber.latencies
@@ -16,24 +16,82 @@ except ImportError:
 
 import threading
 import time
-import math
+
+from engine.handshape import landmarks_from_results, handedness_from_results, classify_hand_shapes
+from engine.sources import CameraSource
+
+# Pacing modes for the tracking loop
+PACING_FIXED = "fixed"        # fixed sleep after each frame (legacy behaviour)
+PACING_ADAPTIVE = "adaptive"  # sleep only what is left of the frame budget
+PACING_NONE = "none"          # run flat out (benchmarks)
+
+# ROI crop: padding around the previous hands' bounding box (fraction of
+# its size), smallest crop (fraction of the frame) and how often (frames)
+# to re-scan the full frame so new hands entering the view are found.
+ROI_MARGIN = 0.6
+ROI_MIN_FRACTION = 0.25
+ROI_FULL_SCAN_EVERY = 30
+
+# Where MediaPipe runs: on a thread of this process, or in a worker process
+# fed through shared memory (engine.tracker_process)
+BACKEND_THREAD = "thread"
+BACKEND_PROCESS = "process"
 
 class HandTracker:
-    def __init__(self, update_callback=None):
+    def __init__(self, update_callback=None, target_fps=30, pacing=PACING_ADAPTIVE,
+                 inference_width=None, draw_overlay=True, roi_crop=False, source=None):
+        """
+        source: where frames come from (engine.sources); the camera by default.
+            File sources end the loop when exhausted; landmark replay sources
+            skip inference entirely.
+        inference_width: run MediaPipe on a frame downscaled to this width
+            (aspect kept); the displayed frame stays at camera resolution.
+        draw_overlay: draw landmarks on the returned frame. Without it the
+            camera frame is passed through untouched.
+        roi_crop: run inference only on a crop around the previous frame's
+            hands, falling back to the full frame when they are lost.
+        """
         self.output_callback = update_callback
+        # Optional landmark_callback(timestamp, landmarks, shapes), called on
+        # the tracker thread with (n_hands, 21, 3) pixel landmarks or None
+        self.landmark_callback = None
         self.running = False
         self.thread = None
+        self.source = source or CameraSource(0)
+
+        self.target_fps = target_fps
+        self.pacing = pacing
+        self.inference_width = inference_width
+        self.draw_overlay = draw_overlay
+        self.roi_crop = roi_crop
+        self._roi = None
+        self._frames_since_full_scan = 0
+
+        self.frames_processed = 0
+        self.frame_size = None
+        # Exponential moving average of each stage's time in ms
+        self.stage_ms = {}
+        # Set to a dict of lists to also keep every raw sample (benchmarks)
+        self.stage_log = None
+        # Latest (n_hands, 21, 3) pixel-space landmarks and per-hand shapes
+        self.last_landmarks = None
+        self.last_shapes = []
+        self.last_handedness = []
+        # Exponential moving average of per-frame work (read + inference + callback)
+        self.work_ms = 0.0
         
-        if HAS_MEDIAPIPE:
-            self.hands = mp_hands.Hands(
-                static_image_mode=False,
-                max_num_hands=2,
-                min_detection_confidence=0.7,
-                min_tracking_confidence=0.5
-            )
-            self.mp_drawing = mp_drawing
-        else:
-            self.hands = None
+        self.hands = self._create_hands()
+
+    def _create_hands(self):
+        if not HAS_MEDIAPIPE:
+            return None
+        self.mp_drawing = mp_drawing
+        return mp_hands.Hands(
+            static_image_mode=False,
+            max_num_hands=2,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.5
+        )
 
     def start(self):
         if not self.running:
@@ -46,93 +104,289 @@ class HandTracker:
         if self.thread:
             self.thread.join()
 
+    def wait(self):
+        """Blocks until a recorded source has been fully tracked (benchmarks)."""
+        if self.thread:
+            self.thread.join()
+
+    def shutdown(self):
+        """Stops tracking for good (app exit)."""
+        self.stop()
+
+    def stats(self):
+        return {
+            "frames_processed": self.frames_processed,
+            "work_ms": round(self.work_ms, 2),
+            "stage_ms": {stage: round(ms, 2) for stage, ms in self.stage_ms.items()},
+            "target_fps": self.target_fps,
+            "pacing": self.pacing
+        }
+
+    def _record(self, stage, start):
+        """Records the time since `start` for a stage and returns the current time."""
+        now = time.perf_counter()
+        self._add_sample(stage, (now - start) * 1000)
+        return now
+
+    def _add_sample(self, stage, ms):
+        previous = self.stage_ms.get(stage)
+        self.stage_ms[stage] = ms if previous is None else 0.9 * previous + 0.1 * ms
+        if self.stage_log is not None:
+            self.stage_log.setdefault(stage, []).append(ms)
+
+    def _pace(self, work_s):
+        self.work_ms = work_s * 1000 if not self.work_ms else 0.9 * self.work_ms + 0.1 * work_s * 1000
+
+        if self.pacing == PACING_FIXED:
+            time.sleep(0.016)
+        elif self.pacing == PACING_ADAPTIVE and self.target_fps:
+            # Sleep only the part of the frame budget inference did not use;
+            # a slow device gets no sleep at all instead of a fixed penalty.
+            remaining = 1.0 / self.target_fps - work_s
+            if remaining > 0:
+                time.sleep(remaining)
+
     def _run_loop(self):
-        cap = cv2.VideoCapture(0)
+        source = self.source
+        source.open()
         
         while self.running:
-            ret, frame = cap.read()
+            frame_start = time.perf_counter()
+            ret, frame = source.read()
             if not ret:
+                if source.finished:
+                    # End of a recorded clip
+                    break
                 time.sleep(0.1)
                 continue
+            self._record("capture", frame_start)
 
-            # Convert BGR to RGB
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            hand_shape = "None"
-            
-            if HAS_MEDIAPIPE and self.hands:
-                image.flags.writeable = False
-                results = self.hands.process(image)
-                image.flags.writeable = True
-                
-                # Convert back to BGR for drawing
-                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-                
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        self.mp_drawing.draw_landmarks(
-                            image, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                        
-                        # Basic Hand Shape Logic
-                        landmark_list = []
-                        for id, lm in enumerate(hand_landmarks.landmark):
-                            h, w, c = image.shape
-                            cx, cy = int(lm.x * w), int(lm.y * h)
-                            landmark_list.append([id, cx, cy])
-
-                        if landmark_list:
-                             hand_shape = self._classify_hand_shape(landmark_list)
-                # Use the processed image (with drawings)
-                final_frame = image 
+            if source.provides_landmarks:
+                final_frame, hand_shape = self.process_frame(frame, landmarks=source.landmarks)
             else:
-                # No mediapipe, just return original frame
-                final_frame = frame
+                final_frame, hand_shape = self.process_frame(frame)
             
             # Send frame and data to UI callback
-            if self.output_callback:
-                self.output_callback(final_frame, hand_shape)
+            self._emit(final_frame, hand_shape)
             
             # FPS limitation
-            time.sleep(0.016)
+            self._pace(time.perf_counter() - frame_start)
 
-        cap.release()
+        source.release()
+        self.running = False
 
-    def _classify_hand_shape(self, lm_list):
+    def _emit(self, frame, hand_shape):
+        if self.output_callback:
+            self.output_callback(frame, hand_shape)
+        if self.landmark_callback:
+            self.landmark_callback(time.time(), self.last_landmarks, self.last_shapes)
+        self.frames_processed += 1
+
+    def process_frame(self, frame, landmarks=None):
         """
-        Simple heuristic for SASL hand shapes based on finger states.
+        Runs hand tracking on one BGR frame.
+        Returns (frame to display, hand shape of the last detected hand).
+
+        Pre-computed (n_hands, 21, 3) pixel landmarks (a replayed stream)
+        skip conversion and inference.
         """
-        # Finger tips: 8 (Index), 12 (Middle), 16 (Ring), 20 (Pinky)
-        # Finger PIPs (knuckles): 6, 10, 14, 18
-        
-        fingers = []
-        
-        # Thumbs up logic (simplified)
-        # Tip x > IP x (for right hand) - simplistic check
-        fingers.append(1 if lm_list[4][1] > lm_list[3][1] else 0) 
-        
-        # 4 Fingers
-        tips = [8, 12, 16, 20]
-        pips = [6, 10, 14, 18]
-        
-        for tip, pip in zip(tips, pips):
-            if lm_list[tip][2] < lm_list[pip][2]: # Y-coordinate check (inverted)
-                fingers.append(1)
-            else:
-                fingers.append(0)
-
-        # Classify
-        # Thumb, Index, Middle, Ring, Pinky
-        if fingers == [0, 1, 1, 1, 1]:
-            return "Flat Hand (B-Hand)"
-        elif fingers == [0, 1, 1, 0, 0]:
-            return "V-Shape"
-        elif fingers == [0, 0, 0, 0, 0]: # Or [1, 0, 0, 0, 0] depending on thumb
-            return "Fist (S-Hand)"
-        elif fingers == [1, 0, 0, 0, 0]:
-            return "Thumbs Up"
-        elif fingers == [0, 1, 0, 0, 0]:
-            return "Point (1-Hand)"
-            
-        return "Unknown"
+        self.frame_size = (frame.shape[1], frame.shape[0])
+        if landmarks is not None:
+            t = time.perf_counter()
+            hand_shape = self._classify(landmarks, [], frame.shape)
+            self._record("classify", t)
+            return frame, hand_shape
+
+        if not self.hands:
+            # No mediapipe, just return original frame
+            return frame, "None"
+
+        t = time.perf_counter()
+        roi = self._next_roi(frame.shape)
+        if roi:
+            x0, y0, x1, y1 = roi
+            source = frame[y0:y1, x0:x1]
+        else:
+            source = frame
+
+        if self.inference_width and source.shape[1] > self.inference_width:
+            scale = self.inference_width / source.shape[1]
+            source = cv2.resize(source, (self.inference_width, max(1, int(source.shape[0] * scale))),
+                                interpolation=cv2.INTER_AREA)
+
+        # Convert BGR to RGB (only the inference copy; the display frame stays BGR)
+        image = cv2.cvtColor(source, cv2.COLOR_BGR2RGB)
+        image.flags.writeable = False
+        t = self._record("convert", t)
+
+        results = self.hands.process(image)
+        t = self._record("inference", t)
+
+        if results.multi_hand_landmarks:
+            if roi:
+                self._remap_landmarks(results.multi_hand_landmarks, roi, frame.shape)
+            landmarks = landmarks_from_results(results.multi_hand_landmarks, frame.shape)
+            handedness = handedness_from_results(results.multi_handedness)
+        else:
+            landmarks = None
+            handedness = []
+        hand_shape = self._classify(landmarks, handedness, frame.shape)
+        t = self._record("classify", t)
+
+        if self.draw_overlay and results.multi_hand_landmarks:
+            # Landmarks are normalized to the full frame, so they can be drawn
+            # straight onto the BGR camera frame: no RGB->BGR round trip.
+            for hand_landmarks in results.multi_hand_landmarks:
+                self.mp_drawing.draw_landmarks(
+                    frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+            self._record("draw", t)
+
+        return frame, hand_shape
+
+    def _classify(self, landmarks, handedness, shape):
+        if landmarks is None or len(landmarks) == 0:
+            self.last_landmarks = None
+            self.last_shapes = []
+            self.last_handedness = []
+            self._roi = None
+            return "None"
+
+        # Vectorized hand shape classification over all hands
+        shapes = classify_hand_shapes(landmarks)
+        self.last_landmarks = landmarks
+        self.last_shapes = shapes
+        self.last_handedness = handedness
+        self._roi = self._roi_from_landmarks(landmarks, shape) if self.roi_crop else None
+        # As before, the last detected hand is reported
+        return shapes[-1]
+
+    def _next_roi(self, shape):
+        if not self.roi_crop or self._roi is None:
+            self._frames_since_full_scan = 0
+            return None
+        self._frames_since_full_scan += 1
+        if self._frames_since_full_scan >= ROI_FULL_SCAN_EVERY:
+            self._frames_since_full_scan = 0
+            return None
+        return self._roi
+
+    @staticmethod
+    def _roi_from_landmarks(landmarks, shape):
+        """Pixel box (x0, y0, x1, y1) around all hands, padded for motion."""
+        h, w = shape[:2]
+        xy = landmarks[..., :2].reshape(-1, 2)
+        (min_x, min_y), (max_x, max_y) = xy.min(axis=0), xy.max(axis=0)
+
+        pad_x = max((max_x - min_x) * ROI_MARGIN, w * ROI_MIN_FRACTION / 2)
+        pad_y = max((max_y - min_y) * ROI_MARGIN, h * ROI_MIN_FRACTION / 2)
+        x0, x1 = int(max(0, min_x - pad_x)), int(min(w, max_x + pad_x))
+        y0, y1 = int(max(0, min_y - pad_y)), int(min(h, max_y + pad_y))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return (x0, y0, x1, y1)
+
+    @staticmethod
+    def _remap_landmarks(multi_hand_landmarks, roi, shape):
+        """Maps landmarks normalized to the crop back to the full frame (in place)."""
+        h, w = shape[:2]
+        x0, y0, x1, y1 = roi
+        sx, sy = (x1 - x0) / w, (y1 - y0) / h
+        ox, oy = x0 / w, y0 / h
+        for hand_landmarks in multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = ox + lm.x * sx
+                lm.y = oy + lm.y * sy
+                # z shares x's scale
+                lm.z = lm.z * sx
+
+def create_tracker(backend=BACKEND_THREAD, **kwargs):
+    """Builds a HandTracker for the given backend; kwargs as for HandTracker."""
+    if backend == BACKEND_PROCESS:
+        from engine.tracker_process import ProcessHandTracker
+        return ProcessHandTracker(**kwargs)
+    if backend != BACKEND_THREAD:
+        raise ValueError(f"Unknown tracker backend: {backend}")
+    return HandTracker(**kwargs)
+
+class TrackingService:
+    """
+    Process-wide owner of the camera and the MediaPipe graph.
+
+    Screens subscribe a callback(frame, hand_shape) instead of building their
+    own HandTracker. The Hands graph is built once; the camera is opened for
+    the first subscriber and released only when the last one unsubscribes,
+    so navigating between screens never reopens the device.
+    """
+    def __init__(self, tracker=None, backend=BACKEND_THREAD):
+        self.tracker = tracker or create_tracker(backend)
+        self.tracker.output_callback = self._dispatch
+        self.tracker.landmark_callback = self._dispatch_landmarks
+        # Replaced (never mutated) under the lock, so the tracker thread can
+        # iterate a snapshot without taking it. stop() joins that thread, so
+        # it must never wait on a lock held by unsubscribe().
+        self._subscribers = ()
+        # Landmark listeners ride along with frame subscribers; they do not
+        # keep the camera open on their own.
+        self._landmark_listeners = ()
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    @property
+    def frame_size(self):
+        """(width, height) of the camera frames, once the first one arrived."""
+        return self.tracker.frame_size
+
+    def stats(self):
+        return self.tracker.stats()
+
+    def shutdown(self):
+        """Releases the camera and, for the process backend, the worker."""
+        with self._lock:
+            self._subscribers = ()
+        self.tracker.shutdown()
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers = self._subscribers + (callback,)
+            if len(self._subscribers) == 1:
+                self.tracker.start()
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback not in self._subscribers:
+                return
+            subscribers = list(self._subscribers)
+            subscribers.remove(callback)
+            self._subscribers = tuple(subscribers)
+            if not self._subscribers:
+                # Last subscriber gone: release the camera
+                self.tracker.stop()
+
+    def add_landmark_listener(self, callback):
+        """callback(timestamp, landmarks, shapes) on the tracker thread."""
+        with self._lock:
+            self._landmark_listeners = self._landmark_listeners + (callback,)
+
+    def remove_landmark_listener(self, callback):
+        with self._lock:
+            self._landmark_listeners = tuple(c for c in self._landmark_listeners if c != callback)
+
+    def _dispatch_landmarks(self, timestamp, landmarks, shapes):
+        for callback in self._landmark_listeners:
+            try:
+                callback(timestamp, landmarks, shapes)
+            except Exception as e:
+                print(f"Landmark listener error: {e}")
+
+    def _dispatch(self, frame, hand_shape):
+        for callback in self._subscribers:
+            try:
+                callback(frame, hand_shape)
+            except Exception as e:
+                print(f"Tracking subscriber error: {e}")
 
 if __name__ == "__main__":
     def print_result(frame, shape):
@@ -149,3 +403,4 @@ if __name__ == "__main__":
             time.sleep(1)
     except KeyboardInterrupt:
         tracker.stop()
+        print(tracker.stats())
@@ -0,0 +1,292 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from engine.handshape import HAND_CONNECTIONS
+from engine.tracker import HandTracker, PACING_ADAPTIVE, PACING_NONE
+
+# Frames in flight between the capture thread and the worker. Two lets the
+# next frame be copied in while the previous one is being tracked; more only
+# adds latency.
+RING_SLOTS = 2
+
+# Child processes are spawned (not forked) so the worker never inherits the
+# parent's threads, camera handle or GL context.
+_mp = mp.get_context("spawn")
+
+def _worker_main(requests, results, options):
+    """
+    Worker process: runs a HandTracker (inference only, no camera, no
+    overlay) over frames that the parent copies into the shared ring.
+
+    requests: ("attach", shm_name, ring_shape) | ("frame", slot, submitted) | None
+    results:  (slot, submitted, landmarks, handedness, shapes, hand_shape, stage_ms) | None
+    """
+    hands_factory = options.pop("hands_factory", None)
+    tracker = HandTracker(pacing=PACING_NONE, draw_overlay=False, **options)
+    if hands_factory is not None:
+        tracker.hands = hands_factory()
+    tracker.stage_log = {}
+
+    shm = None
+    ring = None
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        if message[0] == "attach":
+            ring = None
+            if shm is not None:
+                shm.close()
+            shm = shared_memory.SharedMemory(name=message[1])
+            ring = np.ndarray(message[2], dtype=np.uint8, buffer=shm.buf)
+            continue
+
+        _, slot, submitted = message
+        # Inference reads straight from shared memory; only the RGB/resized
+        # inference copy is made here
+        _, hand_shape = tracker.process_frame(ring[slot])
+        stage_ms = {stage: samples[-1] for stage, samples in tracker.stage_log.items()}
+        tracker.stage_log.clear()
+        results.put((slot, submitted, tracker.last_landmarks, tracker.last_handedness,
+                     tracker.last_shapes, hand_shape, stage_ms))
+
+    ring = None
+    if shm is not None:
+        shm.close()
+    results.put(None)
+
+def draw_landmarks(frame, landmarks, color=(0, 255, 0)):
+    """Draws (n_hands, 21, 3) pixel landmarks onto a BGR frame in place."""
+    for hand in np.asarray(landmarks)[..., :2].astype(np.int32):
+        for a, b in HAND_CONNECTIONS:
+            cv2.line(frame, tuple(hand[a]), tuple(hand[b]), color, 2)
+        for x, y in hand:
+            cv2.circle(frame, (x, y), 3, (0, 0, 255), -1)
+
+class ProcessHandTracker(HandTracker):
+    """
+    HandTracker with MediaPipe in a separate process.
+
+    The capture thread copies each camera frame into a slot of a
+    multiprocessing.shared_memory ring and sends only the slot number to the
+    worker; landmarks, handedness and shapes come back over a queue. Frames
+    never get pickled, and inference no longer holds this process's GIL
+    while the UI thread uploads textures.
+
+    Same interface as HandTracker (start, stop, update_callback,
+    landmark_callback, stats, last_*), so TrackingService and the screens do
+    not change. With a live camera, frames that arrive while every slot is
+    busy are dropped; recorded sources wait for a free slot instead. If the
+    worker dies (e.g. the Hands graph fails to build), tracking stops and
+    nothing waits for it any longer.
+    """
+    def __init__(self, update_callback=None, target_fps=30, pacing=PACING_ADAPTIVE,
+                 inference_width=None, draw_overlay=True, roi_crop=False, source=None,
+                 slots=RING_SLOTS, hands_factory=None):
+        """
+        hands_factory: picklable callable building the Hands object in the
+            worker (tests); MediaPipe's Hands by default.
+        """
+        super().__init__(update_callback=update_callback, target_fps=target_fps, pacing=pacing,
+                         inference_width=inference_width, draw_overlay=draw_overlay,
+                         roi_crop=roi_crop, source=source)
+        self.slots = slots
+        self.frames_dropped = 0
+        self._worker_options = {
+            "inference_width": inference_width,
+            "roi_crop": roi_crop,
+            "hands_factory": hands_factory,
+        }
+        self._process = None
+        self._requests = None
+        self._results = None
+        self._result_thread = None
+        self._worker_exited = threading.Event()
+        self._free = None
+        self._shm = None
+        self._ring = None
+
+    def _create_hands(self):
+        # The graph is built in the worker; this process only captures and draws
+        return None
+
+    def start(self):
+        if self.running:
+            return
+        if self._process is not None and self._worker_exited.is_set():
+            # Clear away a worker that died; a new one is started below
+            self.shutdown()
+        if self._process is None:
+            # Worker (and its Hands graph) outlives stop()/start() cycles,
+            # like the thread backend's graph does; only the camera is released
+            self._start_worker()
+        super().start()
+
+    def _start_worker(self):
+        self._requests = _mp.Queue()
+        self._results = _mp.Queue()
+        self._process = _mp.Process(
+            target=_worker_main,
+            args=(self._requests, self._results, dict(self._worker_options)),
+            daemon=True
+        )
+        self._process.start()
+        self._worker_exited.clear()
+
+        self._free = queue.Queue()
+        for slot in range(self.slots):
+            self._free.put(slot)
+        self._result_thread = threading.Thread(target=self._result_loop, args=(self._process,), daemon=True)
+        self._result_thread.start()
+
+    def wait(self):
+        super().wait()
+        # Let the worker finish the frames still in flight
+        self.shutdown()
+
+    def shutdown(self, timeout=5):
+        self.stop()
+        if self._process is None:
+            return
+        try:
+            # Worker drains the frames already queued, then answers with None,
+            # which ends the result thread (so does the worker exiting)
+            self._requests.put(None)
+            self._result_thread.join(timeout)
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(timeout)
+            if self._worker_exited.is_set():
+                # Nobody reads what is still queued for a dead worker
+                self._requests.cancel_join_thread()
+        finally:
+            self._process = None
+            self._release_ring()
+
+    def stats(self):
+        stats = super().stats()
+        stats["backend"] = "process"
+        stats["frames_dropped"] = self.frames_dropped
+        return stats
+
+    def _run_loop(self):
+        source = self.source
+        source.open()
+        live = getattr(source, "live", True)
+
+        while self.running:
+            frame_start = time.perf_counter()
+            ret, frame = source.read()
+            if not ret:
+                if source.finished:
+                    break
+                time.sleep(0.1)
+                continue
+            self._record("capture", frame_start)
+
+            if source.provides_landmarks:
+                # Nothing to infer: classify here like the thread backend
+                final_frame, hand_shape = self.process_frame(frame, landmarks=source.landmarks)
+                self._emit(final_frame, hand_shape)
+            else:
+                self._submit(frame, block=not live)
+
+            self._pace(time.perf_counter() - frame_start)
+
+        source.release()
+        self.running = False
+
+    def _submit(self, frame, block):
+        self.frame_size = (frame.shape[1], frame.shape[0])
+        t = time.perf_counter()
+        if self._ring is None or self._ring.shape[1:] != frame.shape:
+            if not self._attach_ring(frame.shape):
+                return
+        slot = self._acquire_slot(block)
+        if slot is None:
+            # Worker is still busy with every slot: drop rather than queue up latency
+            self.frames_dropped += 1
+            return
+        self._ring[slot] = frame
+        self._requests.put(("frame", slot, t))
+        self._record("transfer", t)
+
+    def _acquire_slot(self, block):
+        if not block:
+            try:
+                return self._free.get_nowait()
+            except queue.Empty:
+                return None
+        # Recorded input: wait for the worker (it may still be starting up)
+        while self.running and not self._worker_exited.is_set():
+            try:
+                return self._free.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _attach_ring(self, frame_shape):
+        """(Re)allocates the shared ring for frames of this shape."""
+        if self._ring is not None:
+            # Wait until the worker has handed back every slot of the old ring
+            for _ in range(self.slots):
+                try:
+                    self._free.get(timeout=2.0)
+                except queue.Empty:
+                    print("Tracker worker did not release the frame ring")
+                    return False
+            self._release_ring()
+            for slot in range(self.slots):
+                self._free.put(slot)
+
+        ring_shape = (self.slots,) + tuple(frame_shape)
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(ring_shape)))
+        self._ring = np.ndarray(ring_shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._requests.put(("attach", self._shm.name, ring_shape))
+        return True
+
+    def _release_ring(self):
+        self._ring = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def _result_loop(self, process):
+        while True:
+            try:
+                message = self._results.get(timeout=0.2)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                # Died without saying goodbye: the frames in flight never
+                # come back, so stop capturing instead of waiting for them
+                print(f"Tracker worker exited unexpectedly (exit code {process.exitcode})")
+                self._worker_exited.set()
+                self.running = False
+                break
+            if message is None:
+                break
+            slot, submitted, landmarks, handedness, shapes, hand_shape, stage_ms = message
+
+            # The displayed frame must outlive the slot, which is reused at once
+            frame = self._ring[slot].copy()
+            self._free.put(slot)
+            for stage, ms in stage_ms.items():
+                self._add_sample(stage, ms)
+            t = self._record("roundtrip", submitted)
+
+            self.last_landmarks = landmarks
+            self.last_handedness = handedness
+            self.last_shapes = shapes
+            if self.draw_overlay and landmarks is not None:
+                draw_landmarks(frame, landmarks)
+                self._record("draw", t)
+            self._emit(frame, hand_shape)
@@ -0,0 +1,226 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+# Utterance priorities (lower is spoken first)
+PRIORITY_SOS = 0
+PRIORITY_CHAT = 1
+# Background jobs on the TTS thread (pre-rendering phrase audio)
+PRIORITY_BACKGROUND = 2
+
+# Chat utterances up to this many characters are merged with the ones queued
+# right behind them into a single say()/runAndWait() call
+COALESCE_MAX_CHARS = 60
+
+class TTSWorker:
+    """
+    One long-lived thread that owns text-to-speech output.
+
+    Utterances go through a bounded priority queue instead of a thread per
+    call: SOS phrases jump ahead of chat and interrupt chat that is already
+    being spoken, and short chat utterances queued back to back are merged so
+    a burst of recognized signs costs one engine round trip, not one each.
+    When the queue is full the oldest, least urgent utterance is dropped.
+
+    speak(text) must block until the text has been spoken; interrupt() (if
+    given) must make a running speak() return early. Background jobs are
+    never interrupted: stopping the engine mid-render would leave a
+    truncated file behind, so urgent speech waits for the job to finish. With
+    audio_start_events=True the speaker reports the actual start of audio
+    through on_audio_started(); otherwise time-to-first-audio is measured up
+    to the speak() call.
+    """
+    def __init__(self, speak, interrupt=None, max_queue=16,
+                 coalesce_chars=COALESCE_MAX_CHARS, audio_start_events=False):
+        self.speak = speak
+        self.interrupt = interrupt
+        self.max_queue = max_queue
+        self.coalesce_chars = coalesce_chars
+        self.audio_start_events = audio_start_events
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._speaking = None
+        self._speaking_since = None
+        self._job_running = False
+        self._running = True
+
+        self.spoken = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.cancelled = 0
+        self.max_depth = 0
+        # Recent time-to-first-audio samples in ms (enqueue -> audio start)
+        self.ttfa_ms = deque(maxlen=100)
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @property
+    def depth(self):
+        return len(self._heap)
+
+    def say(self, text, priority=PRIORITY_CHAT):
+        """Queues text; returns False if it was dropped because the queue is full."""
+        text = text.strip()
+        if not text:
+            return False
+        with self._cond:
+            if not self._running:
+                return False
+            if len(self._heap) >= self.max_queue:
+                # Evict the oldest of the least urgent; never for something less urgent
+                victim = max(self._heap, key=lambda item: (item[0], -item[1]))
+                if victim[0] < priority:
+                    self.dropped += 1
+                    return False
+                self._heap.remove(victim)
+                heapq.heapify(self._heap)
+                self.dropped += 1
+
+            heapq.heappush(self._heap, (priority, next(self._seq), time.perf_counter(), text))
+            self.max_depth = max(self.max_depth, len(self._heap))
+            preempt = (self._speaking is not None and not self._job_running
+                       and priority < self._speaking)
+            self._cond.notify_all()
+
+        if preempt and self.interrupt:
+            self._interrupt()
+        return True
+
+    def submit(self, job, priority=PRIORITY_BACKGROUND):
+        """
+        Runs job() on the TTS thread, for work that needs the speech engine
+        but must not overlap with speaking. Returns False if dropped.
+        """
+        with self._cond:
+            if not self._running:
+                return False
+            if len(self._heap) >= self.max_queue:
+                self.dropped += 1
+                return False
+            heapq.heappush(self._heap, (priority, next(self._seq), time.perf_counter(), job))
+            self._cond.notify_all()
+        return True
+
+    def cancel(self, priority=None):
+        """
+        Drops queued utterances and stops the one being spoken. With a
+        priority only that priority is dropped; without one, queued background
+        jobs are kept (they are not speech). A running job always finishes.
+        """
+        def dropped(item):
+            if priority is None:
+                return not callable(item[3])
+            return item[0] == priority
+
+        with self._cond:
+            keep = [item for item in self._heap if not dropped(item)]
+            self.cancelled += len(self._heap) - len(keep)
+            self._heap = keep
+            heapq.heapify(self._heap)
+            stop_current = (self._speaking is not None and not self._job_running
+                            and priority in (None, self._speaking))
+            self._cond.notify_all()
+        if stop_current and self.interrupt:
+            self._interrupt()
+
+    def flush(self, timeout=None):
+        """Waits until everything queued has been spoken. Returns False on timeout."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._cond:
+            while self._heap or self._speaking is not None:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def shutdown(self, timeout=2.0):
+        self.cancel()
+        with self._cond:
+            self._running = False
+            # Background jobs kept by cancel() will never run now
+            self.cancelled += len(self._heap)
+            self._heap = []
+            self._cond.notify_all()
+        self.thread.join(timeout)
+
+    def on_audio_started(self):
+        """Speaker callback: audio for the current utterance has started."""
+        since = self._speaking_since
+        if since is not None:
+            self.ttfa_ms.append((time.perf_counter() - since) * 1000)
+            self._speaking_since = None
+
+    def stats(self):
+        samples = sorted(self.ttfa_ms)
+        return {
+            "queue_depth": len(self._heap),
+            "max_depth": self.max_depth,
+            "spoken": self.spoken,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "cancelled": self.cancelled,
+            "ttfa_ms_p50": round(samples[len(samples) // 2], 1) if samples else None,
+            "ttfa_ms_max": round(samples[-1], 1) if samples else None,
+        }
+
+    def _interrupt(self):
+        try:
+            self.interrupt()
+        except Exception as e:
+            print(f"TTS interrupt error: {e}")
+
+    def _next_utterance(self):
+        """Pops the next utterance, merged with short chat queued right behind it."""
+        priority, _, enqueued, text = heapq.heappop(self._heap)
+        if priority != PRIORITY_CHAT:
+            return priority, enqueued, text
+        parts = [text]
+        length = len(text)
+        while self._heap and self._heap[0][0] == priority:
+            following = self._heap[0][3]
+            if length + len(following) > self.coalesce_chars:
+                break
+            _, _, _, following = heapq.heappop(self._heap)
+            parts.append(following)
+            length += len(following)
+            self.coalesced += 1
+        return priority, enqueued, ", ".join(parts)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._heap:
+                    self._cond.wait()
+                if not self._running:
+                    break
+                priority, enqueued, text = self._next_utterance()
+                self._speaking = priority
+                self._speaking_since = enqueued
+                self._job_running = callable(text)
+
+            if callable(text):
+                self._speaking_since = None
+                try:
+                    text()
+                except Exception as e:
+                    print(f"TTS job error: {e}")
+            else:
+                if not self.audio_start_events:
+                    self.on_audio_started()
+                try:
+                    self.speak(text)
+                except Exception as e:
+                    print(f"TTS Error: {e}")
+                self.spoken += 1
+
+            with self._cond:
+                self._speaking = None
+                self._speaking_since = None
+                self._job_running = False
+                self._cond.notify_all()
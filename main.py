@@ -4,40 +4,24 @@ from kivy.lang import Builder
 from kivy.core.window import Window
 from kivy.properties import ObjectProperty, StringProperty, ListProperty
 from kivy.clock import Clock
-from kivy.graphics.texture import Texture
 import os
-import cv2
 import threading
 import time
 
 # --- Setup Paths ---
 os.environ['KIVY_GL_BACKEND'] = 'angle_sdl2'
 
-# --- Import Engines ---
-try:
-    from engine.tracker import HandTracker
-    from engine.persistence import PersistenceManager
-    from engine.conversation import ConversationManager
-    from engine.grammar import SASLGrammarEngine
-except ImportError as e:
-    print(f"Import Warning: {e}")
-    # Define dummy classes to allow UI to load even if engines fail
-    class HandTracker:
-        def __init__(self, update_callback=None): pass
-        def start(self): pass
-        def stop(self): pass
-    class PersistenceManager:
-        def __init__(self): pass
-        def queue_feedback(self, a, b, c): pass
-        def close(self): pass
-    class ConversationManager:
-        def __init__(self, on_speech_recognized=None): pass
-        def start_listening(self): pass
-        def stop_listening(self): pass
-        def speak(self, text): pass
-    class SASLGrammarEngine:
-        def __init__(self): pass
-        def to_gloss(self, text): return {"gloss": ["ERROR"], "facial_marker": "neutral"}
+# --- Engines ---
+# Heavy engines (cv2, spaCy, mediapipe, pyttsx3, speech_recognition) are
+# imported lazily by the registry and shared across screens.
+from engine.registry import engines
+from engine.frames import LatestFrameSlot
+from ui.presenter import FramePresenter
+
+CONVERSATION_ENGINES = ["tracker", "conversation", "grammar", "motion", "playback"]
+
+# Save LearnScreen landmark sessions to data/sessions/ for offline analysis
+RECORD_PRACTICE_SESSIONS = True
 
 # --- Screen Definitions ---
 
@@ -48,37 +32,121 @@ class LearnScreen(Screen):
     img = ObjectProperty(None)
     status_label = ObjectProperty(None)
     
+    tracker = None
+    recorder = None
+    practice = None
+    persistence = None
+
     def on_enter(self, *args):
-        try:
-            self.tracker = HandTracker(update_callback=self.update_frame)
-            self.tracker.start()
-        except Exception as e:
-            print(f"Tracker start error: {e}")
+        engines.request(["tracker", "persistence"], self._on_engines_loaded,
+                        on_error=lambda e: print(f"Tracker start error: {e}"))
+
+    def _on_engines_loaded(self, instances):
+        # Background thread: the due query waits for queued writes
+        from engine.practice import HANDSHAPE_CATEGORY
+        due = [name for name, _ in instances["persistence"].get_due_signs(category=HANDSHAPE_CATEGORY)]
+
+        def start_tracker(dt):
+            # The user may have navigated away while the tracker was loading
+            if self.manager and self.manager.current != self.name:
+                return
+            self.tracker = instances["tracker"]
+            self.tracker.subscribe(self.update_frame)
+            self._start_practice_log(instances["persistence"], due)
+            if RECORD_PRACTICE_SESSIONS:
+                self._start_recording()
+        Clock.schedule_once(start_tracker)
 
     def on_leave(self, *args):
-        if hasattr(self, 'tracker'):
-            self.tracker.stop()
+        if self.tracker:
+            self.tracker.remove_landmark_listener(self._record_landmarks)
+            self.tracker.remove_landmark_listener(self._log_practice)
+            self.tracker.unsubscribe(self.update_frame)
+        self._stop_recording()
+        self._finish_practice()
+        self.tracker = None
+
+    def _start_practice_log(self, persistence, due=()):
+        # Stable hand shapes become practice_events rows (batched writes);
+        # shapes due for SM-2 review are asked for first, most overdue first
+        from engine.practice import PracticeEventDetector
+        self.persistence = persistence
+        self.practice = PracticeEventDetector(on_attempt=persistence.log_practice)
+        self.practice.review(due)
+        self.tracker.add_landmark_listener(self._log_practice)
+
+    def _finish_practice(self):
+        # Reschedule everything practised this session in one transaction
+        practice, self.practice = self.practice, None
+        if practice and practice.session:
+            self.persistence.record_reviews(practice.review_results())
+
+    def _log_practice(self, timestamp, landmarks, shapes):
+        # Tracker thread
+        practice = self.practice
+        if practice:
+            practice.feed(shapes)
+
+    def _start_recording(self):
+        # Landmarks only (~0.5 KB/frame) for offline analysis of practice sessions
+        from engine.recording import LandmarkRecorder, new_session_path
+        try:
+            self.recorder = LandmarkRecorder(new_session_path("learn"))
+        except OSError as e:
+            print(f"Session recording disabled: {e}")
+            return
+        self.tracker.add_landmark_listener(self._record_landmarks)
+
+    def _record_landmarks(self, timestamp, landmarks, shapes):
+        # Tracker thread
+        recorder = self.recorder
+        if recorder:
+            recorder.write(timestamp, landmarks)
+
+    def _stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder:
+            if self.tracker and self.tracker.frame_size:
+                recorder.frame_size = self.tracker.frame_size
+            recorder.close()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = LatestFrameSlot()
+        self.presenter = FramePresenter()
 
     def update_frame(self, frame, hand_shape):
+        # Tracker thread: hand the newest frame over, never queue a backlog
+        if self.frames.put((frame, hand_shape)):
+            Clock.schedule_once(self._present_frame)
+
+    def _status_text(self, hand_shape):
+        practice = self.practice
+        if practice and practice.target_sign:
+            return f"Review: {practice.target_sign}   Detected: {hand_shape}"
+        return f"Detected: {hand_shape}"
+
+    def _present_frame(self, dt):
+        item = self.frames.take()
+        if item is None:
+            return
+        frame, hand_shape = item
+        engines.mark("first_frame")
         try:
-            # Flip & Convert for Kivy Texture
-            buf = cv2.flip(frame, 0).tobytes()
-            texture = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt='bgr')
-            texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
-            
-            def update_ui(dt):
-                if self.img:
-                    self.img.texture = texture
-                if self.status_label:
-                    self.status_label.text = f"Detected: {hand_shape}"
-            
-            Clock.schedule_once(update_ui)
+            # Reuses one texture, flipped via UV coords (no pixel copies)
+            if self.img:
+                self.presenter.present(frame, self.img)
+            if self.status_label:
+                self.status_label.text = self._status_text(hand_shape)
         except Exception as e:
             print(f"Frame update error: {e}")
 
 class SOSScreen(Screen):
     def play_emergency_sign(self, sign_name):
         print(f"Playing emergency sign: {sign_name}")
+        phrase = sign_name.replace('_', ' ').replace('-', ' ').lower()
+        # Queued ahead of any chat that is still being spoken
+        engines.request(["conversation"], lambda e: e["conversation"].speak_emergency(phrase))
 
 class FeedbackScreen(Screen):
     sign_input = ObjectProperty(None)
@@ -87,9 +155,9 @@ class FeedbackScreen(Screen):
 
     def submit_feedback(self):
         try:
-            pm = PersistenceManager()
-            pm.queue_feedback(self.sign_input.text, self.province_spinner.text, self.note_input.text)
-            pm.close()
+            # Shared connection; the write is committed by the writer thread
+            engines.get("persistence").queue_feedback(
+                self.sign_input.text, self.province_spinner.text, self.note_input.text)
             print("Feedback submitted!")
             self.sign_input.text = ""
             self.note_input.text = ""
@@ -103,52 +171,121 @@ class ConversationScreen(Screen):
     avatar_status = StringProperty("[Avatar Placeholder]\nWaiting for input...")
     img = ObjectProperty(None) 
     
-    manager = None
+    conversation = None
     grammar = None
+    gloss_session = None
     tracker = None
+    motion = None
+    playback = None
     is_listening = False
 
     def on_enter(self, *args):
-        # Initialize Backend Components
-        try:
-            self.tracker = HandTracker(update_callback=self.update_frame)
-            self.tracker.start()
-            
-            self.manager = ConversationManager(on_speech_recognized=self.on_speech_callback)
-            self.grammar = SASLGrammarEngine()
-            
+        # Engines are shared and usually already warm; never build them here
+        if not all(engines.is_ready(name) for name in CONVERSATION_ENGINES):
+            self.chat_log_text += "[System] Loading conversation engines...\n"
+
+        def on_error(e):
+            def show_error(dt):
+                self.chat_log_text += f"[System] Error initializing components: {e}\n"
+            Clock.schedule_once(show_error)
+
+        engines.request(CONVERSATION_ENGINES, self._on_engines_loaded, on_error=on_error)
+
+    def _on_engines_loaded(self, instances):
+        def attach(dt):
+            if self.manager and self.manager.current != self.name:
+                return
+            self.tracker = instances["tracker"]
+            self.tracker.subscribe(self.update_frame)
+
+            self.conversation = instances["conversation"]
+            self.conversation.on_speech_recognized = self.on_speech_callback
+            self.conversation.on_partial_speech = self.on_partial_speech_callback
+            self.conversation.on_speech_abandoned = self.on_speech_abandoned_callback
+            self.grammar = instances["grammar"]
+            self.gloss_session = self.grammar.start_session()
+
+            # Moving signs are matched on the tracker thread
+            self.motion = instances["motion"]
+            self.motion.on_match = self.on_sign_callback
+            self.motion.reset()
+            self.tracker.add_landmark_listener(self.motion.on_landmarks)
+
+            # Gloss deltas are signed by the avatar as they arrive
+            self.playback = instances["playback"]
+            self.playback.on_frame = self.update_avatar_frame
+
+            engines.mark("conversation_ready")
             self.chat_log_text += "[System] Conversation Mode Ready.\n"
-        except Exception as e:
-            self.chat_log_text += f"[System] Error initializing components: {e}\n"
+        Clock.schedule_once(attach)
 
     def on_leave(self, *args):
-        if hasattr(self, 'tracker'):
-            self.tracker.stop()
-        if hasattr(self, 'manager') and self.is_listening:
-            self.manager.stop_listening()
+        if self.tracker:
+            if self.motion:
+                self.tracker.remove_landmark_listener(self.motion.on_landmarks)
+            self.tracker.unsubscribe(self.update_frame)
+            self.tracker = None
+        if self.playback:
+            self.playback.clear()
+            self.playback.on_frame = None
+        if self.conversation and self.is_listening:
+            self.conversation.stop_listening()
+            self.is_listening = False
+            self.mic_status = "Mic: OFF"
+        if self.grammar:
+            # Keep the warm gloss cache for the next session
+            self.grammar.save_cache()
 
     def toggle_mic(self):
-        if not self.manager: return
+        if not self.conversation: return
         
         if self.is_listening:
-            self.manager.stop_listening()
+            self.conversation.stop_listening()
             self.is_listening = False
             self.mic_status = "Mic: OFF"
         else:
-            self.manager.start_listening()
+            self.conversation.start_listening()
             self.is_listening = True
             self.mic_status = "Mic: ON (Listening...)"
 
+    def on_sign_callback(self, gloss, distance):
+        """Called from the tracker thread when a moving sign is recognized"""
+        def process_sign(dt):
+            self.chat_log_text += f"Signed >> {gloss}\n"
+            if self.conversation:
+                # Sign-to-Voice
+                self.conversation.speak(gloss.replace('_', ' ').replace('-', ' ').lower())
+        Clock.schedule_once(process_sign)
+
+    def on_partial_speech_callback(self, text):
+        """Called on the main thread while the speaker is still talking"""
+        if not self.gloss_session:
+            return
+        delta = self.gloss_session.update(text)
+        if self.playback and delta["new"]:
+            self.playback.enqueue(delta["new"])
+        signed = " ".join(self.gloss_session.emitted)
+        pending = " ".join(delta["pending"])
+        self.avatar_status = f"[AVATAR]\nGloss: {signed} [{pending}]"
+
+    def on_speech_abandoned_callback(self):
+        # Utterance ended without a transcript: its frozen words must not
+        # carry over into the next one
+        if self.gloss_session:
+            self.gloss_session.reset()
+
     def on_speech_callback(self, text):
         """Called from background thread when speech is recognized"""
         def process_speech(dt):
             self.chat_log_text += f"Hearing >> {text}\n"
             
-            # Convert to Gloss
-            if self.grammar:
-                result = self.grammar.to_gloss(text)
+            # Convert to Gloss (finishing the incremental session fed by partials)
+            if self.gloss_session:
+                result = self.gloss_session.finish(text)
                 gloss = " ".join(result['gloss'])
                 marker = result['facial_marker']
+                if self.playback:
+                    self.playback.enqueue(result['new'])
                 
                 # Update Avatar UI
                 self.avatar_status = f"[AVATAR]\nGloss: {gloss}\nFace: {marker}"
@@ -156,21 +293,47 @@ class ConversationScreen(Screen):
                 
         Clock.schedule_once(process_speech)
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = LatestFrameSlot()
+        self.presenter = FramePresenter()
+        self.avatar_frames = LatestFrameSlot()
+        self.avatar_presenter = FramePresenter()
+
     def update_frame(self, frame, hand_shape):
+        if self.frames.put((frame, hand_shape)):
+            Clock.schedule_once(self._present_frame)
+
+    def _status_text(self, hand_shape):
+        practice = self.practice
+        if practice and practice.target_sign:
+            return f"Review: {practice.target_sign}   Detected: {hand_shape}"
+        return f"Detected: {hand_shape}"
+
+    def _present_frame(self, dt):
+        item = self.frames.take()
+        if item is None:
+            return
+        frame, hand_shape = item
+        engines.mark("first_frame")
         # Update Camera Feed
         try:
-            buf = cv2.flip(frame, 0).tobytes()
-            texture = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt='bgr')
-            texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
-
-            def update_ui(dt):
-                if self.img:
-                    self.img.texture = texture
-            
-            Clock.schedule_once(update_ui)
+            if self.img:
+                self.presenter.present(frame, self.img)
         except Exception:
             pass
 
+    def update_avatar_frame(self, frame, gloss):
+        """Called on the playback thread for every frame of a sign clip"""
+        if self.avatar_frames.put(frame):
+            Clock.schedule_once(self._present_avatar_frame)
+
+    def _present_avatar_frame(self, dt):
+        frame = self.avatar_frames.take()
+        avatar = self.ids.get('avatar_feed')
+        if frame is not None and avatar:
+            self.avatar_presenter.present(frame, avatar)
+
 # --- Main App ---
 
 class SASLTranslatorApp(App):
@@ -187,7 +350,36 @@ class SASLTranslatorApp(App):
         sm.add_widget(FeedbackScreen(name='feedback'))
         sm.add_widget(ConversationScreen(name='conversation'))
         
+        # Build heavy engines off the UI thread once the first frame is up
+        Clock.schedule_once(lambda dt: self._start_warm_up())
         return sm
 
+    def _start_warm_up(self):
+        engines.mark("ui_built")
+
+        def on_ready(name, instance):
+            if all(engines.is_ready(n) for n in CONVERSATION_ENGINES):
+                engines.mark("engines_warm")
+
+        engines.warm_up(CONVERSATION_ENGINES, on_ready=on_ready)
+
+    def on_stop(self):
+        grammar = engines.peek("grammar")
+        if grammar:
+            # Keep the warm gloss cache for the next session
+            grammar.save_cache()
+        tracker = engines.peek("tracker")
+        if tracker:
+            tracker.shutdown()
+        if self.root:
+            # Closing the app from LearnScreen never leaves it: reschedule
+            # what was practised so far
+            self.root.get_screen('learn')._finish_practice()
+        persistence = engines.peek("persistence")
+        if persistence:
+            # Commit batched progress/feedback writes before exiting
+            persistence.close()
+        print(engines.report())
+
 if __name__ == "__main__":
     SASLTranslatorApp().run()
@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+
+from assets.manager import AssetManager
+from assets.dictionary_store import SignDictionaryStore
+
+def make_assets(tmp_path, present=("help-me.mp4", "thank_you.mp4"), **kwargs):
+    dictionary = {
+        "GREETINGS": {"THANK_YOU": "signs/thank_you.mp4", "HELLO": "signs/hello.mp4"},
+        "EMERGENCY": {"HELP-ME": "signs/help-me.mp4", "POLICE": "signs/police.mp4"},
+    }
+    (tmp_path / "signs").mkdir()
+    for name in present:
+        (tmp_path / "signs" / name).write_bytes(b"video")
+    dict_path = tmp_path / "dictionary.json"
+    dict_path.write_text(json.dumps(dictionary))
+    return AssetManager(dict_path=str(dict_path), base_dir=str(tmp_path),
+                        db_path=str(tmp_path / "dictionary.db"), **kwargs)
+
+def test_aliases_and_phrases(tmp_path):
+    assets = make_assets(tmp_path)
+    assert assets.get_sign_video("help") == str(tmp_path / "signs" / "help-me.mp4")
+    assert assets.lookup("police")[0] == "EMERGENCY"
+
+    resolved = assets.resolve_glosses(["THANK", "YOU", "HELP", "ME", "POLICE", "BOB"])
+    assert [gloss for gloss, _ in resolved] == ["THANK_YOU", "HELP-ME", "POLICE", "BOB"]
+    # POLICE is in the dictionary but its file is missing
+    assert [path is not None for _, path in resolved] == [True, True, False, False]
+
+def test_existence_map_refreshes_on_scan(tmp_path):
+    assets = make_assets(tmp_path)
+    assert assets.get_sign_video("POLICE") is None
+
+    (tmp_path / "signs" / "police.mp4").write_bytes(b"video")
+    # Cached until the next scan
+    assert assets.get_sign_video("POLICE") is None
+    assets.refresh()
+    assert assets.get_sign_video("POLICE") == str(tmp_path / "signs" / "police.mp4")
+
+def test_add_local_sign_updates_index(tmp_path):
+    assets = make_assets(tmp_path)
+    (tmp_path / "signs" / "good_morning.mp4").write_bytes(b"video")
+    assets.add_local_sign("good_morning", "GREETINGS", "signs/good_morning.mp4")
+
+    assert assets.resolve_glosses(["GOOD", "MORNING"])[0] == (
+        "GOOD_MORNING", str(tmp_path / "signs" / "good_morning.mp4"))
+    reloaded = AssetManager(dict_path=assets.dict_path, base_dir=str(tmp_path),
+                            db_path=assets.store.db_path)
+    assert reloaded.get_sign_video("GOOD_MORNING") is not None
+    # Inserted into the store, not written back to the JSON file
+    assert "GOOD_MORNING" not in (tmp_path / "dictionary.json").read_text()
+
+def test_store_imports_once_and_loads_categories(tmp_path):
+    assets = make_assets(tmp_path)
+    store = SignDictionaryStore(assets.store.db_path)
+    assert len(store) == 4
+    assert not store.needs_import(assets.dict_path)
+    assert store.categories() == ["EMERGENCY", "GREETINGS"]
+    assert store.load_category("EMERGENCY") == {"HELP-ME": "signs/help-me.mp4", "POLICE": "signs/police.mp4"}
+    assert store.phrase(("HELP", "ME")) == "HELP-ME"
+
+    # A regional variant wins over the national sign for that region only
+    store.add_sign("hello", "GREETINGS", "signs/hello_wc.mp4", region="WC")
+    assert store.lookup("HELLO") == ("GREETINGS", "signs/hello.mp4")
+    assert store.lookup("HELLO", region="WC") == ("GREETINGS", "signs/hello_wc.mp4")
+    assert store.load_category("GREETINGS", region="WC")["HELLO"] == "signs/hello_wc.mp4"
+
+def test_reimport_deletes_signs_dropped_from_the_json(tmp_path):
+    assets = make_assets(tmp_path)
+    assets.add_local_sign("GOOD_MORNING", "GREETINGS", "signs/good_morning.mp4")
+
+    # THANK_YOU and POLICE are no longer listed
+    dictionary = {"GREETINGS": {"HELLO": "signs/hello.mp4"}, "EMERGENCY": {"HELP-ME": "signs/help-me.mp4"}}
+    (tmp_path / "dictionary.json").write_text(json.dumps(dictionary))
+    store = SignDictionaryStore(assets.store.db_path)
+    assert store.needs_import(assets.dict_path)
+    store.import_json(assets.dict_path)
+
+    assert store.lookup("THANK_YOU") is None and store.lookup("POLICE") is None
+    assert store.phrase(("THANK", "YOU")) is None
+    assert store.phrase(("HELP", "ME")) == "HELP-ME"
+    # Signs added locally are not the file's to delete
+    assert store.lookup("GOOD_MORNING") == ("GREETINGS", "signs/good_morning.mp4")
+    assert len(store) == 3
@@ -0,0 +1,194 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from assets.fetcher import AssetFetcher, SignCache
+from assets.manager import AssetManager
+from tests.test_assets import make_assets
+
+CLIPS = {
+    "/signs/police.mp4": os.urandom(200 * 1024),
+    "/signs/hello.mp4": os.urandom(50 * 1024),
+}
+
+class ClipServer(ThreadingHTTPServer):
+    """Serves CLIPS with Range/If-Range support; can cut the first response short."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ClipHandler)
+        self.requests = []
+        self.truncate_first = False
+        self.delay = 0.0
+        self.manifest = None
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+class ClipHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.get('Range')))
+        body = CLIPS.get(self.path)
+        if self.path == "/clips.json" and server.manifest is not None:
+            body = json.dumps(server.manifest).encode()
+        if body is None:
+            self.send_error(404)
+            return
+        time.sleep(server.delay)
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range', etag) == etag:
+            start = int(range_header.split('=')[1].split('-')[0])
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body) - start))
+        self.send_header('ETag', etag)
+        self.end_headers()
+
+        if server.truncate_first:
+            server.truncate_first = False
+            self.wfile.write(body[start:start + 70 * 1024])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body[start:])
+
+@pytest.fixture
+def server():
+    server = ClipServer()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_concurrent_requests_share_one_download(server, tmp_path):
+    server.delay = 0.2
+    fetcher = AssetFetcher(SignCache(str(tmp_path / "cache")), server.base_url)
+    futures = [fetcher.fetch("signs/police.mp4") for _ in range(5)]
+    clips = [future.result(timeout=5) for future in futures]
+
+    assert len(server.requests) == 1
+    assert len({clip.path for clip in clips}) == 1
+    digest = hashlib.sha256(CLIPS["/signs/police.mp4"]).hexdigest()
+    # Content-addressed: the file name is its hash
+    assert clips[0].path.endswith(digest + ".mp4")
+    with open(clips[0].path, 'rb') as f:
+        assert f.read() == CLIPS["/signs/police.mp4"]
+    assert fetcher.stats()["deduplicated"] == 4
+    fetcher.shutdown()
+
+def test_interrupted_download_resumes_with_range(server, tmp_path):
+    server.truncate_first = True
+    fetcher = AssetFetcher(SignCache(str(tmp_path / "cache")), server.base_url)
+    expected = hashlib.sha256(CLIPS["/signs/police.mp4"]).hexdigest()
+    clip = fetcher.fetch("signs/police.mp4", sha256=expected).result(timeout=5)
+
+    assert clip.sha256 == expected
+    assert [range_header for _, range_header in server.requests][0] is None
+    # The retry only asks for what the first response did not deliver
+    offset = int(server.requests[1][1].split('=')[1].rstrip('-'))
+    assert 0 < offset <= 70 * 1024
+    assert fetcher.stats()["resumed"] == 1
+    fetcher.shutdown()
+
+def test_integrity_failure_is_not_cached(server, tmp_path):
+    cache = SignCache(str(tmp_path / "cache"))
+    fetcher = AssetFetcher(cache, server.base_url)
+    with pytest.raises(ValueError):
+        fetcher.fetch("signs/hello.mp4", sha256="0" * 64).result(timeout=5)
+    assert cache.stats()["clips"] == 0
+    # Failed paths are not hammered again right away
+    with pytest.raises(ValueError):
+        fetcher.fetch("signs/hello.mp4").result(timeout=5)
+    assert len(server.requests) == 1
+    fetcher.shutdown()
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = SignCache(str(tmp_path / "cache"), max_bytes=250)
+    digests = []
+    for i in range(3):
+        src = tmp_path / f"clip{i}"
+        src.write_bytes(bytes([i]) * 100)
+        digests.append(hashlib.sha256(src.read_bytes()).hexdigest())
+        cache.add(str(src), digests[-1], ".mp4")
+        if i == 1:
+            cache.get(digests[0])
+    assert digests[0] in cache and digests[2] in cache
+    assert digests[1] not in cache
+
+    reopened = SignCache(str(tmp_path / "cache"), max_bytes=250)
+    assert reopened.verify(digests[0])
+    assert reopened.stats()["bytes"] == 200
+
+def test_missing_sign_downloads_in_background(server, tmp_path):
+    server.delay = 0.2
+    assets = make_assets(tmp_path, present=(),
+                         fetcher=AssetFetcher(SignCache(str(tmp_path / "cache")), server.base_url))
+
+    start = time.perf_counter()
+    assert assets.get_sign_video("POLICE") is None
+    assert time.perf_counter() - start < 0.1
+
+    done = threading.Event()
+    paths = []
+    assets.fetch_sign("POLICE", callback=lambda gloss, path: (paths.append(path), done.set()))
+    assert done.wait(5)
+    assert assets.get_sign_video("POLICE") == paths[0]
+    assert len(server.requests) == 1
+
+    # Another manager over the same store and cache finds the download
+    reloaded = AssetManager(dict_path=assets.dict_path, base_dir=str(tmp_path), db_path=assets.store.db_path,
+                            fetcher=AssetFetcher(SignCache(str(tmp_path / "cache")), server.base_url))
+    assert reloaded.get_sign_video("POLICE") == paths[0]
+    assets.fetcher.shutdown()
+
+def test_downloads_are_checked_against_the_server_manifest(server, tmp_path):
+    police = CLIPS["/signs/police.mp4"]
+    assets = make_assets(tmp_path, present=(),
+                         fetcher=AssetFetcher(SignCache(str(tmp_path / "cache")), server.base_url))
+
+    # A stale record of an earlier download is not a pin
+    assets.store.set_clip("signs/police.mp4", "0" * 64, 1)
+    assert assets.fetch_sign("POLICE").result(timeout=5).sha256 == hashlib.sha256(police).hexdigest()
+    assert assets.store.expected_clip("signs/police.mp4") is None
+
+    # The manifest is authoritative: a clip that does not match it is rejected
+    server.manifest = {"clips": [
+        {"path": "signs/police.mp4", "sha256": hashlib.sha256(police).hexdigest(), "size": len(police)},
+        {"path": "signs/hello.mp4", "sha256": "1" * 64, "size": 10},
+    ]}
+    synced = []
+    assets.sync_clip_manifest(callback=synced.append).result(timeout=5)
+    deadline = time.time() + 5
+    while not synced and time.time() < deadline:
+        time.sleep(0.01)
+    assert synced == [2]
+    assert assets.store.expected_clip("signs/hello.mp4") == ("1" * 64, 10)
+
+    paths = []
+    done = threading.Event()
+    assets.fetch_sign("HELLO", callback=lambda gloss, path: (paths.append(path), done.set()))
+    assert done.wait(5)
+    assert paths == [None]
+    # Downloads never overwrite a manifest hash
+    assets.store.set_clip("signs/police.mp4", "2" * 64, 1)
+    assert assets.store.clip("signs/police.mp4")[0] == hashlib.sha256(police).hexdigest()
+    assets.fetcher.shutdown()
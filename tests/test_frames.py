@@ -0,0 +1,20 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.frames import LatestFrameSlot
+
+def test_latest_frame_wins():
+    slot = LatestFrameSlot()
+
+    # Only the first put needs to wake the consumer
+    assert slot.put(("frame-1", "Fist (S-Hand)")) is True
+    assert slot.put(("frame-2", "V-Shape")) is False
+    assert slot.put(("frame-3", "V-Shape")) is False
+
+    assert slot.take() == ("frame-3", "V-Shape")
+    assert slot.take() is None
+    assert slot.stats() == {"delivered": 1, "dropped": 2}
+
+    # Slot drained: the next frame wakes the consumer again
+    assert slot.put(("frame-4", "Unknown")) is True
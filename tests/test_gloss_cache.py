@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.gloss_cache import GlossCache
+
+def _result(*words):
+    return {"gloss": list(words), "facial_marker": "neutral"}
+
+def test_lru_eviction_and_stats():
+    cache = GlossCache(max_size=2)
+    cache.put("Call the police", _result("POLICE", "CALL"))
+    cache.put("I need a doctor", _result("I", "NEED", "DOCTOR"))
+
+    # Touch the first entry so the second becomes least recently used
+    assert cache.get("Call  the police ") == _result("POLICE", "CALL")
+    cache.put("Where is the hospital?", _result("HOSPITAL", "WHERE"))
+
+    assert cache.get("I need a doctor") is None
+    assert cache.get("Where is the hospital?") == _result("HOSPITAL", "WHERE")
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["size"] == 2
+
+def test_cached_results_are_copies():
+    cache = GlossCache()
+    cache.put("Call the police", _result("POLICE", "CALL"))
+    cache.get("Call the police")["gloss"].append("NOW")
+
+    assert cache.get("Call the police") == _result("POLICE", "CALL")
+
+def test_persistence_is_tied_to_version(tmp_path):
+    path = str(tmp_path / "gloss_cache.json")
+
+    cache = GlossCache(version="grammar-1/en_core_web_sm-3.7.1", path=path)
+    cache.put("Call the police", _result("POLICE", "CALL"))
+    cache.save()
+
+    warm = GlossCache(version="grammar-1/en_core_web_sm-3.7.1", path=path)
+    assert warm.get("Call the police") == _result("POLICE", "CALL")
+
+    # New grammar rules: the persisted entries must not be reused
+    cold = GlossCache(version="grammar-2/en_core_web_sm-3.7.1", path=path)
+    assert cold.get("Call the police") is None
@@ -45,5 +45,61 @@ def test_sasl_grammar():
 
     print(f"\nPassed {passed}/{len(test_cases)} tests.")
 
+def test_sasl_grammar_batch_matches_single():
+    engine = SASLGrammarEngine()
+    sentences = [
+        "I am going to the shop tomorrow",
+        "Where is the hospital?",
+        "Call the police",
+        "Do you need a doctor?"
+    ]
+
+    batched = list(engine.to_gloss_many(sentences, batch_size=2))
+
+    # Same dicts as to_gloss, in input order
+    assert batched == [engine.to_gloss(s) for s in sentences]
+
+def test_gloss_session_matches_full_sentence():
+    engine = SASLGrammarEngine(cache_size=0)
+    session = engine.start_session()
+    emitted = []
+    for partial in ["where", "where is", "where is the", "where is the hos",
+                    "where is the hospital", "where is the hospital i"]:
+        emitted += session.update(partial)["new"]
+
+    # Settled words are signed before the sentence is over
+    assert emitted == ["HOSPITAL"]
+
+    sentence = "where is the hospital i need"
+    result = session.finish(sentence)
+    emitted += result["new"]
+    assert result["gloss"] == engine.to_gloss(sentence)["gloss"]
+    assert emitted[-1] == "WHERE"
+    assert sorted(emitted) == sorted(result["gloss"])
+
+def test_gloss_session_revised_final_does_not_poison_cache():
+    engine = SASLGrammarEngine()
+    session = engine.start_session()
+    emitted = []
+    for partial in ["the hospital", "the hospital is", "the hospital is far"]:
+        emitted += session.update(partial)["new"]
+    assert emitted == ["HOSPITAL"]
+
+    # The recognizer revised words that were already frozen and signed
+    sentence = "the doctor is far"
+    result = session.finish(sentence)
+    expected = SASLGrammarEngine(cache_size=0).to_gloss(sentence)
+    assert result["gloss"] == expected["gloss"]
+    assert "HOSPITAL" not in result["new"] and "DOCTOR" in result["new"]
+    assert engine.to_gloss(sentence) == expected
+
+    # An abandoned utterance leaves nothing frozen for the next one
+    session.update("call the police now")
+    session.finish("")
+    assert session.words == [] and session.emitted == []
+
 if __name__ == "__main__":
     test_sasl_grammar()
+    test_sasl_grammar_batch_matches_single()
+    test_gloss_session_matches_full_sentence()
+    test_gloss_session_revised_final_does_not_poison_cache()
@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from engine.handshape import classify_hand_shapes, finger_states
+
+def make_hand(fingers, angle=0.0, mirror=False, origin=(320, 400), scale=60):
+    """
+    Synthetic 21-landmark hand in pixel coordinates.
+    fingers = (thumb, index, middle, ring, pinky), 1 = extended.
+    Built in hand space (lateral, up), then rotated/mirrored into the image.
+    """
+    points = np.zeros((21, 2))
+    points[0] = (0.0, 0.0)
+    # Thumb: CMC, MCP, IP, tip (tucked tip folds back towards the pinky)
+    points[1:4] = [(0.3, 0.3), (0.5, 0.5), (0.7, 0.7)]
+    points[4] = (0.9, 0.9) if fingers[0] else (0.1, 0.9)
+    # Index, middle, ring, pinky: MCP, PIP, DIP, tip
+    for i, lateral in enumerate([0.45, 0.15, -0.15, -0.45]):
+        base = 5 + 4 * i
+        if fingers[i + 1]:
+            ups = [1.0, 1.4, 1.7, 2.0]
+        else:
+            ups = [1.0, 1.4, 1.2, 1.0]
+        points[base:base + 4] = [(lateral, up) for up in ups]
+
+    if mirror:
+        points[:, 0] *= -1
+
+    # Hand space "up" is image -y (rows grow downwards)
+    c, s = np.cos(angle), np.sin(angle)
+    lateral_axis = np.array([c, s])
+    up_axis = np.array([s, -c])
+    xy = np.outer(points[:, 0], lateral_axis) + np.outer(points[:, 1], up_axis)
+    xy = xy * scale + np.array(origin)
+
+    return np.concatenate([xy, np.zeros((21, 1))], axis=1).astype(np.float32)
+
+SHAPES = {
+    (0, 1, 1, 1, 1): "Flat Hand (B-Hand)",
+    (0, 1, 1, 0, 0): "V-Shape",
+    (0, 0, 0, 0, 0): "Fist (S-Hand)",
+    (1, 0, 0, 0, 0): "Thumbs Up",
+    (0, 1, 0, 0, 0): "Point (1-Hand)",
+    (1, 1, 0, 0, 1): "Unknown",
+}
+
+def test_classifies_all_hands_in_one_call():
+    fingers = list(SHAPES)
+    landmarks = np.stack([make_hand(f) for f in fingers])
+
+    assert classify_hand_shapes(landmarks) == [SHAPES[f] for f in fingers]
+    assert finger_states(landmarks).tolist() == [[bool(x) for x in f] for f in fingers]
+
+def test_rotation_and_handedness_invariant():
+    for fingers, name in SHAPES.items():
+        for angle in (0.0, 0.6, -1.2, np.pi):
+            for mirror in (False, True):
+                hand = make_hand(fingers, angle=angle, mirror=mirror)
+                assert classify_hand_shapes(hand[None]) == [name], (fingers, angle, mirror)
+
+def test_no_hands():
+    assert classify_hand_shapes(np.zeros((0, 21, 3), dtype=np.float32)) == []
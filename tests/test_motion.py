@@ -0,0 +1,117 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from engine.motion import (TemplateIndex, SequenceRecognizer, dtw_distances, lb_keogh,
+                           keogh_envelopes, resample, sequence_features)
+from test_handshape import make_hand
+
+def make_sign(path, fingers=(0, 1, 1, 1, 1), frames=30):
+    """Landmark sequence of one hand following `path(t)` -> (dx, dy) in palm units."""
+    hand = make_hand(fingers)
+    seq = []
+    for t in np.linspace(0, 1, frames):
+        dx, dy = path(t)
+        seq.append(hand + np.array([dx * 60, dy * 60, 0], dtype=np.float32))
+    return np.stack(seq)
+
+SIGNS = {
+    "HELLO": lambda t: (3 * t, 0.0),                          # sweep sideways
+    "HELP-ME": lambda t: (0.0, -3 * t),                       # lift up
+    "THANK_YOU": lambda t: (0.0, 3 * t),                      # move down/out
+    "WHERE": lambda t: (np.sin(4 * np.pi * t), 0.0),          # wave
+    "DEAF": lambda t: (np.cos(2 * np.pi * t), np.sin(2 * np.pi * t)),  # circle
+}
+
+def build_index():
+    index = TemplateIndex()
+    for gloss, path in SIGNS.items():
+        index.add(gloss, sequence_features(make_sign(path)))
+    return index
+
+def test_vectorized_dtw_matches_reference():
+    rng = np.random.default_rng(1)
+    query = rng.normal(size=(12, 4)).astype(np.float32)
+    templates = rng.normal(size=(3, 12, 4)).astype(np.float32)
+
+    def reference(a, b, window):
+        n = len(a)
+        acc = np.full((n + 1, n + 1), np.inf)
+        acc[0, 0] = 0
+        for i in range(1, n + 1):
+            for j in range(max(1, i - window), min(n, i + window) + 1):
+                cost = np.linalg.norm(a[i - 1] - b[j - 1])
+                acc[i, j] = cost + min(acc[i - 1, j], acc[i, j - 1], acc[i - 1, j - 1])
+        return acc[n, n]
+
+    expected = [reference(t, query, 3) for t in templates]
+    assert np.allclose(dtw_distances(query, templates, window=3), expected, rtol=1e-4)
+
+    # LB_Keogh never exceeds the DTW distance
+    upper, lower = keogh_envelopes(templates, window=3)
+    assert np.all(lb_keogh(query, upper, lower) <= np.array(expected) + 1e-4)
+
+def test_index_matches_time_warped_noisy_sign():
+    index = build_index()
+    rng = np.random.default_rng(0)
+
+    for gloss, path in SIGNS.items():
+        # Performed slower, with jitter
+        warped = lambda t, path=path: path(t ** 1.3)
+        seq = make_sign(warped, frames=40)
+        seq[..., :2] += rng.normal(scale=2.0, size=seq[..., :2].shape)
+        match, distance = index.match(sequence_features(seq))
+        assert match == gloss
+
+        # Pruned search returns the brute-force best template
+        query = resample(sequence_features(seq))
+        brute = dtw_distances(query, index.templates)
+        assert np.isclose(distance, brute.min(), rtol=1e-4)
+
+def test_vp_tree_visits_part_of_a_large_vocabulary():
+    # 128 sweeps: 16 directions x 8 lengths
+    index = TemplateIndex()
+    lengths = np.linspace(1, 4.5, 8)
+    for i, angle in enumerate(np.linspace(0, 2 * np.pi, 16, endpoint=False)):
+        for length in lengths:
+            path = lambda t, a=angle, m=length: (m * t * np.cos(a), m * t * np.sin(a))
+            index.add(f"SWEEP_{i}_{length:.1f}", sequence_features(make_sign(path)))
+
+    rng = np.random.default_rng(0)
+    angle, length = 5 * 2 * np.pi / 16, lengths[3]
+    seq = make_sign(lambda t: (length * t ** 1.3 * np.cos(angle), length * t ** 1.3 * np.sin(angle)), frames=40)
+    seq[..., :2] += rng.normal(scale=2.0, size=seq[..., :2].shape)
+    match, distance = index.match(sequence_features(seq))
+
+    assert match == f"SWEEP_5_{length:.1f}"
+    brute = dtw_distances(resample(sequence_features(seq)), index.templates)
+    assert np.isclose(distance, brute.min(), rtol=1e-4)
+    # Only part of the tree is visited, and DTW runs on a handful
+    assert index.coarse_evaluations < len(index) // 2
+    assert index.dtw_evaluations <= 8
+
+def test_recognizer_reports_sign_from_ring_buffer():
+    matches = []
+    recognizer = SequenceRecognizer(build_index(), window_frames=30, stride=5,
+                                    on_match=lambda gloss, d: matches.append(gloss))
+
+    # Idle hand, then HELLO
+    idle = make_sign(lambda t: (0.0, 0.0), frames=10)
+    for frame in idle:
+        recognizer.push(frame[None])
+    for frame in make_sign(SIGNS["HELLO"], frames=30):
+        recognizer.push(frame[None])
+
+    assert matches and matches[-1] == "HELLO"
+
+def test_template_index_round_trip(tmp_path):
+    index = build_index()
+    path = str(tmp_path / "motion_templates.npz")
+    index.save(path)
+
+    loaded = TemplateIndex.load(path)
+    assert loaded.glosses == index.glosses
+    match, _ = loaded.match(sequence_features(make_sign(SIGNS["DEAF"])))
+    assert match == "DEAF"
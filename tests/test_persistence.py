@@ -0,0 +1,233 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from engine import persistence
+from engine.persistence import PersistenceManager
+
+def test_write_behind_batches_and_collapses_updates(tmp_path):
+    pm = PersistenceManager(db_path=str(tmp_path / "stats.db"), batch_interval=10)
+    for level in (0, 1, 2):
+        pm.update_mastery("HELLO", level)
+    pm.update_mastery("POLICE", 1)
+    pm.queue_feedback("BUS", "Gauteng", "Hand moves twice")
+    assert pm.flush(timeout=2)
+
+    assert pm.stats()["batches"] == 1
+    rows = pm.conn.execute("SELECT sign_name, level FROM mastery ORDER BY sign_name").fetchall()
+    assert rows == [("HELLO", 2), ("POLICE", 1)]
+    assert len(pm.get_unsynced_feedback()) == 1
+    pm.close()
+
+def test_shared_between_threads_and_flushed_on_close(tmp_path):
+    db_path = str(tmp_path / "stats.db")
+    pm = PersistenceManager(db_path=db_path)
+
+    def practice(worker):
+        for i in range(50):
+            pm.update_mastery(f"SIGN_{worker}_{i}", 1)
+
+    threads = [threading.Thread(target=practice, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pm.close()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT COUNT(*) FROM mastery").fetchone()[0] == 200
+    conn.close()
+
+def test_synchronous_mode_writes_immediately(tmp_path):
+    pm = PersistenceManager(db_path=str(tmp_path / "stats.db"), write_behind=False)
+    pm.update_mastery("HELLO", 1)
+    assert pm.conn.execute("SELECT level FROM mastery").fetchone() == (1,)
+    pm.close()
+
+def test_practice_events_maintain_aggregates(tmp_path):
+    pm = PersistenceManager(db_path=str(tmp_path / "stats.db"), write_behind=False)
+    pm.log_practice("HELLO", "Flat Hand (B-Hand)", 0.9, correct=True, category="GREETINGS")
+    pm.log_practice("HELLO", "Fist (S-Hand)", 0.7, correct=False, category="GREETINGS")
+    pm.log_practice("POLICE", "V-Shape", 0.8, category="EMERGENCY")
+    pm.log_practice("V-Shape", "V-Shape", 0.9, correct=None, category="HANDSHAPES")
+
+    stats = pm.get_sign_stats("HELLO")
+    assert (stats["attempts"], stats["correct"], stats["category"]) == (2, 1, "GREETINGS")
+    assert abs(stats["mean_confidence"] - 0.8) < 1e-9
+    # Untargeted attempts count as practice but not towards correctness
+    free = pm.get_sign_stats("V-Shape")
+    assert (free["attempts"], free["graded"], free["correct"]) == (1, 0, 0)
+    categories = pm.get_category_stats()
+    assert categories["GREETINGS"]["attempts"] == 2
+    assert categories["EMERGENCY"]["correct"] == 1
+
+    # Mastery levels move signs between categories' learning/mastered counts
+    pm.update_mastery("HELLO", 1, category="GREETINGS")
+    pm.update_mastery("WAVE", 2, category="GREETINGS")
+    pm.update_mastery("POLICE", 1, category="EMERGENCY")
+    assert pm.get_progress() == [("EMERGENCY", 1), ("GREETINGS", 2)]
+    pm.update_mastery("HELLO", 0)
+    pm.update_mastery("POLICE", 2, category="GREETINGS")
+    assert pm.get_progress() == [("GREETINGS", 2)]
+    assert pm.get_category_stats()["GREETINGS"]["mastered"] == 2
+    # category=None keeps the category set earlier
+    assert pm.conn.execute("SELECT category FROM mastery WHERE sign_name = 'HELLO'").fetchone() == ("GREETINGS",)
+    pm.close()
+
+def test_existing_mastery_is_backfilled(tmp_path):
+    db_path = str(tmp_path / "stats.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE mastery (sign_name TEXT PRIMARY KEY, category TEXT, level INTEGER DEFAULT 0, "
+                 "last_practiced TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    conn.executemany("INSERT INTO mastery (sign_name, category, level) VALUES (?, ?, ?)",
+                     [("HELLO", "GREETINGS", 1), ("WAVE", "GREETINGS", 2), ("BUS", "TRAVEL", 0)])
+    conn.commit()
+    conn.close()
+
+    pm = PersistenceManager(db_path=db_path, write_behind=False)
+    assert pm.get_progress() == [("GREETINGS", 2)]
+    pm.close()
+
+def test_sm2_due_queue_and_bulk_reschedule(tmp_path):
+    pm = PersistenceManager(db_path=str(tmp_path / "stats.db"), batch_interval=10)
+    now = time.time()
+    for i in range(300):
+        pm.update_mastery(f"SIGN_{i:03d}", 1, category="GREETINGS")
+    pm.flush()
+    assert len(pm.get_due_signs(limit=500, now=now + 1)) == 300
+
+    # One session reviews 200 signs: rescheduled in a single transaction
+    batches = pm.stats()["batches"]
+    pm.record_reviews([(f"SIGN_{i:03d}", 5) for i in range(200)], now=now)
+    pm.record_reviews([("SIGN_000", 1)], now=now)
+    due = pm.get_due_signs(limit=5, now=now + 1)
+    assert pm.stats()["batches"] == batches + 1
+    assert [name for name, _ in due] == ["SIGN_200", "SIGN_201", "SIGN_202", "SIGN_203", "SIGN_204"]
+
+    # Correct once -> due in a day; the failed recall restarts SIGN_000
+    tomorrow = [name for name, _ in pm.get_due_signs(limit=500, now=now + 86400 + 1)]
+    assert len(tomorrow) == 300
+    row = pm.conn.execute("SELECT repetitions, interval_days FROM mastery WHERE sign_name = 'SIGN_000'").fetchone()
+    assert row == (0, 1.0)
+
+    plan = " ".join(row[-1] for row in pm.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT sign_name, due_at FROM mastery WHERE due_at <= ? "
+        "ORDER BY due_at, sign_name LIMIT 10", ("2030-01-01",)))
+    assert "COVERING INDEX mastery_due" in plan
+
+def test_due_signs_of_one_category(tmp_path):
+    pm = PersistenceManager(db_path=str(tmp_path / "stats.db"), write_behind=False)
+    pm.update_mastery("HELLO", 1, category="GREETINGS")
+    pm.update_mastery("V-Shape", 1, category="HANDSHAPES")
+    due = pm.get_due_signs(category="HANDSHAPES", now=time.time() + 1)
+    assert [name for name, _ in due] == ["V-Shape"]
+    pm.close()
+    pm.close()
+
+def test_one_review_per_sign_per_session(tmp_path):
+    pm = PersistenceManager(db_path=str(tmp_path / "stats.db"), write_behind=False)
+    now = time.time()
+    # Raising the same shape four times in one sitting is one review
+    pm.record_reviews([("V-Shape", 5, "HANDSHAPES")] * 4, now=now)
+    row = pm.conn.execute("SELECT category, level, repetitions, interval_days FROM mastery").fetchone()
+    assert row == ("HANDSHAPES", 1, 1, 1.0)
+    assert pm.get_progress() == [("HANDSHAPES", 1)]
+
+    # A failed attempt in the session grades the whole session
+    pm.record_reviews([("V-Shape", 5), ("V-Shape", 1)], now=now + 86400)
+    row = pm.conn.execute("SELECT category, repetitions FROM mastery").fetchone()
+    assert row == ("HANDSHAPES", 0)
+    pm.close()
+
+def test_sessions_on_successive_due_dates_reach_mastered(tmp_path):
+    pm = PersistenceManager(db_path=str(tmp_path / "stats.db"), write_behind=False)
+    pm.update_mastery("HELLO", 1, category="GREETINGS")
+    now = time.time()
+    for _ in range(4):
+        pm.record_reviews([("HELLO", 5)], now=now)
+        interval = pm.conn.execute("SELECT interval_days FROM mastery").fetchone()[0]
+        now += interval * 86400
+    row = pm.conn.execute("SELECT level, repetitions, interval_days FROM mastery").fetchone()
+    assert row[0] == 2 and row[1] == 4 and row[2] >= 21
+    assert pm.get_category_stats()["GREETINGS"]["mastered"] == 1
+    pm.close()
+
+def test_failed_batches_are_retried_and_bad_writes_dropped_alone(tmp_path, monkeypatch):
+    monkeypatch.setattr(persistence, "RETRY_DELAY_S", 0.01)
+    pm = PersistenceManager(db_path=str(tmp_path / "stats.db"), batch_interval=10)
+    write_batch = pm._write_batch
+    failures = [sqlite3.OperationalError("database is locked")]
+
+    def flaky(batch):
+        if failures:
+            raise failures.pop()
+        if any(args[0] == "BROKEN" for _, args in batch):
+            raise RuntimeError("bad write")
+        write_batch(batch)
+    monkeypatch.setattr(pm, "_write_batch", flaky)
+
+    # A locked database is retried
+    pm.update_mastery("HELLO", 1)
+    assert pm.flush(timeout=2)
+    # A write that can never succeed is dropped on its own; the writer lives on
+    pm.update_mastery("BROKEN", 1)
+    pm.update_mastery("WAVE", 1)
+    assert not pm.flush(timeout=2)
+    assert pm._writer.is_alive()
+    pm.update_mastery("POLICE", 1)
+    assert pm.flush(timeout=2)
+
+    rows = pm.conn.execute("SELECT sign_name FROM mastery ORDER BY sign_name").fetchall()
+    assert rows == [("HELLO",), ("POLICE",), ("WAVE",)]
+    assert pm.stats()["dropped"] == 1
+    pm.close()
+
+def test_permanent_errors_are_not_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(persistence, "RETRY_DELAY_S", 0.01)
+    pm = PersistenceManager(db_path=str(tmp_path / "stats.db"), batch_interval=10)
+    pm.conn.execute("DROP TABLE feedback_queue")
+    pm.conn.commit()
+
+    # "no such table" never clears: the feedback is dropped, the rest committed
+    pm.update_mastery("HELLO", 1)
+    pm.queue_feedback("BUS", "Gauteng", "Hand moves twice")
+    assert not pm.flush(timeout=2)
+    assert pm.stats()["dropped"] == 1
+    assert pm.stats()["pending"] == 0
+    assert pm.conn.execute("SELECT sign_name FROM mastery").fetchall() == [("HELLO",)]
+    # Nothing is left to retry: an empty flush succeeds again only after a good batch
+    assert not pm.flush(timeout=2)
+    pm.update_mastery("WAVE", 1)
+    assert pm.flush(timeout=2)
+    pm.close()
+
+def test_close_waits_for_the_writer_before_closing(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "stats.db")
+    pm = PersistenceManager(db_path=db_path, batch_interval=0)
+    write_batch = pm._write_batch
+    release = threading.Event()
+
+    def slow(batch):
+        release.wait(2)
+        write_batch(batch)
+    monkeypatch.setattr(pm, "_write_batch", slow)
+
+    pm.update_mastery("HELLO", 1)
+    pm.close(timeout=0.05)
+    # The writer still holds the batch: the connection stays open for it
+    release.set()
+    pm._writer.join(2)
+    assert not pm._writer.is_alive()
+    with pytest.raises(sqlite3.ProgrammingError):
+        pm.conn.execute("SELECT 1")
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT sign_name FROM mastery").fetchall() == [("HELLO",)]
+    conn.close()
@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.phrase_audio import PhraseAudioCache
+
+def fake_render(size):
+    def render(path):
+        with open(path, 'wb') as f:
+            f.write(b"RIFF" + b"\0" * (size - 4))
+    return render
+
+def test_keyed_by_voice_and_rate(tmp_path):
+    cache = PhraseAudioCache(directory=str(tmp_path), voice="en-za", rate=150)
+    path = cache.render("Help me", fake_render(100))
+    assert cache.get("  help ME ") == path
+
+    other_voice = PhraseAudioCache(directory=str(tmp_path), voice="en-gb", rate=150)
+    assert other_voice.get("help me") is None
+    other_rate = PhraseAudioCache(directory=str(tmp_path), voice="en-za", rate=200)
+    assert other_rate.get("help me") is None
+
+def test_evicts_least_recently_played_but_keeps_pinned(tmp_path):
+    cache = PhraseAudioCache(directory=str(tmp_path), max_bytes=300)
+    cache.render("police", fake_render(100), pin=True)
+    cache.render("hello", fake_render(100))
+    cache.render("thank you", fake_render(100))
+    cache.get("hello")
+    cache.render("goodbye", fake_render(100))
+
+    assert "police" in cache
+    assert "hello" in cache
+    assert "thank you" not in cache
+    assert cache.stats()["bytes"] == 300
+    assert len(os.listdir(tmp_path)) == 3
+
+    # Recency and contents survive a restart
+    reopened = PhraseAudioCache(directory=str(tmp_path), max_bytes=300)
+    assert reopened.get("goodbye") is not None
+
+def test_interrupted_render_is_not_cached(tmp_path):
+    cache = PhraseAudioCache(directory=str(tmp_path))
+    assert cache.render("fire", fake_render(10)) is None
+    assert "fire" not in cache
+    assert os.listdir(tmp_path) == []
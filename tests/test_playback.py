@@ -0,0 +1,92 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+
+import numpy as np
+
+from engine.playback import PlaybackScheduler, DecodedClipCache, FINGERSPELL_PREFIX
+from test_assets import make_assets
+
+CLIPS = {"HELLO": "hello.mp4", "POLICE": "police.mp4", "WHERE": "where.mp4",
+         FINGERSPELL_PREFIX + "O": "letter_o.mp4"}
+
+class SlowDecoder:
+    """5-frame clips at 100 fps that take 30 ms to decode."""
+    def __init__(self):
+        self.decoded = []
+
+    def __call__(self, path):
+        self.decoded.append(path)
+        time.sleep(0.03)
+        return np.zeros((5, 8, 8, 3), dtype=np.uint8), 100.0
+
+def test_plays_in_order_with_fingerspelling_and_prefetch():
+    decoder = SlowDecoder()
+    shown = []
+    signs = []
+    player = PlaybackScheduler(
+        resolve=CLIPS.get, decode=decoder,
+        on_frame=lambda frame, gloss: shown.append(gloss),
+        on_sign=signs.append
+    )
+    player.enqueue(["HELLO", "POLICE", "WHERE", "BOB", "HELLO"])
+    assert player.wait_idle(timeout=5)
+
+    assert signs == ["HELLO", "POLICE", "WHERE", "BOB", "HELLO"]
+    # BOB has no clip: B (card), O (letter clip), B (card)
+    assert shown[15:] == ["B"] * 8 + ["O"] * 5 + ["B"] * 8 + ["HELLO"] * 5
+    # HELLO decoded once, served from the frame cache the second time
+    assert decoder.decoded.count("hello.mp4") == 1
+
+    stats = player.stats()
+    assert stats["signs_played"] == 5
+    assert stats["fingerspelled"] == 1
+    # Decoding ahead hides the 30 ms decode behind the 50 ms clips
+    assert stats["gap_ms_max"] < 25
+    player.shutdown()
+
+def test_clear_stops_playback():
+    decoder = SlowDecoder()
+    shown = []
+    player = PlaybackScheduler(resolve=CLIPS.get, decode=decoder,
+                               on_frame=lambda frame, gloss: shown.append(gloss))
+    player.enqueue(["HELLO"] * 20)
+    time.sleep(0.1)
+    player.clear()
+    assert player.wait_idle(timeout=2)
+    assert len(shown) < 100
+    player.shutdown()
+
+def test_clip_cache_is_bounded_by_bytes():
+    cache = DecodedClipCache(max_bytes=2000)
+    for name in ("a", "b", "c"):
+        cache.put(name, np.zeros(1000, dtype=np.uint8), 25.0)
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.stats()["bytes"] == 2000
+
+def test_phrases_are_signed_as_one_sign(tmp_path):
+    assets = make_assets(tmp_path)
+    clips = dict(CLIPS, THANK_YOU="thank_you.mp4")
+    gate = threading.Event()
+
+    def decode(path):
+        if path == "hello.mp4":
+            gate.wait(2)
+        return np.zeros((2, 8, 8, 3), dtype=np.uint8), 100.0
+
+    signs = []
+    player = PlaybackScheduler(resolve=clips.get, decode=decode, on_sign=signs.append,
+                               merge=assets.merge_phrases, max_phrase_length=assets.max_phrase_length)
+    # "THANK" and "YOU" arrive in separate gloss deltas while HELLO is loading
+    player.enqueue(["HELLO", "THANK"])
+    player.enqueue(["YOU"])
+    gate.set()
+    player.enqueue(["WHERE", "THANK", "YOU"])
+    assert player.wait_idle(timeout=5)
+
+    assert signs == ["HELLO", "THANK_YOU", "WHERE", "THANK_YOU"]
+    player.shutdown()
@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.practice import PracticeEventDetector
+
+def run(detector, frames):
+    for shapes in frames:
+        detector.feed(shapes)
+
+def test_held_shape_is_one_attempt():
+    attempts = []
+    detector = PracticeEventDetector(lambda *event: attempts.append(event), window=10)
+    # Flickering classification, then a long hold, lowering the hand and again
+    run(detector, [["V-Shape"], ["Fist (S-Hand)"]] * 5)
+    run(detector, [["V-Shape"]] * 40)
+    run(detector, [[]] * 10)
+    run(detector, [["V-Shape"]] * 10)
+
+    assert len(attempts) == 2
+    sign, shape, confidence, correct, category = attempts[0]
+    # Free practice: nothing to grade against
+    assert (sign, shape, correct, category) == ("V-Shape", "V-Shape", None, "HANDSHAPES")
+    assert 0.6 <= confidence <= 1.0
+
+def test_target_sign_marks_correctness():
+    attempts = []
+    detector = PracticeEventDetector(lambda *event: attempts.append(event), window=5)
+    detector.set_target("PEACE", "V-Shape", "GREETINGS")
+    run(detector, [["Fist (S-Hand)"]] * 5 + [["V-Shape"]] * 5)
+
+    assert [(a[0], a[1], a[3]) for a in attempts] == [
+        ("PEACE", "Fist (S-Hand)", False), ("PEACE", "V-Shape", True)]
+
+def test_session_results_are_graded_for_review():
+    detector = PracticeEventDetector(lambda *event: None, window=5)
+    detector.set_target("PEACE", "V-Shape", "GREETINGS")
+    run(detector, [["Fist (S-Hand)"]] * 5 + [["V-Shape"]] * 5)
+    # One review per sign per session, graded by the worst attempt
+    assert detector.review_results() == [("PEACE", 1, "GREETINGS")]
+
+def test_free_practice_passes_review_without_an_easy_grade():
+    detector = PracticeEventDetector(lambda *event: None, window=5)
+    run(detector, [["V-Shape"]] * 5)
+    assert detector.review_results() == [("V-Shape", 3, "HANDSHAPES")]
+
+def test_review_targets_due_shapes_until_signed_correctly():
+    attempts = []
+    detector = PracticeEventDetector(lambda *event: attempts.append(event), window=5)
+    detector.review(["V-Shape", "Fist (S-Hand)"])
+    run(detector, [["Fist (S-Hand)"]] * 5 + [["V-Shape"]] * 5 + [["Fist (S-Hand)"]] * 5)
+
+    assert [(a[0], a[3]) for a in attempts] == [("V-Shape", False), ("V-Shape", True), ("Fist (S-Hand)", True)]
+    # Nothing left to review: back to free practice
+    assert detector.target_sign is None
+    run(detector, [["V-Shape"]] * 5)
+    assert attempts[-1][0] == "V-Shape" and attempts[-1][3] is None
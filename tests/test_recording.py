@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from engine.recording import LandmarkRecorder, LandmarkRecording
+
+def _hands(i, n_hands):
+    return np.full((n_hands, 21, 3), i, dtype=np.float32)
+
+def test_round_trip_random_access_and_slices(tmp_path):
+    path = str(tmp_path / "session.lmrec")
+    with LandmarkRecorder(path, chunk_frames=4, frame_size=(640, 480)) as rec:
+        for i in range(10):
+            rec.write(i * 0.5, None if i % 3 == 0 else _hands(i, 1 + i % 2))
+
+    recording = LandmarkRecording(path)
+    assert len(recording) == 10
+    assert len(recording.chunks) == 3
+    assert recording.frame_size == (640, 480)
+
+    t, landmarks = recording.frame(5)
+    assert t == 2.5
+    assert landmarks.shape == (2, 21, 3)
+    assert np.all(landmarks == 5)
+    # Zero-copy: the frame is a view onto the mapped file
+    assert not landmarks.flags['OWNDATA']
+
+    assert recording.frame(3)[1].shape == (0, 21, 3)
+    assert list(recording[2:7]["t"]) == [1.0, 1.5, 2.0, 2.5, 3.0]
+    assert list(recording[4:6]["n_hands"]) == [1, 2]
+    assert list(recording.timestamps) == [i * 0.5 for i in range(10)]
+
+def test_append_and_recover_unclosed(tmp_path):
+    path = str(tmp_path / "session.lmrec")
+    with LandmarkRecorder(path, chunk_frames=4) as rec:
+        for i in range(5):
+            rec.write(float(i), _hands(i, 1))
+
+    # Re-opening appends after the existing frames
+    rec = LandmarkRecorder(path, chunk_frames=4)
+    for i in range(5, 9):
+        rec.write(float(i), _hands(i, 1))
+    rec.flush()
+    # No close(): simulate a crash, the index must be rebuilt from chunks
+
+    recording = LandmarkRecording(path)
+    assert list(recording.timestamps) == [float(i) for i in range(9)]
+
+def test_frame_size_known_only_at_close(tmp_path):
+    path = str(tmp_path / "learn.lmrec")
+    rec = LandmarkRecorder(path)
+    rec.write(0.0, _hands(1, 1))
+    rec.frame_size = (1280, 720)
+    rec.close()
+
+    assert LandmarkRecording(path).frame_size == (1280, 720)
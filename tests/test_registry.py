@@ -0,0 +1,89 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+
+from engine.registry import EngineRegistry
+
+def test_engine_is_built_once_and_shared():
+    builds = []
+
+    def factory():
+        time.sleep(0.05)
+        builds.append(1)
+        return object()
+
+    registry = EngineRegistry()
+    registry.register("grammar", factory)
+    registry.warm_up(["grammar"])
+
+    # A get() racing the warm-up thread must wait, not build a second copy
+    first = registry.get("grammar")
+    assert registry.get("grammar") is first
+    assert len(builds) == 1
+    assert "grammar" in registry.build_times
+
+def test_request_delivers_without_blocking():
+    registry = EngineRegistry()
+    registry.register("tracker", lambda: "tracker")
+    done = threading.Event()
+    received = {}
+
+    def callback(instances):
+        received.update(instances)
+        done.set()
+
+    registry.request(["tracker"], callback)
+    assert done.wait(1)
+    assert received == {"tracker": "tracker"}
+
+def test_factory_error_is_reported():
+    def factory():
+        raise ImportError("No module named 'mediapipe'")
+
+    registry = EngineRegistry()
+    registry.register("tracker", factory)
+    errors = []
+    done = threading.Event()
+
+    def on_error(e):
+        errors.append(e)
+        done.set()
+
+    registry.request(["tracker"], lambda instances: None, on_error=on_error)
+    assert done.wait(1)
+    assert isinstance(errors[0], ImportError)
+    assert "FAILED" in registry.report()
+
+def test_failed_build_is_retried_later_or_after_reset():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("camera busy")
+        return "tracker"
+
+    registry = EngineRegistry(retry_after_s=0.05)
+    registry.register("tracker", factory)
+    for _ in range(2):
+        try:
+            registry.get("tracker")
+        except RuntimeError:
+            pass
+    # The cached error is raised again until the retry window passes
+    assert len(attempts) == 1
+
+    time.sleep(0.06)
+    try:
+        registry.get("tracker")
+    except RuntimeError:
+        pass
+    assert len(attempts) == 2
+
+    registry.reset("tracker")
+    assert registry.get("tracker") == "tracker"
+    assert len(attempts) == 3
+    assert "FAILED" not in registry.report()
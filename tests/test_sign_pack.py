@@ -0,0 +1,121 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import hashlib
+import io
+import json
+import tarfile
+
+import pytest
+
+from assets.fetcher import SignCache
+from assets.sign_pack import build_pack, read_manifest
+from tests.test_assets import make_assets
+
+class ReadOnlyStream:
+    """A non-seekable stream, like an HTTP response body."""
+    def __init__(self, data):
+        self._buffer = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._buffer.read(size)
+
+def make_clips(tmp_path, contents):
+    signs = []
+    for gloss, (category, data) in contents.items():
+        path = tmp_path / "src" / f"{gloss.lower()}.mp4"
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(data)
+        signs.append({"gloss": gloss, "category": category,
+                      "path": f"signs/{gloss.lower()}.mp4", "file": str(path)})
+    return signs
+
+def test_full_then_differential_pack(tmp_path):
+    assets = make_assets(tmp_path, present=(), cache=SignCache(str(tmp_path / "cache")))
+    v1 = make_clips(tmp_path, {
+        "HELLO": ("GREETINGS", b"hello v1"),
+        "WAVE": ("GREETINGS", b"wave"),
+        "POLICE": ("EMERGENCY", b"police"),
+    })
+    build_pack(str(tmp_path / "v1.tar.gz"), v1, name="core", version=1)
+    with open(tmp_path / "v1.tar.gz", 'rb') as f:
+        assets.import_pack(ReadOnlyStream(f.read()))
+
+    assert assets.store.pack_version("core") == 1
+    with open(assets.get_sign_video("WAVE"), 'rb') as f:
+        assert f.read() == b"wave"
+    assert assets.get_sign_video("POLICE") is not None
+
+    # v2 changes HELLO, adds GOODBYE and drops WAVE
+    v2 = make_clips(tmp_path, {
+        "HELLO": ("GREETINGS", b"hello v2"),
+        "GOODBYE": ("GREETINGS", b"goodbye"),
+        "POLICE": ("EMERGENCY", b"police"),
+    })
+    base = read_manifest(str(tmp_path / "v1.tar.gz"))
+    diff = build_pack(str(tmp_path / "v2.diff.tar"), v2, name="core", version=2,
+                      base_manifest=base, compress=False)
+    assert sorted(e["gloss"] for e in diff["signs"]) == ["GOODBYE", "HELLO"]
+    assert diff["removed"] == [{"gloss": "WAVE", "region": ""}]
+    with tarfile.open(tmp_path / "v2.diff.tar") as tar:
+        assert len(tar.getnames()) == 3  # manifest + two changed clips
+
+    assets.import_pack(str(tmp_path / "v2.diff.tar"))
+    assert assets.store.pack_version("core") == 2
+    assert assets.lookup("WAVE") is None
+    with open(assets.get_sign_video("HELLO"), 'rb') as f:
+        assert f.read() == b"hello v2"
+    assert assets.get_sign_video("GOODBYE") is not None
+
+def test_differential_pack_needs_its_base(tmp_path):
+    assets = make_assets(tmp_path, cache=SignCache(str(tmp_path / "cache")))
+    signs = make_clips(tmp_path, {"WAVE": ("GREETINGS", b"wave")})
+    base = {"version": 1, "signs": []}
+    build_pack(str(tmp_path / "v2.tar"), signs, name="core", version=2, base_manifest=base)
+    with pytest.raises(ValueError):
+        assets.import_pack(str(tmp_path / "v2.tar"))
+    assert assets.lookup("WAVE") is None
+
+def test_corrupt_clip_leaves_dictionary_untouched(tmp_path):
+    assets = make_assets(tmp_path, cache=SignCache(str(tmp_path / "cache")))
+    claimed = hashlib.sha256(b"wave").hexdigest()
+    manifest = {"format": 1, "name": "core", "version": 1, "base_version": None, "removed": [],
+                "signs": [{"gloss": "WAVE", "category": "GREETINGS", "path": "signs/wave.mp4",
+                           "region": "", "sha256": claimed, "size": 4}]}
+    with tarfile.open(tmp_path / "bad.tar", 'w') as tar:
+        for name, data in (("manifest.json", json.dumps(manifest).encode()),
+                           (f"clips/{claimed}.mp4", b"evil")):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+    with pytest.raises(ValueError):
+        assets.import_pack(str(tmp_path / "bad.tar"))
+    assert assets.lookup("WAVE") is None
+    assert claimed not in assets.cache
+
+def test_full_pack_replaces_previous_version(tmp_path):
+    assets = make_assets(tmp_path, present=(), cache=SignCache(str(tmp_path / "cache")))
+    v1 = make_clips(tmp_path, {"WAVE": ("GREETINGS", b"wave"), "POLICE": ("EMERGENCY", b"police")})
+    build_pack(str(tmp_path / "v1.tar"), v1, name="core", version=1)
+    assets.import_pack(str(tmp_path / "v1.tar"))
+
+    v2 = make_clips(tmp_path, {"POLICE": ("EMERGENCY", b"police")})
+    build_pack(str(tmp_path / "v2.tar"), v2, name="core", version=2)
+    assets.import_pack(str(tmp_path / "v2.tar"))
+
+    assert assets.store.pack_version("core") == 2
+    assert assets.lookup("WAVE") is None
+    assert assets.get_sign_video("POLICE") is not None
+
+def test_pack_larger_than_cache_is_refused(tmp_path):
+    cache = SignCache(str(tmp_path / "cache"), max_bytes=8)
+    assets = make_assets(tmp_path, present=(), cache=cache)
+    signs = make_clips(tmp_path, {"WAVE": ("GREETINGS", b"wave"), "POLICE": ("EMERGENCY", b"police")})
+    build_pack(str(tmp_path / "v1.tar"), signs, name="core", version=1)
+
+    with pytest.raises(ValueError):
+        assets.import_pack(str(tmp_path / "v1.tar"))
+    assert assets.lookup("WAVE") is None
+    assert cache.stats()["clips"] == 0
@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from engine.sources import ImageDirectorySource, LandmarkReplaySource, save_landmark_stream
+from engine.tracker import HandTracker, PACING_NONE
+from test_handshape import make_hand
+
+def test_image_directory_source_ends(tmp_path):
+    for i in range(3):
+        cv2.imwrite(str(tmp_path / f"{i:03d}.png"), np.full((48, 64, 3), i, dtype=np.uint8))
+
+    source = ImageDirectorySource(str(tmp_path))
+    source.open()
+    frames = []
+    while True:
+        ok, frame = source.read()
+        if not ok:
+            break
+        frames.append(int(frame[0, 0, 0]))
+
+    assert frames == [0, 1, 2]
+    assert source.finished
+
+def test_tracker_replays_landmark_stream_headless(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    v_shape = make_hand((0, 1, 1, 0, 0))[None]
+    save_landmark_stream(path, [(0.0, (640, 480), v_shape),
+                                (0.033, (640, 480), None),
+                                (0.066, (640, 480), v_shape)])
+
+    shapes = []
+    tracker = HandTracker(update_callback=lambda frame, shape: shapes.append(shape),
+                          pacing=PACING_NONE, source=LandmarkReplaySource(path))
+    tracker.start()
+    tracker.thread.join(timeout=5)
+
+    # The loop stops by itself at the end of the recording
+    assert not tracker.running
+    assert shapes == ["V-Shape", "None", "V-Shape"]
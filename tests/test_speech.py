@@ -0,0 +1,83 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import wave
+
+import numpy as np
+
+from engine.speech import EnergyVAD, StreamingTranscriber, WavFileSource, replay, SAMPLE_RATE, CHUNK_SAMPLES
+
+class FakeRecognizer:
+    """Streams 'word' per 10 voiced chunks as its partial hypothesis."""
+    streaming = True
+
+    def __init__(self):
+        self.chunks = 0
+        self.resets = 0
+
+    def reset(self):
+        self.chunks = 0
+        self.resets += 1
+
+    def accept(self, chunk):
+        self.chunks += 1
+        return " ".join(["word"] * (self.chunks // 10))
+
+    def finish(self):
+        return f"{self.chunks} chunks"
+
+def write_wav(path, segments, rate=SAMPLE_RATE):
+    """segments: [(seconds, amplitude)], a 300 Hz tone (or silence for 0)."""
+    parts = []
+    for seconds, amplitude in segments:
+        t = np.arange(int(seconds * rate)) / rate
+        parts.append(amplitude * np.sin(2 * np.pi * 300 * t))
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(np.concatenate(parts).astype('<i2').tobytes())
+
+def test_vad_endpoints_each_utterance(tmp_path):
+    path = tmp_path / "two_phrases.wav"
+    write_wav(path, [(0.5, 0), (0.9, 8000), (0.8, 0), (0.6, 8000), (0.2, 0)])
+
+    recognizer = FakeRecognizer()
+    finals, partials, latencies = replay(WavFileSource(str(path)), recognizer,
+                                         vad=EnergyVAD(end_silence_ms=300))
+
+    assert len(finals) == 2
+    assert recognizer.resets == 2
+    assert partials[0] == "word"
+    # Endpoint fires one end-silence window after the last voiced chunk
+    for latency in latencies:
+        assert 0.29 <= latency < 0.4
+
+def test_wav_source_resamples_and_mixes_down(tmp_path):
+    path = tmp_path / "stereo.wav"
+    samples = np.full((8000, 2), 1000, dtype='<i2')
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes(samples.tobytes())
+
+    source = WavFileSource(str(path), trailing_silence_ms=0)
+    source.open()
+    assert len(source.samples) == SAMPLE_RATE
+    assert np.all(source.samples == 1000)
+
+def test_empty_final_reports_abandoned_utterance():
+    class SilentRecognizer(FakeRecognizer):
+        def finish(self):
+            return ""
+
+    finals, abandoned = [], []
+    transcriber = StreamingTranscriber(SilentRecognizer(), vad=EnergyVAD(end_silence_ms=300),
+                                       on_final=finals.append, on_abandoned=lambda: abandoned.append(True))
+    loud = (8000 * np.ones(CHUNK_SAMPLES)).astype('<i2')
+    quiet = np.zeros(CHUNK_SAMPLES, dtype='<i2')
+    for chunk in [quiet] * 5 + [loud] * 20 + [quiet] * 20:
+        transcriber.feed(chunk)
+    assert finals == [] and abandoned == [True]
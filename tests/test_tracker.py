@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from engine.tracker import HandTracker, TrackingService
+
+class FakeTracker:
+    def __init__(self):
+        self.output_callback = None
+        self.starts = 0
+        self.stops = 0
+
+    def start(self):
+        self.starts += 1
+
+    def stop(self):
+        self.stops += 1
+
+def test_camera_closes_only_when_last_subscriber_leaves():
+    tracker = FakeTracker()
+    service = TrackingService(tracker=tracker)
+    learn, conversation = [], []
+
+    def on_learn(frame, shape): learn.append(shape)
+    def on_conversation(frame, shape): conversation.append(shape)
+
+    # Kivy fires on_enter of the new screen before on_leave of the old one
+    service.subscribe(on_learn)
+    service.subscribe(on_conversation)
+    service.unsubscribe(on_learn)
+    assert tracker.starts == 1
+    assert tracker.stops == 0
+
+    tracker.output_callback(None, "V-Shape")
+    assert learn == []
+    assert conversation == ["V-Shape"]
+
+    service.unsubscribe(on_conversation)
+    assert tracker.stops == 1
+    assert service.subscriber_count == 0
+
+def test_unsubscribe_unknown_callback_is_ignored():
+    tracker = FakeTracker()
+    service = TrackingService(tracker=tracker)
+    service.unsubscribe(lambda frame, shape: None)
+    assert tracker.stops == 0
+
+class FakeHands:
+    """Stands in for mp_hands.Hands: reports one hand at a fixed spot of its input."""
+    def __init__(self, box=(0.4, 0.4, 0.6, 0.6)):
+        self.box = box
+        self.inputs = []
+
+    def process(self, image):
+        self.inputs.append(image.shape)
+        x0, y0, x1, y1 = self.box
+        xs = np.linspace(x0, x1, 21)
+        ys = np.linspace(y1, y0, 21)
+        hand = SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=0.0) for x, y in zip(xs, ys)])
+        return SimpleNamespace(multi_hand_landmarks=[hand], multi_handedness=None)
+
+def test_inference_downscale_and_roi_crop():
+    tracker = HandTracker(inference_width=320, draw_overlay=False, roi_crop=True)
+    tracker.hands = FakeHands()
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    # First frame: full frame, downscaled for inference only
+    out, _ = tracker.process_frame(frame)
+    assert out is frame
+    assert tracker.hands.inputs[0] == (240, 320, 3)
+    assert tracker._roi is not None
+
+    # Second frame: only the crop around the previous hand is processed
+    x0, y0, x1, y1 = tracker._roi
+    tracker.process_frame(frame)
+    crop_h, crop_w = tracker.hands.inputs[1][:2]
+    assert crop_w < 320 and crop_h < 240
+
+    # Landmarks are reported in full-frame pixels, inside the crop
+    xs = tracker.last_landmarks[0, :, 0]
+    assert x0 <= xs.min() and xs.max() <= x1
+    assert {"convert", "inference", "classify"} <= set(tracker.stats()["stage_ms"])
@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+
+import cv2
+import numpy as np
+
+from engine.sources import ImageDirectorySource
+from engine.tracker import TrackingService, BACKEND_PROCESS, PACING_NONE
+from engine.tracker_process import ProcessHandTracker
+from test_tracker import FakeHands
+
+def test_process_backend_tracks_frames_through_shared_memory(tmp_path):
+    for i in range(5):
+        frame = np.full((120, 160, 3), i * 40, dtype=np.uint8)
+        cv2.imwrite(str(tmp_path / f"{i:03d}.png"), frame)
+
+    results = []
+    tracker = ProcessHandTracker(
+        update_callback=lambda frame, shape: results.append((frame, shape)),
+        pacing=PACING_NONE,
+        source=ImageDirectorySource(str(tmp_path)),
+        hands_factory=FakeHands
+    )
+    landmarks = []
+    tracker.landmark_callback = lambda t, lms, shapes: landmarks.append(lms)
+
+    tracker.start()
+    tracker.wait()
+
+    assert len(results) == 5
+    assert tracker.frames_dropped == 0
+    # Frames handed out are private copies, not views of the reused ring
+    assert [int(frame[0, 0, 0]) for frame, _ in results] == [0, 40, 80, 120, 160]
+    assert all(shape != "None" for _, shape in results)
+
+    # Landmarks come back in pixels of the full frame
+    xs = landmarks[-1][0, :, 0]
+    assert xs.min() >= 0.4 * 160 - 1 and xs.max() <= 0.6 * 160 + 1
+    assert {"inference", "roundtrip"} <= set(tracker.stats()["stage_ms"])
+    assert tracker._shm is None
+
+def test_tracking_service_selects_process_backend():
+    service = TrackingService(backend=BACKEND_PROCESS)
+    assert isinstance(service.tracker, ProcessHandTracker)
+    assert service.tracker.output_callback == service._dispatch
+
+def crashing_hands():
+    raise RuntimeError("Hands graph failed to build")
+
+def test_dead_worker_does_not_hang_shutdown(tmp_path):
+    for i in range(5):
+        cv2.imwrite(str(tmp_path / f"{i:03d}.png"), np.zeros((120, 160, 3), dtype=np.uint8))
+
+    results = []
+    tracker = ProcessHandTracker(
+        update_callback=lambda frame, shape: results.append(shape),
+        pacing=PACING_NONE,
+        source=ImageDirectorySource(str(tmp_path)),
+        hands_factory=crashing_hands
+    )
+    tracker.start()
+    waiter = threading.Thread(target=tracker.wait, daemon=True)
+    waiter.start()
+    waiter.join(20)
+
+    assert not waiter.is_alive()
+    assert results == []
+    assert not tracker.running
+    # Shared ring is released even though the worker never answered
+    assert tracker._shm is None and tracker._process is None
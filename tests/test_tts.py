@@ -0,0 +1,119 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+
+from engine.tts import TTSWorker, PRIORITY_SOS, PRIORITY_CHAT
+
+class FakeSpeaker:
+    """Blocks in speak() until released, like runAndWait()."""
+    def __init__(self):
+        self.spoken = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.interrupts = 0
+
+    def speak(self, text):
+        self.spoken.append(text)
+        self.started.set()
+        self.release.wait(2)
+
+    def interrupt(self):
+        self.interrupts += 1
+        self.release.set()
+
+def test_sos_preempts_chat_and_short_chat_is_coalesced():
+    speaker = FakeSpeaker()
+    worker = TTSWorker(speaker.speak, interrupt=speaker.interrupt)
+
+    worker.say("hello")
+    assert speaker.started.wait(2)
+    # Queued while "hello" is being spoken
+    worker.say("thank you")
+    worker.say("good")
+    worker.say("help me", PRIORITY_SOS)
+    assert speaker.interrupts == 1
+
+    assert worker.flush(timeout=2)
+    assert speaker.spoken == ["hello", "help me", "thank you, good"]
+    stats = worker.stats()
+    assert stats["coalesced"] == 1
+    assert stats["max_depth"] == 3
+    assert stats["queue_depth"] == 0
+    assert stats["ttfa_ms_p50"] is not None
+    worker.shutdown()
+
+def test_full_queue_drops_oldest_chat_never_sos():
+    speaker = FakeSpeaker()
+    worker = TTSWorker(speaker.speak, max_queue=2, coalesce_chars=0)
+    worker.say("busy")
+    assert speaker.started.wait(2)
+
+    assert worker.say("one")
+    assert worker.say("two")
+    assert worker.say("police", PRIORITY_SOS)
+    assert worker.say("fire", PRIORITY_SOS)
+    assert not worker.say("three", PRIORITY_CHAT)
+    assert worker.dropped == 3
+
+    speaker.release.set()
+    assert worker.flush(timeout=2)
+    assert speaker.spoken == ["busy", "police", "fire"]
+    worker.shutdown()
+
+def test_cancel_clears_queue_and_stops_current():
+    speaker = FakeSpeaker()
+    worker = TTSWorker(speaker.speak, interrupt=speaker.interrupt)
+    worker.say("a long sentence")
+    assert speaker.started.wait(2)
+    worker.say("next")
+    worker.cancel()
+
+    assert worker.flush(timeout=2)
+    assert speaker.spoken == ["a long sentence"]
+    assert worker.cancelled == 1
+    worker.shutdown()
+
+def test_background_job_is_never_interrupted():
+    speaker = FakeSpeaker()
+    worker = TTSWorker(speaker.speak, interrupt=speaker.interrupt)
+    rendering = threading.Event()
+    release = threading.Event()
+    rendered = []
+
+    def render():
+        rendering.set()
+        release.wait(2)
+        rendered.append("police")
+
+    worker.submit(render)
+    assert rendering.wait(2)
+    # Urgent speech waits for the render instead of truncating it
+    worker.say("hello")
+    worker.say("help me", PRIORITY_SOS)
+    worker.cancel(PRIORITY_CHAT)
+    assert speaker.interrupts == 0
+
+    release.set()
+    speaker.release.set()
+    assert worker.flush(timeout=2)
+    assert rendered == ["police"]
+    assert speaker.spoken == ["help me"]
+    worker.shutdown()
+
+def test_cancel_keeps_queued_background_jobs():
+    speaker = FakeSpeaker()
+    worker = TTSWorker(speaker.speak, interrupt=speaker.interrupt)
+    jobs = []
+    worker.say("a long sentence")
+    assert speaker.started.wait(2)
+    worker.submit(lambda: jobs.append("prewarm"))
+    worker.say("next")
+    worker.cancel()
+
+    assert worker.flush(timeout=2)
+    assert speaker.spoken == ["a long sentence"]
+    assert jobs == ["prewarm"]
+    assert worker.cancelled == 1
+    worker.shutdown()
@@ -0,0 +1,62 @@
+from kivy.graphics.texture import Texture
+import numpy as np
+
+class FramePresenter:
+    """
+    Uploads camera frames into a single reusable Kivy texture.
+
+    The texture is allocated once per resolution and flipped through its
+    UV coordinates, so a frame is uploaded straight from the numpy array
+    instead of going through cv2.flip + tobytes + Texture.create.
+    Must be called on the main (GL) thread.
+    """
+    def __init__(self, colorfmt='bgr'):
+        self.colorfmt = colorfmt
+        self.texture = None
+        self.size = None
+        self.allocations = 0
+        self.uploads = 0
+        self._buffer = None
+        self._last_frame = None
+
+    def present(self, frame, widget=None):
+        h, w = frame.shape[:2]
+        if self.texture is None or self.size != (w, h):
+            self._allocate(w, h)
+
+        self._upload(frame)
+
+        if widget is not None:
+            if widget.texture is not self.texture:
+                widget.texture = self.texture
+            else:
+                # Same texture object, new pixels: the widget must redraw
+                widget.canvas.ask_update()
+        return self.texture
+
+    def _allocate(self, w, h):
+        self.texture = Texture.create(size=(w, h), colorfmt=self.colorfmt)
+        # OpenCV rows are top-down, GL is bottom-up: flip via tex coords
+        self.texture.flip_vertical()
+        # GL context loss (e.g. Android pause/resume) wipes the pixels
+        self.texture.add_reload_observer(self._on_reload)
+        self.size = (w, h)
+        self.allocations += 1
+
+    def _upload(self, frame):
+        # blit_buffer wants a flat, contiguous, writable buffer. Camera frames
+        # already are, so this is a view; anything else (ROI slices, read-only
+        # arrays) is copied into one buffer reused across frames.
+        if not frame.flags['C_CONTIGUOUS'] or not frame.flags['WRITEABLE']:
+            if self._buffer is None or self._buffer.shape != frame.shape:
+                self._buffer = np.empty(frame.shape, dtype=frame.dtype)
+            np.copyto(self._buffer, frame)
+            frame = self._buffer
+
+        self.texture.blit_buffer(frame.reshape(-1), colorfmt=self.colorfmt, bufferfmt='ubyte')
+        self._last_frame = frame
+        self.uploads += 1
+
+    def _on_reload(self, texture):
+        if self._last_frame is not None:
+            texture.blit_buffer(self._last_frame.reshape(-1), colorfmt=self.colorfmt, bufferfmt='ubyte')
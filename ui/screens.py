@@ -1,22 +1,15 @@
 from kivy.uix.screenmanager import Screen
 from kivy.properties import ObjectProperty, StringProperty, ListProperty
 from kivy.clock import Clock
-from kivy.graphics.texture import Texture
-import cv2
 import threading
 
-# Import engines
-try:
-   from engine.tracker import HandTracker
-   from engine.persistence import PersistenceManager
-   from engine.conversation import ConversationManager
-   from engine.grammar import SASLGrammarEngine
-except ImportError as e:
-   print("Import Error:", e)
-   HandTracker = None
-   PersistenceManager = None
-   ConversationManager = None
-   SASLGrammarEngine = None
+# Engines are imported lazily and shared across screens by the registry
+from engine.registry import engines
+from engine.frames import LatestFrameSlot
+from ui.presenter import FramePresenter
+
+# Save LearnScreen landmark sessions to data/sessions/ for offline analysis
+RECORD_PRACTICE_SESSIONS = True
 
 class HomeScreen(Screen):
     pass
@@ -25,37 +18,115 @@ class LearnScreen(Screen):
     img = ObjectProperty(None)
     status_label = ObjectProperty(None)
     tracker = None
+    recorder = None
+    practice = None
+    persistence = None
 
     def on_enter(self, *args):
-        if HandTracker:
-            self.tracker = HandTracker(update_callback=self.update_frame)
-            self.tracker.start()
-        else:
-            print("HandTracker not available.")
+        engines.request(["tracker", "persistence"], self._on_engines_loaded,
+                        on_error=lambda e: print("HandTracker not available:", e))
+
+    def _on_engines_loaded(self, instances):
+        # Background thread: the due query waits for queued writes
+        from engine.practice import HANDSHAPE_CATEGORY
+        due = [name for name, _ in instances["persistence"].get_due_signs(category=HANDSHAPE_CATEGORY)]
+
+        def start_tracker(dt):
+            if self.manager and self.manager.current != self.name:
+                return
+            self.tracker = instances["tracker"]
+            self.tracker.subscribe(self.update_frame)
+            self._start_practice_log(instances["persistence"], due)
+            if RECORD_PRACTICE_SESSIONS:
+                self._start_recording()
+        Clock.schedule_once(start_tracker)
 
     def on_leave(self, *args):
         if self.tracker:
-            self.tracker.stop()
+            self.tracker.remove_landmark_listener(self._record_landmarks)
+            self.tracker.remove_landmark_listener(self._log_practice)
+            self.tracker.unsubscribe(self.update_frame)
+        self._stop_recording()
+        self._finish_practice()
+        self.tracker = None
+
+    def _start_practice_log(self, persistence, due=()):
+        # Stable hand shapes become practice_events rows (batched writes);
+        # shapes due for SM-2 review are asked for first, most overdue first
+        from engine.practice import PracticeEventDetector
+        self.persistence = persistence
+        self.practice = PracticeEventDetector(on_attempt=persistence.log_practice)
+        self.practice.review(due)
+        self.tracker.add_landmark_listener(self._log_practice)
+
+    def _finish_practice(self):
+        # Reschedule everything practised this session in one transaction
+        practice, self.practice = self.practice, None
+        if practice and practice.session:
+            self.persistence.record_reviews(practice.review_results())
+
+    def _log_practice(self, timestamp, landmarks, shapes):
+        # Tracker thread
+        practice = self.practice
+        if practice:
+            practice.feed(shapes)
+
+    def _start_recording(self):
+        # Landmarks only (~0.5 KB/frame) for offline analysis of practice sessions
+        from engine.recording import LandmarkRecorder, new_session_path
+        try:
+            self.recorder = LandmarkRecorder(new_session_path("learn"))
+        except OSError as e:
+            print(f"Session recording disabled: {e}")
+            return
+        self.tracker.add_landmark_listener(self._record_landmarks)
+
+    def _record_landmarks(self, timestamp, landmarks, shapes):
+        # Tracker thread
+        recorder = self.recorder
+        if recorder:
+            recorder.write(timestamp, landmarks)
+
+    def _stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder:
+            if self.tracker and self.tracker.frame_size:
+                recorder.frame_size = self.tracker.frame_size
+            recorder.close()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = LatestFrameSlot()
+        self.presenter = FramePresenter()
 
     def update_frame(self, frame, hand_shape):
-        if not self.img: return
-        
-        # Convert frame
-        buf = cv2.flip(frame, 0).tobytes()
-        texture = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt='bgr')
-        texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
-        
-        def update_ui(dt):
-            self.img.texture = texture
-            if self.status_label:
-                self.status_label.text = f"Detected: {hand_shape}"
+        # Latest frame wins: at most one pending UI callback
+        if self.frames.put((frame, hand_shape)):
+            Clock.schedule_once(self._present_frame)
+
+    def _status_text(self, hand_shape):
+        practice = self.practice
+        if practice and practice.target_sign:
+            return f"Review: {practice.target_sign}   Detected: {hand_shape}"
+        return f"Detected: {hand_shape}"
+
+    def _present_frame(self, dt):
+        item = self.frames.take()
+        if item is None or not self.img: return
+        frame, hand_shape = item
+        engines.mark("first_frame")
         
-        Clock.schedule_once(update_ui)
+        # Upload into the reusable texture
+        self.presenter.present(frame, self.img)
+        if self.status_label:
+            self.status_label.text = self._status_text(hand_shape)
 
 class SOSScreen(Screen):
     def play_emergency_sign(self, sign_name):
         print(f"Playing emergency sign: {sign_name}")
-        pass
+        phrase = sign_name.replace('_', ' ').replace('-', ' ').lower()
+        # Queued ahead of any chat that is still being spoken
+        engines.request(["conversation"], lambda e: e["conversation"].speak_emergency(phrase))
 
 class FeedbackScreen(Screen):
     sign_input = ObjectProperty(None)
@@ -67,13 +138,14 @@ class FeedbackScreen(Screen):
         province = self.province_spinner.text
         note = self.note_input.text
         
-        if PersistenceManager:
-            pm = PersistenceManager()
-            pm.queue_feedback(sign, province, note)
-            pm.close()
-            print("Feedback submitted!")
-            self.sign_input.text = ""
-            self.note_input.text = ""
+        try:
+            engines.get("persistence").queue_feedback(sign, province, note)
+        except Exception as e:
+            print(f"Feedback error: {e}")
+            return
+        print("Feedback submitted!")
+        self.sign_input.text = ""
+        self.note_input.text = ""
 
 class ConversationScreen(Screen):
     chat_label = ObjectProperty(None)
@@ -81,44 +153,70 @@ class ConversationScreen(Screen):
     camera_image = ObjectProperty(None)
     mic_status_label = ObjectProperty(None)
     
-    manager = None
+    conversation = None
     grammar = None
+    gloss_session = None
     tracker = None
+    motion = None
+    playback = None
     
     is_mic_on = False
 
     def on_enter(self, *args):
-        # 1. Start Tracker (Sign-to-Voice Input)
-        if HandTracker:
-            self.tracker = HandTracker(update_callback=self.update_frame)
-            self.tracker.start()
-
-        # 2. Start Conversation Manager (Voice-to-Sign Input + TTS)
-        if ConversationManager:
-            self.manager = ConversationManager(on_speech_recognized=self.on_speech_recognized)
-            
-        # 3. Init Grammar
-        if SASLGrammarEngine:
-            self.grammar = SASLGrammarEngine()
+        # Tracker (Sign-to-Voice), Conversation Manager (Voice-to-Sign + TTS),
+        # Grammar and motion recognizer are shared engines, warmed up at app start
+        engines.request(["tracker", "conversation", "grammar", "motion", "playback"], self._on_engines_loaded)
+
+    def _on_engines_loaded(self, instances):
+        def attach(dt):
+            if self.manager and self.manager.current != self.name:
+                return
+            self.tracker = instances["tracker"]
+            self.tracker.subscribe(self.update_frame)
+
+            self.conversation = instances["conversation"]
+            self.conversation.on_speech_recognized = self.on_speech_recognized
+            self.conversation.on_partial_speech = self.on_partial_speech
+            self.conversation.on_speech_abandoned = self.on_speech_abandoned
+            self.grammar = instances["grammar"]
+            self.gloss_session = self.grammar.start_session()
+
+            self.motion = instances["motion"]
+            self.motion.on_match = self.on_sign_recognized
+            self.motion.reset()
+            self.tracker.add_landmark_listener(self.motion.on_landmarks)
+
+            self.playback = instances["playback"]
+            self.playback.on_frame = self.update_avatar_frame
+            engines.mark("conversation_ready")
+        Clock.schedule_once(attach)
 
     def on_leave(self, *args):
         if self.tracker:
-            self.tracker.stop()
-        if self.manager and self.is_mic_on:
-            self.manager.stop_listening()
+            if self.motion:
+                self.tracker.remove_landmark_listener(self.motion.on_landmarks)
+            self.tracker.unsubscribe(self.update_frame)
+            self.tracker = None
+        if self.playback:
+            self.playback.clear()
+            self.playback.on_frame = None
+        if self.conversation and self.is_mic_on:
+            self.conversation.stop_listening()
             self.is_mic_on = False
+        if self.grammar:
+            self.grammar.save_cache()
 
     def toggle_mic(self):
-        if not self.manager: return
+        if not self.conversation: return
         
         if self.is_mic_on:
-            self.manager.stop_listening()
+            self.conversation.stop_listening()
             self.is_mic_on = False
             self.mic_status_label.text = "Mic: RED (OFF)"
             self.mic_status_label.color = (1, 0, 0, 1)
         else:
             try:
-                self.manager.start_listening()
+                self.conversation.start_listening()
                 self.is_mic_on = True
                 self.mic_status_label.text = "Mic: GREEN (ON)"
                 self.mic_status_label.color = (0, 1, 0, 1)
@@ -126,6 +224,28 @@ class ConversationScreen(Screen):
                 print(f"Mic Error: {e}")
                 self.mic_status_label.text = "Mic Error"
 
+    def on_sign_recognized(self, gloss, distance):
+        # Callback from SequenceRecognizer (tracker thread)
+        self.update_chat(f"Signed: {gloss}")
+        if self.conversation:
+            self.conversation.speak(gloss.replace('_', ' ').replace('-', ' ').lower())
+
+    def on_partial_speech(self, text):
+        # Partial transcript (main thread): sign the words that are settled
+        if not self.gloss_session:
+            return
+        delta = self.gloss_session.update(text)
+        if delta["new"]:
+            if self.playback:
+                self.playback.enqueue(delta["new"])
+            self.update_avatar(" ".join(self.gloss_session.emitted), "...")
+
+    def on_speech_abandoned(self):
+        # Utterance ended without a transcript: its frozen words must not
+        # carry over into the next one
+        if self.gloss_session:
+            self.gloss_session.reset()
+
     def on_speech_recognized(self, text):
         # Callback from ConversationManager (Threaded)
         print(f"Recognized: {text}")
@@ -133,33 +253,60 @@ class ConversationScreen(Screen):
         # Update Chat Log
         self.update_chat(f"Hearing: {text}")
         
-        # Convert to Gloss
-        if self.grammar:
-            result = self.grammar.to_gloss(text)
+        # Convert to Gloss (finishing the incremental session fed by partials)
+        if self.gloss_session:
+            result = self.gloss_session.finish(text)
             gloss = " ".join(result['gloss'])
             marker = result['facial_marker']
+            if self.playback:
+                self.playback.enqueue(result['new'])
             
             # Simulate Avatar Playing
             self.update_avatar(gloss, marker)
             self.update_chat(f"Deaf: {gloss} ({marker})")
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = LatestFrameSlot()
+        self.presenter = FramePresenter()
+        self.avatar_frames = LatestFrameSlot()
+        self.avatar_presenter = FramePresenter()
+
     def update_frame(self, frame, hand_shape):
-        # Updates Camera Feed
-        buf = cv2.flip(frame, 0).tobytes()
-        texture = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt='bgr')
-        texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
+        if self.frames.put((frame, hand_shape)):
+            Clock.schedule_once(self._present_frame)
 
-        def ui_update(dt):
-            if self.camera_image:
-                self.camera_image.texture = texture
-            
-            # Simple Trigger: If "V-Shape" (Peace) is held -> Speak "Peace"
-            # In real app, we need robustness (e.g. hold for 1 sec)
-            if hand_shape == "V-Shape":
-                # self.manager.speak("Peace") # Be careful not to spam TTS
-                pass
+    def update_avatar_frame(self, frame, gloss):
+        # Playback thread: sign clip frames for the avatar view
+        if self.avatar_frames.put(frame):
+            Clock.schedule_once(self._present_avatar_frame)
 
-        Clock.schedule_once(ui_update)
+    def _present_avatar_frame(self, dt):
+        frame = self.avatar_frames.take()
+        avatar = self.ids.get('avatar_feed')
+        if frame is not None and avatar:
+            self.avatar_presenter.present(frame, avatar)
+
+    def _status_text(self, hand_shape):
+        practice = self.practice
+        if practice and practice.target_sign:
+            return f"Review: {practice.target_sign}   Detected: {hand_shape}"
+        return f"Detected: {hand_shape}"
+
+    def _present_frame(self, dt):
+        item = self.frames.take()
+        if item is None: return
+        frame, hand_shape = item
+        engines.mark("first_frame")
+        # Updates Camera Feed
+        if self.camera_image:
+            self.presenter.present(frame, self.camera_image)
+        
+        # Simple Trigger: If "V-Shape" (Peace) is held -> Speak "Peace"
+        # In real app, we need robustness (e.g. hold for 1 sec)
+        if hand_shape == "V-Shape":
+            # self.conversation.speak("Peace") # Be careful not to spam TTS
+            pass
 
     def update_chat(self, message):
         def ui_update(dt):